@@ -1,110 +1,165 @@
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel,
     QTableView, QLineEdit, QToolBar, QStatusBar, QSplitter, QHeaderView, 
-    QMessageBox, QMenu, QPushButton, QFileDialog, QSizePolicy,QListWidget
+    QMessageBox, QMenu, QPushButton, QFileDialog, QSizePolicy,QListWidget, QListWidgetItem, QCheckBox, QComboBox,
+    QSpinBox, QDateEdit, QFormLayout, QDialogButtonBox, QApplication, QProgressBar
 )
 from .edit_window_ui import Ui_EditWindow
+from .models import BatchedUpdatesMixin
+from .workers import ValidationThread, SaveWorkbookThread, CompactJournalThread
+import logging
 import json
 import re
-from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant, pyqtSignal, QEvent
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant, pyqtSignal, QEvent, QDate, QTimer
 from PyQt6.QtGui import QAction, QKeySequence, QBrush, QColor, QUndoStack, QUndoCommand, QActionGroup, QFont
+import numpy as np
 import pandas as pd
-import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from datetime import datetime, timedelta
 import configparser
 import os
 from utils.validators import format_datetime, is_date
-from zoneinfo import ZoneInfo
-import pytz
-
-class ShiftDatesCommand(QUndoCommand):
-    def __init__(self, model, days, original_data):
-        super().__init__(f"Shift Dates by {days} days")
+from utils.bulk_edit import (
+    find_replace_changes, increment_episode_changes, auto_number_series_changes, shift_date_changes,
+    parse_tsv, block_changes, paste_changes, fill_down_changes, fill_series_changes
+)
+from utils.schedule_formats import NATIVE_EXTENSION
+from utils.edit_journal import EditJournal, load_journal, replay_journal
+from utils.schedule_times import NAT, parse_start_times, derive_stop_times, format_clock
+
+class ModelCommand(QUndoCommand):
+    """Base for undo entries that change a DataFrameModel.
+
+    Each command gets a new revision number from the model. Applying it
+    moves the model to that revision and undoing it moves the model back to
+    the revision it had before, so the model's revision always identifies
+    its content and can be compared with the revision that was saved.
+    Subclasses implement apply() and revert().
+    """
+    def __init__(self, model, text):
+        super().__init__(text)
         self.model = model
-        self.days = days
-        self.original_data = original_data #Corrected attribute name
-
-    def undo(self):
-        self.model.set_dates(self.original_data) #Corrected attribute name
+        self.revision = model.next_revision()
+        self.parent_revision = None
 
     def redo(self):
-        self.model.shift_dates(self.days)
+        if self.parent_revision is None:
+            self.parent_revision = self.model.state_revision
+        self.model.state_revision = self.revision  # Set first so dataChanged slots see the new state
+        self.apply()
 
+    def undo(self):
+        self.model.state_revision = self.parent_revision
+        self.revert()
 
-class FindReplaceCommand(QUndoCommand):
-    def __init__(self, model, view, find_text, replace_text): # Add view parameter
-        super().__init__("Find and Replace")
-        self.model = model
-        self.view = view # Store the view
-        self.find_text = find_text
-        self.replace_text = replace_text
-        self.original_data = self.model.get_data_frame().copy()
+    def apply(self):
+        raise NotImplementedError
 
+    def revert(self):
+        raise NotImplementedError
 
-    def undo(self):
-        self.model.set_data(self.original_data)
 
-    def redo(self):
-            for row in range(self.model.rowCount()):
-                for col in range(self.model.columnCount()):
-                    index = self.model.index(row, col)
-                    cell_value = str(self.model.data(index, Qt.ItemDataRole.DisplayRole))
-                    if self.find_text.lower() in cell_value.lower():
-                        self.model.setData(index, self.replace_text, Qt.ItemDataRole.EditRole) # Removed the updated variable and return statement
+class CellChangesCommand(ModelCommand):
+    """Undo entry for a bulk operation; holds only the cells it changed."""
+    def __init__(self, model, changes, text):
+        super().__init__(model, text)
+        self.changes = changes
 
+    def revert(self):
+        self.model.apply_cell_changes(self.changes, self.changes.old_values)
 
+    def apply(self):
+        self.model.apply_cell_changes(self.changes, self.changes.new_values)
 
 
-class EditCommand(QUndoCommand):
+class EditCommand(ModelCommand):
     def __init__(self, model, index, old_value, new_value):
-        super().__init__("Edit Cell")
-        self.model = model
+        super().__init__(model, "Edit Cell")
         self.row = index.row()
         self.column = index.column()
         self.old_value = old_value
         self.new_value = new_value
 
-    def undo(self):
+    def revert(self):
         self.model._data_frame.iloc[self.row, self.column] = self.old_value
-        self.model.dataChanged.emit(self.model.index(self.row, self.column), self.model.index(self.row, self.column), [Qt.ItemDataRole.EditRole])
+        self.model.notify_changed(self.row, self.column, self.row, self.column)
 
-    def redo(self):
+    def apply(self):
         self.model._data_frame.iloc[self.row, self.column] = self.new_value
-        self.model.dataChanged.emit(self.model.index(self.row, self.column), self.model.index(self.row, self.column), [Qt.ItemDataRole.EditRole])
-        
-class IncrementEpisodeNumberCommand(QUndoCommand):
-    def __init__(self, model, table_view): # Add table_view as a parameter
-        super().__init__("Increment Episode Number")
-        self.model = model
-        self.table_view = table_view # Store table_view for later use
-        self.original_data = self.model.get_data_frame().copy() #store a copy of the original DataFrame
+        self.model.notify_changed(self.row, self.column, self.row, self.column)
 
 
-    def undo(self):
-        self.model.set_data(self.original_data) #Restore from the copy of the original DataFrame
+class DataFrameModel(BatchedUpdatesMixin, QAbstractTableModel):
+    """Editable table over the display DataFrame.
 
-    def redo(self):
-        self.model.increment_episode_number_filtered(self.table_view) #Call filtered function directly
+    Besides the DataFrame columns the model shows one derived, read-only
+    column with each programme's stop time. Start and stop times are kept
+    as int64 arrays and updated only for the rows an edit touches.
+    """
+    FETCH_BATCH = 1000  # Rows handed to the view per fetchMore()
 
+    # Changes to the data itself, independent of how many rows the view has fetched.
+    # Use these (not dataChanged/rowsInserted) to keep state derived from the data in sync.
+    cellsChanged = pyqtSignal(int, int, int, int)  # top, left, bottom, right
+    dataRowsInserted = pyqtSignal(int, int)  # position, count
+    dataRowsRemoved = pyqtSignal(int, int)  # position, count
+    dataReset = pyqtSignal()
+    rowsFetched = pyqtSignal(int, int)  # first, last
 
-class DataFrameModel(QAbstractTableModel):
     def __init__(self, data_frame: pd.DataFrame, undo_stack):
         super().__init__()
         self._data_frame = data_frame.copy()
-        self._original_data_frame = data_frame.copy()
         self.undo_stack = undo_stack
+        self._fetched_rows = min(len(self._data_frame), self.FETCH_BATCH)
+
+        # Dirty tracking: revisions only ever grow, the saved marker is compared by identity
+        self._last_revision = 0
+        self.state_revision = 0
+        self.saved_revision = 0
+
+        self._start_ns = np.empty(0, dtype=np.int64)
+        self._stop_ns = np.empty(0, dtype=np.int64)
+        self.recalculate_stop_times()
+        self.cellsChanged.connect(self._on_cells_changed)
+
+    @property
+    def stop_column(self):
+        """Position of the derived stop-time column, right after the DataFrame columns."""
+        return self._data_frame.shape[1]
 
     def rowCount(self, parent=None):
+        """Rows exposed to the view so far; see data_row_count() for the whole schedule."""
+        return self._fetched_rows
+
+    def data_row_count(self):
         return self._data_frame.shape[0]
 
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetched_rows < self.data_row_count()
+
+    def fetchMore(self, parent=QModelIndex()):
+        self.fetch_to(self._fetched_rows + self.FETCH_BATCH - 1)
+
+    def fetch_to(self, row):
+        """Exposes rows to the view up to and including `row`."""
+        target = min(row + 1, self.data_row_count())
+        if target <= self._fetched_rows:
+            return
+        first = self._fetched_rows
+        self.beginInsertRows(QModelIndex(), first, target - 1)
+        self._fetched_rows = target
+        self.endInsertRows()
+        self.rowsFetched.emit(first, target - 1)
+
     def columnCount(self, parent=None):
-        return self._data_frame.shape[1]
+        return self._data_frame.shape[1] + 1
 
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
         if not index.isValid():
             return QVariant()
-        value = self._data_frame.iloc[index.row(), index.column()]
+        if index.column() == self.stop_column:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return format_clock(self._stop_ns[index.row()])
+            return QVariant()
+        value = self._data_frame.iat[index.row(), index.column()]
         if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
             return str(value)
         elif role == Qt.ItemDataRole.BackgroundRole:
@@ -114,12 +169,16 @@ class DataFrameModel(QAbstractTableModel):
     
     
     def set_data(self, data_frame):
+        self.beginResetModel()
         self._data_frame = data_frame.copy()
-        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1), [Qt.ItemDataRole.EditRole])
-        self.layoutChanged.emit() # Emit layoutChanged as well for a complete refresh
+        self._fetched_rows = min(len(self._data_frame), self.FETCH_BATCH)
+        self.state_revision = self.next_revision()
+        self.recalculate_stop_times()
+        self.endResetModel()
+        self.dataReset.emit()
 
     def is_cell_valid(self, index):
-        value = self._data_frame.iloc[index.row(), index.column()]
+        value = self._data_frame.iat[index.row(), index.column()]
         column_name = self._data_frame.columns[index.column()]
         required_columns = ['DATE', 'START TIME', 'NAZIV EMISIJE']
         if column_name in required_columns:
@@ -129,15 +188,12 @@ class DataFrameModel(QAbstractTableModel):
                 return is_date(str(value))
         return True
     
-    def set_dates(self, data):
-        self._data_frame = data.copy()  #Directly set DataFrame
-        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1), [Qt.ItemDataRole.EditRole])
-        self.recalculate_stop_times()
-
     def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
         if role != Qt.ItemDataRole.DisplayRole:
             return QVariant()
         if orientation == Qt.Orientation.Horizontal:
+            if section == self.stop_column:
+                return "KRAJ"
             column_name = self._data_frame.columns[section]
             if column_name == 'DATE':
                 return "DATUM"
@@ -159,10 +215,12 @@ class DataFrameModel(QAbstractTableModel):
             return str(section)
 
     def flags(self, index):
+        if index.column() == self.stop_column:
+            return Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled
         return Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsEditable
 
     def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
-        if index.isValid() and role == Qt.ItemDataRole.EditRole:
+        if index.isValid() and role == Qt.ItemDataRole.EditRole and index.column() != self.stop_column:
             row = index.row()
             col = index.column()
             column_name = self._data_frame.columns[index.column()]
@@ -176,128 +234,209 @@ class DataFrameModel(QAbstractTableModel):
             old_value = self._data_frame.iloc[row, col]
             if str(old_value) != str(value):
                 command = EditCommand(self, index, old_value, value)
-                self.undo_stack.push(command)
-                self._data_frame.iloc[row, col] = value
-                self.dataChanged.emit(index, index, [role])
-                return True  #Removed call to on_data_changed
+                self.undo_stack.push(command)  # push() runs redo(), which writes the value
+                return True
         return False
 
     def insertRows(self, position, rows=1, parent=QModelIndex()):
-        self.beginInsertRows(QModelIndex(), position, position + rows - 1)
-        empty_row = pd.DataFrame([[""] * self.columnCount()], columns=self._data_frame.columns)
-        self._data_frame = pd.concat([self._data_frame.iloc[:position], empty_row, self._data_frame.iloc[position:]]).reset_index(drop=True)
-        self.endInsertRows()
+        empty_rows = pd.DataFrame([[""] * len(self._data_frame.columns)] * rows, columns=self._data_frame.columns)
+        self.state_revision = self.next_revision()  # Not undoable, so this state can never be the saved one again
+        self.insert_frame_rows(position, empty_rows)
         return True
 
+    def insert_frame_rows(self, position, frame):
+        """Inserts the rows of `frame` at `position` and updates derived times."""
+        count = len(frame)
+        shown = position <= self._fetched_rows
+        if shown:
+            self.beginInsertRows(QModelIndex(), position, position + count - 1)
+        self._data_frame = pd.concat([self._data_frame.iloc[:position], frame, self._data_frame.iloc[position:]]).reset_index(drop=True)
+        if shown:
+            self._fetched_rows += count
+        new_rows = np.arange(position, position + count)
+        self._start_ns = np.insert(self._start_ns, position, np.full(count, NAT))
+        self._stop_ns = np.insert(self._stop_ns, position, np.full(count, NAT))
+        self._parse_starts(new_rows)
+        if shown:
+            self.endInsertRows()
+        self.dataRowsInserted.emit(position, count)
+        self._derive_stops(np.union1d(new_rows - 1, new_rows))
+
+    def remove_frame_rows(self, position, count):
+        """Removes `count` rows at `position` and updates derived times."""
+        shown_end = min(position + count, self._fetched_rows)
+        shown = position < shown_end
+        if shown:
+            self.beginRemoveRows(QModelIndex(), position, shown_end - 1)
+        self._data_frame = self._data_frame.drop(self._data_frame.index[position:position + count]).reset_index(drop=True)
+        if shown:
+            self._fetched_rows -= shown_end - position
+        removed = np.arange(position, position + count)
+        self._start_ns = np.delete(self._start_ns, removed)
+        self._stop_ns = np.delete(self._stop_ns, removed)
+        if shown:
+            self.endRemoveRows()
+        self.dataRowsRemoved.emit(position, count)
+        if position > 0:
+            self._derive_stops(np.array([position - 1]))
+
     def removeRows(self, position, rows=1, parent=QModelIndex()):
         removed_rows = self._data_frame.iloc[position:position + rows] #added
-        self.beginRemoveRows(QModelIndex(), position, position + rows - 1)
-        self._data_frame = self._data_frame.drop(self._data_frame.index[position:position + rows]).reset_index(drop=True)
-        self.endRemoveRows()
         command = RemoveRowsCommand(self, position, rows, removed_rows) #added
-        self.undo_stack.push(command) #added
+        self.undo_stack.push(command)  # push() runs redo(), which removes the rows
         return True
 
     def get_data_frame(self):
         return self._data_frame.copy()
 
-    def reset_data(self):
-        self._data_frame = self._original_data_frame.copy()
-        self.layoutChanged.emit()
+    def apply_cell_changes(self, changes, values):
+        """Writes `values` to the cells in `changes`, one vectorized write per column."""
+        if not len(changes):
+            return
+        with self.batch_updates():
+            for col in np.unique(changes.cols):
+                in_col = changes.cols == col
+                rows = changes.rows[in_col]
+                column_name = self._data_frame.columns[col]
+                if not pd.api.types.is_object_dtype(self._data_frame[column_name]):
+                    # Edited cells hold free text, don't let a typed column reject it
+                    self._data_frame[column_name] = self._data_frame[column_name].astype(object)
+                self._data_frame.iloc[rows, col] = values[in_col]
+                self.notify_row_runs(rows, col)
+
+    def next_revision(self):
+        self._last_revision += 1
+        return self._last_revision
+
+    def mark_saved(self, revision=None):
+        """Records `revision` (default: the current one) as the state on disk."""
+        self.saved_revision = self.state_revision if revision is None else revision
 
     def has_unsaved_changes(self):
-        return not self._data_frame.equals(self._original_data_frame)
+        return self.state_revision != self.saved_revision
     
-    def shift_dates(self, days):
-        date_column_index = self._data_frame.columns.get_loc('DATE')
-        
-        for i in range(self.rowCount()):
-            index = self.index(i, date_column_index)
-            current_date_str = self.data(index, Qt.ItemDataRole.DisplayRole)
-            if is_date(current_date_str):
-                current_date = datetime.strptime(current_date_str, '%d.%m.%Y.').date()
-                new_date = current_date + timedelta(days=days)
-                new_date_str = new_date.strftime('%d.%m.%Y.')
-                self._data_frame.iloc[i, date_column_index] = new_date_str #Directly modify DataFrame
+    def recalculate_stop_times(self):
+        """Re-derives start and stop times for the whole schedule in one vectorized pass."""
+        self._start_ns = parse_start_times(self._data_frame['DATE'], self._data_frame['START TIME'])
+        self._stop_ns = derive_stop_times(self._start_ns)
+        if self.data_row_count():
+            self.notify_changed(0, self.stop_column, self.data_row_count() - 1, self.stop_column)
+
+    def start_times(self):
+        """Parsed start times (int64 ns, NAT when invalid), kept in sync with the data."""
+        return self._start_ns
+
+    def update_stop_times(self, rows):
+        """Re-parses the start of `rows` and fixes the stops that depend on them.
+
+        A row's start is the stop of the row before it, so an edit to row r
+        touches only stop[r - 1] and stop[r].
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        if not len(rows):
+            return
+        self._parse_starts(rows)
+        self._derive_stops(np.union1d(rows - 1, rows))
 
-        self.recalculate_stop_times()
-        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1), [Qt.ItemDataRole.EditRole])
+    def _parse_starts(self, rows):
+        self._start_ns[rows] = parse_start_times(
+            self._data_frame['DATE'].iloc[rows], self._data_frame['START TIME'].iloc[rows]
+        )
 
+    def _derive_stops(self, rows):
+        rows = rows[(rows >= 0) & (rows < len(self._start_ns))]
+        if len(rows):
+            self._stop_ns[rows] = derive_stop_times(self._start_ns, rows)
+            self.notify_row_runs(rows, self.stop_column)
 
-    def recalculate_stop_times(self):
-        timezone = ZoneInfo("Europe/Zagreb")
-        try:
-            self._data_frame['start'] = pd.to_datetime(self._data_frame['DATE'].astype(str) + ' ' + self._data_frame['START TIME'].astype(str), format='%d.%m.%Y. %H:%M', errors='raise').dt.tz_localize(timezone, ambiguous='NaT')
-            self._data_frame['stop'] = self._data_frame['start'].shift(-1)
+    def notify_row_runs(self, rows, col):
+        """Reports changed cells in one column, one range per run of consecutive rows."""
+        rows = np.unique(rows)
+        breaks = np.flatnonzero(np.diff(rows) > 1)
+        starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+        ends = np.concatenate((rows[breaks], [rows[-1]]))
+        with self.batch_updates():
+            for start, end in zip(starts, ends):
+                self.notify_changed(int(start), col, int(end), col)
 
-            last_program_start = self._data_frame['start'].iloc[-1]
-            next_day = last_program_start + timedelta(days=1)
-            stop_dt = next_day.replace(hour=7, minute=0, second=0, microsecond=0)
-            self._data_frame['stop'] = self._data_frame['stop'].fillna(stop_dt)
+    def _cells_changed(self, top, left, bottom, right):
+        self.cellsChanged.emit(top, left, bottom, right)
 
-            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1), [Qt.ItemDataRole.EditRole])
+    def _on_cells_changed(self, top, left, bottom, right):
+        time_columns = [self._data_frame.columns.get_loc('DATE'), self._data_frame.columns.get_loc('START TIME')]
+        if any(left <= col <= right for col in time_columns):
+            self.update_stop_times(np.arange(top, bottom + 1))
 
-        except ValueError as e:
-            QMessageBox.warning(self, "Greška pri konverziji datuma/vremena", str(e))
-        except pytz.exceptions.AmbiguousTimeError as e:
-            QMessageBox.warning(self, "Nejednoznačno vrijeme", f"Došlo je do nejednoznačnosti u vremenu: {e}. Provjerite svoje podatke.")
-        except Exception as e:
-            QMessageBox.critical(self, "Greška", f"Neočekivana pogreška: {e}")
-            
-    def increment_episode_number_filtered(self, table_view):
-            ep_num_col = self._data_frame.columns.get_loc('EPISODE NUMBER')
-            for row in range(self.rowCount()):
-                if not table_view.isRowHidden(row):
-                    index = self.index(row, ep_num_col)
-                    current_value = self.data(index, Qt.ItemDataRole.DisplayRole)
 
-                    try:
-                        if current_value is not None and str(current_value).strip() != "":
-                            if isinstance(current_value, (int, float)):
-                                new_value = int(current_value) + 1
-                            elif current_value.isdigit():
-                                new_value = int(current_value) + 1
-                            elif '-' in current_value:
-                                parts = current_value.split('-')
-                                if len(parts) == 2 and parts[0].isdigit() and parts[1].isdigit():
-                                    new_value = f"{int(parts[0]) + 1}-{int(parts[1]) + 1}"
-                                else:
-                                    continue
-                            else:
-                                continue
-
-                            # Directly modify the DataFrame
-                            self._data_frame.iloc[row, ep_num_col] = new_value
-
-                            # Emit dataChanged signal to update the view
-                            self.dataChanged.emit(index, index, [Qt.ItemDataRole.EditRole])
-
-                    except (ValueError, TypeError) as e:
-                        print(f"Error incrementing episode number in row {row}: {e}")
-
-
-   
-class RemoveRowsCommand(QUndoCommand):
+class RemoveRowsCommand(ModelCommand):
     def __init__(self, model, position, rows, removed_rows):
-        super().__init__("Remove Rows")
-        self.model = model
+        super().__init__(model, "Remove Rows")
         self.position = position
         self.rows = rows
         self.removed_rows = removed_rows
 
-    def undo(self):
-        self.model.beginInsertRows(QModelIndex(), self.position, self.position + self.rows - 1)
-        self.model._data_frame = pd.concat([self.model._data_frame.iloc[:self.position], self.removed_rows, self.model._data_frame.iloc[self.position:]]).reset_index(drop=True)
-        self.model.endInsertRows()
+    def revert(self):
+        self.model.insert_frame_rows(self.position, self.removed_rows)
+
+    def apply(self):
+        self.model.remove_frame_rows(self.position, self.rows)
 
-    def redo(self):
-        self.model.beginRemoveRows(QModelIndex(), self.position, self.position + self.rows - 1)
-        self.model._data_frame = self.model._data_frame.drop(self.model._data_frame.index[self.position:self.position + self.rows]).reset_index(drop=True)
-        self.model.endRemoveRows()
+
+class ShiftDatesDialog(QDialog):
+    """Asks for a day offset and which rows to move: all, the selection or a date range."""
+    def __init__(self, has_selection, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Pomakni datume")
+        layout = QFormLayout(self)
+
+        self.days_input = QSpinBox(self)
+        self.days_input.setRange(-3650, 3650)
+        self.days_input.setValue(7)
+        layout.addRow("Broj dana:", self.days_input)
+
+        self.scope_input = QComboBox(self)
+        self.scope_input.addItem("Svi redovi", 'all')
+        if has_selection:
+            self.scope_input.addItem("Odabrani redovi", 'selection')
+        self.scope_input.addItem("Raspon datuma", 'range')
+        self.scope_input.currentIndexChanged.connect(self.on_scope_changed)
+        layout.addRow("Opseg:", self.scope_input)
+
+        self.from_input = QDateEdit(QDate.currentDate(), self)
+        self.to_input = QDateEdit(QDate.currentDate().addDays(6), self)
+        for date_input in (self.from_input, self.to_input):
+            date_input.setDisplayFormat("dd.MM.yyyy.")
+            date_input.setCalendarPopup(True)
+        layout.addRow("Od:", self.from_input)
+        layout.addRow("Do:", self.to_input)
+        self.on_scope_changed()
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def on_scope_changed(self):
+        is_range = self.scope() == 'range'
+        self.from_input.setEnabled(is_range)
+        self.to_input.setEnabled(is_range)
+
+    def days(self):
+        return self.days_input.value()
+
+    def scope(self):
+        return self.scope_input.currentData()
+
+    def date_range(self):
+        if self.scope() != 'range':
+            return None, None
+        return self.from_input.date().toPyDate(), self.to_input.date().toPyDate()
 
 
 class EditWindow(QDialog):
     data_saved = pyqtSignal()
+    JOURNAL_COMPACT_INTERVAL_MS = 60 * 1000
+    JOURNAL_COMPACT_RECORDS = 200  # Compact once the journal holds this many changes
 
     def __init__(self, display_df, internal_df, excel_file_path, excel_save_dir, parent=None):
         super().__init__(parent)
@@ -311,14 +450,20 @@ class EditWindow(QDialog):
         self.excel_save_dir = excel_save_dir
 
         self.undo_stack = QUndoStack(self)
-        self.unsaved_changes = False
         
         # Enable maximizing
         self.setWindowFlags(self.windowFlags() | Qt.WindowType.WindowMaximizeButtonHint)
         
 
+        # Edits left in the journal by a crash are replayed before the table is built
+        self.journal = None
+        self.discard_changes = False
+        self.closing = False  # Set once a close is accepted; a save finishing afterwards only reports back
+        recovered = self.recover_edits()
+
         # Initialize UI components
         self.init_ui()
+        self.start_journal(recovered)
 
     def init_ui(self):
         main_layout = QVBoxLayout(self)
@@ -345,6 +490,20 @@ class EditWindow(QDialog):
         self.replace_field = QLineEdit(self)
         search_replace_layout.addWidget(self.replace_field)
 
+        self.case_checkbox = QCheckBox("Aa", self)
+        self.case_checkbox.setToolTip("Razlikuj velika i mala slova")
+        search_replace_layout.addWidget(self.case_checkbox)
+
+        self.regex_checkbox = QCheckBox("Regex", self)
+        self.regex_checkbox.setToolTip("Traženi tekst je regularni izraz")
+        search_replace_layout.addWidget(self.regex_checkbox)
+
+        self.scope_combo = QComboBox(self)
+        self.scope_combo.addItem("Sve", 'all')
+        self.scope_combo.addItem("Vidljivo", 'visible')
+        self.scope_combo.addItem("Odabrano", 'selection')
+        search_replace_layout.addWidget(self.scope_combo)
+
         self.replace_button = QPushButton("Zamijeni", self)
         self.replace_button.clicked.connect(self.find_and_replace)
         search_replace_layout.addWidget(self.replace_button)
@@ -354,11 +513,30 @@ class EditWindow(QDialog):
         main_layout.addWidget(splitter)
         
 
+        # Table and the list of validation problems side by side
+        content_splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(content_splitter)
+
         # CREATE table_view HERE
-        self.table_view = QTableView(splitter)
+        self.table_view = QTableView(content_splitter)
         self.table_model = DataFrameModel(self.display_df, self.undo_stack)
         self.table_view.setModel(self.table_model)
 
+        # Validation runs on a worker thread; edits are sent to it as row snapshots
+        self.validation_thread = ValidationThread(parent=self)
+        self.validation_thread.problemsReady.connect(self.on_problems_ready)
+        self.validation_thread.error.connect(self.on_validation_error)
+        self.validation_thread.start()
+        self.validation_thread.rebuild(self.table_model._data_frame, self.table_model.start_times())
+        self.finished.connect(self.validation_thread.stop)
+
+        # Search filter state for every data row, including rows the view hasn't fetched yet
+        self._row_hidden = np.zeros(self.table_model.data_row_count(), dtype=bool)
+
+        # Uniform fixed row heights: the view never measures rows to lay them out
+        vertical_header = self.table_view.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(self.table_view.fontMetrics().height() + 8)
 
         self.table_view.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.table_view.horizontalHeader().setStretchLastSection(True)
@@ -367,11 +545,23 @@ class EditWindow(QDialog):
         self.table_view.installEventFilter(self)
         self.table_view.selectionModel().selectionChanged.connect(self.on_selection_changed) #Connect to selectionChanged
 
-        splitter.addWidget(self.table_view)
+        content_splitter.addWidget(self.table_view)
+
+        self.problem_list = QListWidget(content_splitter)
+        self.problem_list.itemClicked.connect(self.on_problem_clicked)
+        content_splitter.addWidget(self.problem_list)
+        content_splitter.setStretchFactor(0, 4)
+        content_splitter.setStretchFactor(1, 1)
 
         self.status_bar = QStatusBar()  # Create the status bar
         self.status_bar.setSizePolicy(QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Fixed) #added
         splitter.addWidget(self.status_bar)
+
+        self.save_thread = None
+        self.save_progress = QProgressBar(self)
+        self.save_progress.setMaximumWidth(200)
+        self.save_progress.hide()
+        self.status_bar.addPermanentWidget(self.save_progress)
         # Connect signals for UI logic
         self.init_ui_logic()
         
@@ -385,6 +575,21 @@ class EditWindow(QDialog):
         close_group = QActionGroup(self)
         self.find_field.textChanged.connect(self.search) 
         self.table_model.dataChanged.connect(self.on_data_changed)
+        self.table_model.cellsChanged.connect(self.revalidate_changed_rows)
+        self.table_model.dataRowsInserted.connect(self.revalidate_inserted_rows)
+        self.table_model.dataRowsRemoved.connect(self.revalidate_removed_rows)
+        self.table_model.dataReset.connect(self.revalidate_all)
+        self.table_model.rowsFetched.connect(self.apply_row_filter)
+        self.table_model.cellsChanged.connect(self.journal_cells)
+        self.table_model.dataRowsInserted.connect(self.journal_inserted_rows)
+        self.table_model.dataRowsRemoved.connect(self.journal_removed_rows)
+        self.table_model.dataReset.connect(self.journal_reset)
+
+        self.compaction_thread = None
+        self.compaction_timer = QTimer(self)
+        self.compaction_timer.timeout.connect(self.compact_journal)
+        self.compaction_timer.start(self.JOURNAL_COMPACT_INTERVAL_MS)
+        self.finished.connect(self.close_journal)  # Esc closes without closeEvent
 
         # Add actions to groups and toolbar, with separators
         save_action = self.toolbar.addAction("Spremi")
@@ -430,6 +635,10 @@ class EditWindow(QDialog):
         increment_episode_number_action = QAction("Numeracija +1", self)
         increment_episode_number_action.triggered.connect(self.increment_episode_number)
         self.toolbar.addAction(increment_episode_number_action)
+        number_series_action = QAction("Numeriraj serije", self)
+        number_series_action.setToolTip("Uzastopna numeracija epizoda za svaki naziv emisije")
+        number_series_action.triggered.connect(self.number_series)
+        self.toolbar.addAction(number_series_action)
         self.toolbar.addSeparator()
         self.toolbar.addSeparator() # Separator after edit group
         self.toolbar.addSeparator()
@@ -439,6 +648,9 @@ class EditWindow(QDialog):
         add_7_days_action = QAction("Datum +7", self)
         add_7_days_action.triggered.connect(lambda: self.shift_dates(7))
         self.toolbar.addAction(add_7_days_action)
+        shift_dates_action = QAction("Pomakni datume...", self)
+        shift_dates_action.triggered.connect(self.open_shift_dates_dialog)
+        self.toolbar.addAction(shift_dates_action)
         self.toolbar.addSeparator()      
         self.toolbar.addSeparator()  
         self.toolbar.addSeparator()
@@ -452,8 +664,29 @@ class EditWindow(QDialog):
         close_group.addAction(close_action)
         
     def increment_episode_number(self):
-        command = IncrementEpisodeNumberCommand(self.table_model, self.table_view)
-        self.undo_stack.push(command)  # Pass the table_view to the command
+        changes = increment_episode_changes(self.table_model._data_frame, 1, self.episode_scope_mask())
+        if len(changes):
+            self.undo_stack.push(CellChangesCommand(self.table_model, changes, "Increment Episode Number"))
+            self.status_bar.showMessage(f"Numeracija povećana u {len(changes)} redaka.", 5000)
+
+    def number_series(self):
+        changes = auto_number_series_changes(self.table_model._data_frame, self.episode_scope_mask())
+        if len(changes):
+            self.undo_stack.push(CellChangesCommand(self.table_model, changes, "Number Series"))
+        self.status_bar.showMessage(f"Numeracija serija promijenjena u {len(changes)} redaka.", 5000)
+
+    def episode_scope_mask(self):
+        """Rows the numbering tools work on: the selected rows if more than one is selected, else all visible rows."""
+        selected_rows = {index.row() for index in self.table_view.selectionModel().selectedIndexes()}
+        if len(selected_rows) > 1:
+            row_mask = np.zeros(self.table_model.data_row_count(), dtype=bool)
+            row_mask[list(selected_rows)] = True
+            return row_mask & self.visible_row_mask()
+        return self.visible_row_mask()
+
+    def visible_row_mask(self):
+        """Boolean mask over all data rows of those not hidden by the search filter."""
+        return ~self._row_hidden
         
         
     def dragEnterEvent(self, event):
@@ -490,8 +723,9 @@ class EditWindow(QDialog):
             if 'ColumnWidths' not in config:
                 config['ColumnWidths'] = {}
 
-            widths = [self.table_view.columnWidth(i) for i in range(self.table_model.columnCount())]
-            config['ColumnWidths']['widths'] = json.dumps(widths)  # Use JSON for better handling
+            # Keyed by header: the derived KRAJ column shifted the positions, so a plain list would land on the wrong columns
+            widths = {self.column_header(i): self.table_view.columnWidth(i) for i in range(self.table_model.columnCount())}
+            config['ColumnWidths']['widths_by_column'] = json.dumps(widths, ensure_ascii=False)
 
             with open(config_path, 'w') as configfile:
                 config.write(configfile)  # Write the updated config
@@ -500,162 +734,210 @@ class EditWindow(QDialog):
             print(f"Error saving column widths: {e}")
 
 
+    def column_header(self, column):
+        return str(self.table_model.headerData(column, Qt.Orientation.Horizontal))
+
     def load_column_widths(self):
         config = configparser.ConfigParser()
         config_path = os.path.join(self.excel_save_dir, "config.ini")
         if os.path.exists(config_path):
             try:
                 config.read(config_path)
-                if 'ColumnWidths' in config and 'widths' in config['ColumnWidths']:
-                    widths_str = config['ColumnWidths']['widths']
+                # Position-based 'widths' from older versions are ignored, they no longer match the columns
+                if 'ColumnWidths' in config and 'widths_by_column' in config['ColumnWidths']:
+                    widths_str = config['ColumnWidths']['widths_by_column']
                     try:
                         widths = json.loads(widths_str) # Use json.loads for deserialization
-                        if len(widths) == self.table_model.columnCount():
-                            for i, width in enumerate(widths):
+                        for i in range(self.table_model.columnCount()):
+                            width = widths.get(self.column_header(i))
+                            if isinstance(width, int) and width > 0:
                                 self.table_view.setColumnWidth(i, width)
-                    except json.JSONDecodeError:
+                    except (json.JSONDecodeError, AttributeError):
                         print("Error parsing column widths from config file.")
             except Exception as e:
                 print(f"Error loading column widths: {e}")
     
 
+    def recover_edits(self):
+        """Offers to replay the edit journal a crashed session left behind. Returns True if replayed."""
+        try:
+            records = load_journal(self.excel_file_path)
+        except OSError as e:
+            logging.warning(f"Could not read the edit journal: {e}")
+            return False
+        if not records:
+            return False
+        reply = QMessageBox.question(
+            self, "Oporavak promjena",
+            "Pronađene su nespremljene promjene iz prethodnog uređivanja ove datoteke. Želite li ih vratiti?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return False
+        self.display_df = replay_journal(self.display_df, records)
+        return True
+
+    def start_journal(self, recovered):
+        if not os.path.exists(self.excel_file_path):
+            return
+        journal = EditJournal(self.excel_file_path)
+        try:
+            if recovered:
+                journal.resume()
+            else:
+                journal.start()
+        except OSError as e:
+            logging.warning(f"Edit journal disabled: {e}")
+            return
+        self.journal = journal
+        if recovered:
+            self.table_model.state_revision = self.table_model.next_revision()  # Recovered edits aren't saved yet
+            self.status_bar.showMessage("Nespremljene promjene su vraćene.", 5000)
+
+    def write_journal(self, method, *args):
+        """Appends to the journal; if that fails, editing goes on without it."""
+        if self.journal is None:
+            return
+        try:
+            method(self.journal, *args)
+        except OSError as e:
+            logging.warning(f"Edit journal disabled: {e}")
+            self.journal.close()
+            self.journal = None
+            self.status_bar.showMessage(f"Dnevnik promjena nije dostupan: {e}", 5000)
+
+    def journal_cells(self, top, left, bottom, right):
+        right = min(right, self.table_model.stop_column - 1)  # Stop times are derived, not stored
+        if left > right:
+            return
+        df = self.table_model._data_frame
+        block = df.iloc[top:bottom + 1, left:right + 1]
+        self.write_journal(EditJournal.record_cells, top, block.columns, block.to_numpy(dtype=object))
+
+    def journal_inserted_rows(self, position, count):
+        self.write_journal(EditJournal.record_insert, position, self.table_model._data_frame.iloc[position:position + count])
+
+    def journal_removed_rows(self, position, count):
+        self.write_journal(EditJournal.record_remove, position, count)
+
+    def journal_reset(self):
+        self.write_journal(EditJournal.record_snapshot, self.table_model._data_frame)
+
+    def compact_journal(self):
+        """Folds a long journal into one snapshot in the background, so recovery stays quick."""
+        if self.journal is None or self.journal.records < self.JOURNAL_COMPACT_RECORDS:
+            return
+        if (self.compaction_thread is not None and self.compaction_thread.isRunning()) or \
+                (self.save_thread is not None and self.save_thread.isRunning()):
+            return
+        self.compaction_thread = CompactJournalThread(self.journal, self.table_model.get_data_frame(), self.journal.offset(), self)
+        self.compaction_thread.finished.connect(self.on_compaction_finished)
+        self.compaction_thread.error.connect(lambda e: logging.warning(f"Journal compaction failed: {e}"))
+        self.compaction_thread.start()
+
+    def on_compaction_finished(self, temp_path, offset, epoch):
+        if self.journal is None:
+            os.remove(temp_path)
+            return
+        try:
+            self.journal.finish_compaction(temp_path, offset, epoch)
+        except OSError as e:
+            logging.warning(f"Journal compaction failed: {e}")
+
+    def close_journal(self):
+        """Deletes the journal if everything is on disk or the changes were dropped, keeps it otherwise."""
+        self.compaction_timer.stop()
+        if self.compaction_thread is not None:
+            self.compaction_thread.wait()
+        if self.journal is None:
+            return
+        saved = self.save_thread is not None and self.save_thread.succeeded and \
+            self.save_thread.revision == self.table_model.state_revision
+        if self.discard_changes or saved or not self.table_model.has_unsaved_changes():
+            self.journal.discard()
+        else:
+            self.journal.close()
+        self.journal = None
+
     def save_as_workbook(self):
         if not self.validate_data():
             QMessageBox.warning(self, "Upozorenje", "Podaci nisu valjani. Ispravite ih prije spremanja.")
             return
 
-        new_file_name, _ = QFileDialog.getSaveFileName(
+        native_filter = f"Raspored (*{NATIVE_EXTENSION})"
+        new_file_name, selected_filter = QFileDialog.getSaveFileName(
             self,
             "Spremi kao",
             self.excel_save_dir,
-            "Excel Files (*.xlsx)"
+            f"Excel Files (*.xlsx);;{native_filter}"
         )
         
         if new_file_name:
-            if not new_file_name.endswith('.xlsx'):
-                new_file_name += '.xlsx'
-            
-            try:
-                self.save_workbook(new_file_name)
-                self.excel_file_path = new_file_name
-                self.unsaved_changes = False
-                self.data_saved.emit()
-                
-            except Exception as e:
-                self.status_bar.showMessage("Greška pri spremanju datoteke", 5000)
-                QMessageBox.critical(self, "Greška", f"Došlo je do greške pri spremanju:\n{e}")
-        self.status_bar.showMessage("Workbook je spremljen.", 5000)
-        self.unsaved_changes = False # Set to False after successful save
-        self.data_saved.emit() # Emit the signal
-
-
+            extension = NATIVE_EXTENSION if selected_filter == native_filter else '.xlsx'
+            if not new_file_name.endswith(('.xlsx', NATIVE_EXTENSION)):
+                new_file_name += extension
+            self.save_workbook(new_file_name)
 
     def save_changes(self):
+        """Saves to the open file; returns whether a save was started."""
         if not self.validate_data():
             QMessageBox.warning(self, "Upozorenje", "Podaci nisu valjani. Ispravite ih prije spremanja.")
-            return
+            return False
+        return self.save_workbook(self.excel_file_path)
 
-        try:
-            self.save_workbook(self.excel_file_path)
-            self.unsaved_changes = False
-            self.status_bar.showMessage("Promjene su uspješno spremljene.", 5000)
-            self.data_saved.emit()
-        except Exception as e:
-            QMessageBox.critical(self, "Greška", f"Došlo je do greške prilikom spremanja:\n{str(e)}")
-            
-                          
     def save_workbook(self, save_path):
-        updated_df = self.table_model.get_data_frame()
-        for col in updated_df.columns:
-            if pd.api.types.is_datetime64_any_dtype(updated_df[col]):
-                updated_df[col] = updated_df[col].dt.tz_localize(None)
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
-
-        # Write headers
-        for column in range(len(updated_df.columns)):
-            sheet.cell(row=1, column=column+1).value = updated_df.columns[column]
-            sheet.cell(row=1, column=column+1).font = Font(bold=True)
-            sheet.cell(row=1, column=column+1).alignment = Alignment(horizontal="left")
-
-        # Write data
-        for row in range(len(updated_df)):
-            for column in range(len(updated_df.columns)):
-                sheet.cell(row=row+2, column=column+1).value = updated_df.iloc[row, column]
-
-        # Adjust column widths
-        for column in sheet.columns:
-            max_length = 0
-            column = [cell for cell in column]
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(cell.value)
-                except:
-                    pass
-            adjusted_width = (max_length + 2) * 1.1
-            sheet.column_dimensions[column[0].column_letter].width = adjusted_width
-
-        # Apply table style
-        table_style = openpyxl.worksheet.table.TableStyleInfo(
-            name="TableStyleMedium9",
-            showFirstColumn=False,
-            showLastColumn=False,
-            showRowStripes=True,
-            showColumnStripes=False,
-        )
-        table = openpyxl.worksheet.table.Table(
-            ref=f"A1:{openpyxl.utils.get_column_letter(sheet.max_column)}{sheet.max_row}",
-            displayName="DiadoraTV",
-            tableStyleInfo=table_style,
-        )
-        sheet.add_table(table)
-        
-        # Add banded rows
-        light_gray_fill = PatternFill(start_color='EEEEEE', end_color='EEEEEE', fill_type='solid') # Light gray
-        for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row, min_col=1, max_col=sheet.max_column):
-            if row[0].row % 2 == 0:  # Apply to every other row starting from the second row (data rows)
-                for cell in row:
-                    cell.fill = light_gray_fill
-
-        # Add borders and alignment
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row):
-            for cell in row:
-                cell.border = thin_border
-                cell.alignment = Alignment(horizontal="left")
-
-        # Special formatting for "OPIS emisije"
-        opis_column_index = updated_df.columns.get_loc("OPIS emisije") + 1
-        for row in range(2, sheet.max_row + 1):
-            cell = sheet.cell(row=row, column=opis_column_index)
-            cell.alignment = Alignment(horizontal="left", wrap_text=True)
-
-        workbook.save(save_path)
+        """Starts saving a snapshot of the table in the background; editing stays possible meanwhile.
+
+        Returns False, without saving, if another save is still running.
+        """
+        if self.save_thread is not None and self.save_thread.isRunning():
+            self.status_bar.showMessage("Spremanje je već u tijeku.", 3000)
+            return False
+        self.save_thread = SaveWorkbookThread(self.table_model.get_data_frame(), save_path, self.table_model.state_revision, self)
+        self.save_journal_offset = self.journal.offset() if self.journal is not None else None
+        self.save_thread.progress.connect(self.on_save_progress)
+        self.save_thread.finished.connect(self.on_save_finished)
+        self.save_thread.error.connect(self.on_save_error)
+        self.save_thread.traced.connect(lambda trace: self.status_bar.showMessage(trace.summary(), 15000))
+        self.save_progress.setRange(0, 0)  # Busy until the first rows are written
+        self.save_progress.show()
+        self.status_bar.showMessage("Spremanje...")
+        self.save_thread.start()
+        return True
+
+    def on_save_progress(self, done, total):
+        self.save_progress.setRange(0, total)
+        self.save_progress.setValue(done)
+
+    def on_save_finished(self, save_path, revision):
+        if self.closing:
+            # Saved on close: closeEvent() waited for it and has already settled the journal
+            logging.info(f"Changes saved to {save_path} on close")
+            self.data_saved.emit()
+            return
+        self.save_progress.hide()
+        self.excel_file_path = save_path
+        self.setWindowTitle(f"UREDI RASPORED PROGRAMA - {os.path.basename(save_path)}")
+        self.table_model.mark_saved(revision)  # Edits made during the save stay unsaved
+        if self.journal is not None:
+            # Only edits made during the save are still missing from the file
+            moved = save_path if save_path != self.journal.workbook_path else None
+            self.write_journal(EditJournal.rebase, self.save_journal_offset, moved)
+        else:
+            self.start_journal(False)
         self.status_bar.showMessage("Promjene su uspješno spremljene.", 5000)
-        QMessageBox.information(self, "Uspjeh", f"Promjene su uspješno spremljene u {save_path}.")
-        self.unsaved_changes = False
-        self.table_model._original_data_frame = updated_df.copy()
-        self.undo_stack.clear()
         self.data_saved.emit()
-        
-    def on_data_changed(self, topLeft, bottomRight, roles):
-        """Handles data changes in the table view."""
-        if self.table_model.has_unsaved_changes():  # Check if data is actually different
-            self.unsaved_changes = True
-            self.status_bar.showMessage("Postoje nespremljene promjene.", 2000)  # Only show the message if there are unsaved changes
-
-        if not self.validate_data(): #add validation check
-            self.status_bar.showMessage("Podaci nisu valjani. Postoje nespremljene promjene.", 5000) #add a status bar message
+        QMessageBox.information(self, "Uspjeh", f"Promjene su uspješno spremljene u {save_path}.")
 
+    def on_save_error(self, error):
+        if self.closing:
+            # The journal was kept, so the edits are offered for recovery when the file is opened again
+            logging.error(f"Saving on close failed: {error}")
+            return
+        self.save_progress.hide()
+        self.status_bar.showMessage("Greška pri spremanju datoteke", 5000)
+        QMessageBox.critical(self, "Greška", f"Došlo je do greške prilikom spremanja:\n{error}")
 
-        self.table_view.viewport().update()  # Refresh the view regardless
-        
     def on_selection_changed(self, selected, deselected):
         indexes = self.table_view.selectedIndexes()
         if indexes:
@@ -676,73 +958,81 @@ class EditWindow(QDialog):
 
 
     def validate_data(self):
-        df = self.table_model.get_data_frame()
-        timezone = ZoneInfo("Europe/Zagreb")
-
-        try:
-            df['start'] = pd.to_datetime(df['DATE'].astype(str) + ' ' + df['START TIME'].astype(str), format='%d.%m.%Y. %H:%M', errors='raise').dt.tz_localize(timezone, ambiguous='NaT')
-            df['stop'] = df['start'].shift(-1)
-
-            last_row_index = len(df) - 1
-            last_start = df['start'].iloc[last_row_index]
-            df.loc[last_row_index, 'stop'] = last_start + timedelta(days=1, hours=7)
-
-            required_fields = ['DATE', 'START TIME', 'NAZIV EMISIJE']
-            if df[required_fields].isnull().values.any():
-                QMessageBox.warning(self, "Validation Error", "Nedostaju obvezna polja.")
-                return False
-
-            for i in range(len(df) - 1):
-                if df['start'].iloc[i] >= df['stop'].iloc[i + 1]:
-                    #Simplified warning message
-                    QMessageBox.warning(self, "Vremensko preklapanje!", f"Preklapanje vremena! Provjerite retke {i + 0} i {i + 1}")
-                    return False
-
-            return True
-
-        except (ValueError, TypeError) as e:
-            QMessageBox.warning(self, "Greška pri konverziji datuma/vremena", str(e))
-            return False
-        except Exception as e:
-            QMessageBox.critical(self, "Greška", f"Neočekivana pogreška: {e}")
+        """Checks the live validation state; nothing is re-parsed here."""
+        problems = self.validation_thread.problems(limit=1)
+        if problems:
+            row, message = problems[0]
+            self.table_model.fetch_to(row)
+            self.table_view.scrollTo(self.table_model.index(row, 0))
+            QMessageBox.warning(self, "Neispravni podaci", f"Redak {row}: {message}")
             return False
-    
-    def shift_dates(self, days):
-        try:
-            original_data = self.table_model.get_data_frame().copy()  # Store the entire DataFrame
-            command = ShiftDatesCommand(self.table_model, days, original_data) # Pass the entire DataFrame
-            self.undo_stack.push(command)
-
-          #  self.table_model.shift_dates(days)  # Perform the date shift
-            self.unsaved_changes = True
-            self.status_bar.showMessage(f"Datumi u stupcu 'DATUM' pomaknuti za {days} dana.", 5000)
-            self.table_view.viewport().update()
+        return True
 
-        except Exception as e:
-            QMessageBox.warning(self, "Greška", f"Došlo je do greške prilikom promjene datuma: {e}")
+    def revalidate_changed_rows(self, top, left, bottom, right):
+        if left == self.table_model.stop_column:
+            return  # Derived stop times, nothing the validator reads
+        self.validation_thread.update_rows(self.table_model._data_frame, np.arange(top, bottom + 1), self.table_model.start_times())
+
+    def revalidate_inserted_rows(self, position, count):
+        self._row_hidden = np.insert(self._row_hidden, position, np.zeros(count, dtype=bool))
+        self.validation_thread.insert_rows(self.table_model._data_frame, position, count, self.table_model.start_times())
+
+    def revalidate_removed_rows(self, position, count):
+        self._row_hidden = np.delete(self._row_hidden, np.arange(position, position + count))
+        self.validation_thread.remove_rows(position, count)
+
+    def revalidate_all(self):
+        self._row_hidden = np.zeros(self.table_model.data_row_count(), dtype=bool)
+        self.validation_thread.rebuild(self.table_model._data_frame, self.table_model.start_times())
+
+    def on_problems_ready(self, generation, problems):
+        if generation < self.validation_thread.generation:
+            return  # Newer edits are already queued, their result follows
+        self.refresh_problem_list(problems)
+
+    def on_validation_error(self, error):
+        self.status_bar.showMessage(f"Greška pri provjeri podataka: {error}", 5000)
+
+    def refresh_problem_list(self, problems):
+        """Shows the current validation problems in the side panel."""
+        self.problem_list.clear()
+        for row, message in problems:
+            item = QListWidgetItem(f"Redak {row}: {message}")
+            item.setData(Qt.ItemDataRole.UserRole, row)
+            self.problem_list.addItem(item)
+
+    def on_problem_clicked(self, item):
+        row = item.data(Qt.ItemDataRole.UserRole)
+        self.table_model.fetch_to(row)
+        index = self.table_model.index(row, 0)
+        self.table_view.scrollTo(index, QTableView.ScrollHint.PositionAtCenter)
+        self.table_view.setCurrentIndex(index)
+
+    def shift_dates(self, days, row_mask=None, date_from=None, date_to=None):
+        changes = shift_date_changes(self.table_model._data_frame, days, row_mask, date_from, date_to)
+        if not len(changes):
+            self.status_bar.showMessage("Nema datuma za pomicanje.", 5000)
+            return
+        self.undo_stack.push(CellChangesCommand(self.table_model, changes, f"Shift Dates by {days} days"))
+        self.status_bar.showMessage(f"Datumi u stupcu 'DATUM' pomaknuti za {days} dana ({len(changes)} redaka).", 5000)
 
-                                 
-    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
-        if index.isValid() and role == Qt.ItemDataRole.EditRole:
-            row = index.row()
-            col = index.column()
-            old_value = self._data_frame.iloc[row, col]
-            if str(old_value) != str(value):
-                command = EditCommand(self, index, old_value, value)
-                self.undo_stack.push(command)
-                self._data_frame.iloc[row, col] = value
-                self.dataChanged.emit(index, index, [role])
-                self.on_data_changed(index, index, [role]) # Added
-                return True
-        return False
+    def open_shift_dates_dialog(self):
+        selected_rows = {index.row() for index in self.table_view.selectionModel().selectedIndexes()}
+        dialog = ShiftDatesDialog(bool(selected_rows), self)
+        if not dialog.exec():
+            return
+        row_mask = None
+        if dialog.scope() == 'selection':
+            row_mask = np.zeros(self.table_model.data_row_count(), dtype=bool)
+            row_mask[list(selected_rows)] = True
+        date_from, date_to = dialog.date_range()
+        self.shift_dates(dialog.days(), row_mask, date_from, date_to)
 
-    
     def add_row(self):
         current_row = self.table_view.currentIndex().row()
         if current_row == -1:
-            current_row = self.table_model.rowCount()
+            current_row = self.table_model.data_row_count()
         self.table_model.insertRows(current_row)
-        self.unsaved_changes = True
 
     def delete_row(self):
         current_row = self.table_view.currentIndex().row()
@@ -753,63 +1043,93 @@ class EditWindow(QDialog):
             )
             if reply == QMessageBox.StandardButton.Yes:
                 self.table_model.removeRows(current_row)
-                self.unsaved_changes = True
         else:
             QMessageBox.warning(self, "Upozorenje", "Niste odabrali red za brisanje.")
 
     def search(self, text):
-        # Store initial state (scroll position and selection)
-        initial_scroll = self.table_view.verticalScrollBar().value()
+        """Hides rows that don't contain `text` in any column; an empty text shows all rows."""
         initial_selection = self.table_view.currentIndex()
+        df = self.table_model._data_frame
+
+        if text:
+            needle = text.lower()
+            matches = np.zeros(len(df), dtype=bool)
+            for column in df.columns:
+                matches |= df[column].astype('string').str.lower().str.contains(needle, regex=False).fillna(False).to_numpy(dtype=bool)
+            found = np.flatnonzero(matches)
+            if len(found):
+                self.table_model.fetch_to(int(found[-1]))  # Make every match reachable in the view
+            self.set_row_filter(~matches)
+        else:
+            self.set_row_filter(np.zeros(len(df), dtype=bool))
+            # Search cleared: go back to the selected row, or to the top
+            if initial_selection.isValid():
+                self.table_view.setCurrentIndex(initial_selection)
+                self.table_view.scrollTo(initial_selection, QTableView.ScrollHint.PositionAtCenter)
+            else:
+                self.table_view.scrollToTop()
+
+    def set_row_filter(self, hidden):
+        """Applies a new hidden-row mask, touching only fetched rows whose state changes."""
+        fetched = self.table_model.rowCount()
+        changed = np.flatnonzero(hidden[:fetched] != self._row_hidden[:fetched])
+        self._row_hidden = hidden
+        for row in changed:
+            self.table_view.setRowHidden(int(row), bool(hidden[row]))
+
+    def apply_row_filter(self, first, last):
+        """Hides newly fetched rows that the active search filters out."""
+        for row in np.flatnonzero(self._row_hidden[first:last + 1]):
+            self.table_view.setRowHidden(first + int(row), True)
+
+    def selected_block(self):
+        """Returns (rows, columns) covered by the selection, without hidden rows and the stop column."""
+        indexes = self.table_view.selectionModel().selectedIndexes()
+        rows = np.unique([index.row() for index in indexes]).astype(np.int64)
+        rows = rows[~self._row_hidden[rows]]
+        columns = sorted({index.column() for index in indexes if index.column() != self.table_model.stop_column})
+        return rows, columns
+
+    def copy_selection(self):
+        """Copies the selected cells to the clipboard as tab-separated text."""
+        rows, columns = self.selected_block()
+        if not len(rows) or not columns:
+            return
+        block = self.table_model._data_frame.iloc[rows, columns].astype(str)
+        QApplication.clipboard().setText('\n'.join('\t'.join(row) for row in block.to_numpy()) + '\n')
 
-        # Hide/show rows based on search
-        for row in range(self.table_model.rowCount()):
-            match = any(
-                text.lower() in str(self.table_model.data(self.table_model.index(row, col), Qt.ItemDataRole.DisplayRole)).lower()
-                for col in range(self.table_model.columnCount())
-            )
-            self.table_view.setRowHidden(row, not match)
-
-        if not text:  # Search cleared
-            # Find the first visible row
-            first_visible_row = -1
-            for i in range(self.table_model.rowCount()):
-                if not self.table_view.isRowHidden(i):
-                    first_visible_row = i
-                    break
-
-            # Force a model refresh and then scroll
-            self.table_model.layoutChanged.emit()
-            self.table_view.reset()  #Crucial for re-rendering after layout changes
-
-            if first_visible_row != -1:
-                index = self.table_model.index(first_visible_row, 0)
-
-                # Calculate the center position
-                row_height = self.table_view.rowHeight(first_visible_row)
-                viewport_height = self.table_view.viewport().height()
-                visible_rows = viewport_height // row_height
-                center_row = first_visible_row - visible_rows // 2
-
-                # Bound the center row (handle cases where the center row is outside table bounds).
-                center_row = max(0, min(center_row, self.table_model.rowCount() - 1))
-
-
-                center_index = self.table_model.index(center_row, 0)  # Create index from the calculated center row
-
-                self.table_view.scrollTo(center_index, QTableView.ScrollHint.EnsureVisible)
-
+    def paste_clipboard(self):
+        """Pastes a tab-separated block from the clipboard at the current cell as one undoable edit.
 
-            else:
-                # If no visible rows, restore the initial scroll position
-                self.table_view.verticalScrollBar().setValue(initial_scroll)
+        A single copied value is written into every selected cell.
+        """
+        block = parse_tsv(QApplication.clipboard().text())
+        current = self.table_view.currentIndex()
+        if not block or not current.isValid():
+            return
+        df = self.table_model._data_frame
+        rows, columns = self.selected_block()
+        if len(block) == 1 and len(block[0]) == 1 and len(rows) and columns:
+            changes = block_changes(df, rows, columns, np.full((len(rows), len(columns)), block[0][0], dtype=object))
+        else:
+            changes = paste_changes(df, current.row(), current.column(), block)
+        self.push_cell_changes(changes, "Paste", f"Zalijepljeno u {len(changes)} ćelija.")
 
-            # Restore initial selection if valid and the row is still visible.
-            if initial_selection.isValid() and not self.table_view.isRowHidden(initial_selection.row()):
-                self.table_view.setCurrentIndex(initial_selection)
+    def fill_down(self):
+        rows, columns = self.selected_block()
+        changes = fill_down_changes(self.table_model._data_frame, rows, columns)
+        self.push_cell_changes(changes, "Fill Down", f"Ispunjeno {len(changes)} ćelija.")
 
-            self.table_view.viewport().update()
+    def fill_series(self):
+        rows, columns = self.selected_block()
+        changes = fill_series_changes(self.table_model._data_frame, rows, columns)
+        self.push_cell_changes(changes, "Fill Series", f"Ispunjeno {len(changes)} ćelija.")
 
+    def push_cell_changes(self, changes, text, message):
+        """Applies a bulk edit as a single undo entry."""
+        if len(changes):
+            self.undo_stack.push(CellChangesCommand(self.table_model, changes, text))
+        self.status_bar.showMessage(message, 5000)
 
     def find_and_replace(self):
         find_text = self.find_field.text()
@@ -819,26 +1139,36 @@ class EditWindow(QDialog):
             QMessageBox.warning(self, "Upozorenje", "Unesite tekst za pretraživanje.")
             return
 
-        original_data = self.table_model.get_data_frame().copy()  # Save original data for undo
-        command = FindReplaceCommand(self.table_model, find_text, replace_text, original_data)
-        self.undo_stack.push(command)  # Push the command onto the undo stack
-
-        updated = False
-        for row in range(self.table_model.rowCount()):
-            for col in range(self.table_model.columnCount()):
-                index = self.table_model.index(row, col)
-                cell_value = str(self.table_model.data(index, Qt.ItemDataRole.DisplayRole))
-                if find_text.lower() in cell_value.lower():  # Case-insensitive substring search
-                    if self.table_model.setData(index, replace_text, Qt.ItemDataRole.EditRole): # Crucial change for correct setData usage
-                        updated = True
-
-        if updated:
-            self.status_bar.showMessage("Zamjena izvršena.", 5000)
-            self.unsaved_changes = True # Correctly sets the unsaved_changes flag
+        columns, row_mask = self.replace_scope(self.scope_combo.currentData())
+        try:
+            changes = find_replace_changes(
+                self.table_model._data_frame, find_text, replace_text,
+                columns=columns, row_mask=row_mask,
+                case_sensitive=self.case_checkbox.isChecked(),
+                regex=self.regex_checkbox.isChecked()
+            )
+        except re.error as e:
+            QMessageBox.warning(self, "Upozorenje", f"Neispravan regularni izraz: {e}")
+            return
+
+        if len(changes):
+            self.undo_stack.push(CellChangesCommand(self.table_model, changes, "Find and Replace"))
+            self.status_bar.showMessage(f"Zamjena izvršena u {len(changes)} ćelija.", 5000)
         else:
             QMessageBox.information(self, "Obavijest", "Traženi tekst nije pronađen.")
-            
-    
+
+    def replace_scope(self, scope):
+        """Returns (columns, row_mask) for a find/replace scope: 'all', 'visible' or 'selection'."""
+        row_count = self.table_model.data_row_count()
+        if scope == 'visible':
+            return None, self.visible_row_mask()
+        if scope == 'selection':
+            indexes = self.table_view.selectionModel().selectedIndexes()
+            row_mask = np.zeros(row_count, dtype=bool)
+            row_mask[[index.row() for index in indexes]] = True
+            columns = sorted({index.column() for index in indexes if index.column() != self.table_model.stop_column})
+            return columns, row_mask
+        return None, None
 
     def open_context_menu(self, position):
         menu = QMenu()
@@ -857,6 +1187,27 @@ class EditWindow(QDialog):
 
         menu.addSeparator()
 
+        copy_action = QAction("Kopiraj", self)
+        copy_action.setShortcut(QKeySequence.StandardKey.Copy)
+        copy_action.triggered.connect(self.copy_selection)
+        menu.addAction(copy_action)
+
+        paste_action = QAction("Zalijepi", self)
+        paste_action.setShortcut(QKeySequence.StandardKey.Paste)
+        paste_action.triggered.connect(self.paste_clipboard)
+        menu.addAction(paste_action)
+
+        fill_down_action = QAction("Ispuni prema dolje", self)
+        fill_down_action.setShortcut(QKeySequence("Ctrl+D"))
+        fill_down_action.triggered.connect(self.fill_down)
+        menu.addAction(fill_down_action)
+
+        fill_series_action = QAction("Ispuni niz", self)
+        fill_series_action.triggered.connect(self.fill_series)
+        menu.addAction(fill_series_action)
+
+        menu.addSeparator()
+
         undo_action = QAction("Poništi", self)
         undo_action.triggered.connect(self.undo_stack.undo)
         menu.addAction(undo_action)
@@ -869,15 +1220,24 @@ class EditWindow(QDialog):
         
     def eventFilter(self, obj, event):
         if obj == self.table_view and event.type() == QEvent.Type.KeyPress:
+            if event.matches(QKeySequence.StandardKey.Copy):
+                self.copy_selection()
+                return True
+            if event.matches(QKeySequence.StandardKey.Paste):
+                self.paste_clipboard()
+                return True
+            if event.key() == Qt.Key.Key_D and event.modifiers() == Qt.KeyboardModifier.ControlModifier:
+                self.fill_down()
+                return True
             if event.key() == Qt.Key.Key_Tab:
                 current_index = self.table_view.currentIndex()
                 current_row = current_index.row()
                 new_row = current_row + 1
 
-                while new_row < self.table_model.rowCount() and self.table_view.isRowHidden(new_row):
-                    new_row += 1
-
-                if new_row < self.table_model.rowCount():
+                visible = np.flatnonzero(~self._row_hidden[new_row:])
+                if len(visible):
+                    new_row += int(visible[0])
+                    self.table_model.fetch_to(new_row)
                     new_index = self.table_model.index(new_row, current_index.column())
                     self.table_view.setCurrentIndex(new_index)
                     return True  # Event handled
@@ -894,9 +1254,8 @@ class EditWindow(QDialog):
 
     def on_data_changed(self, topLeft, bottomRight, roles):
         """Handles data changes in the table view."""
-        self.unsaved_changes = True  # Mark unsaved changes
-        self.status_bar.showMessage("Postoje nespremljene promjene.", 2000)
-        self.table_view.viewport().update()  # Ensure visual updated
+        if self.table_model.has_unsaved_changes():
+            self.status_bar.showMessage("Postoje nespremljene promjene.", 2000)
     
     def save_to_excel(self, file_path):
         df = self.table_model.get_data_frame()
@@ -912,11 +1271,20 @@ class EditWindow(QDialog):
             )
             
             if reply == QMessageBox.StandardButton.Yes:
-                self.save_changes()
-                event.accept()
+                if self.save_changes():
+                    event.accept()
+                else:
+                    event.ignore()  # Nothing was saved; keep the editor open so the edits aren't lost
             elif reply == QMessageBox.StandardButton.No:
+                self.discard_changes = True
                 event.accept()
             else:
                 event.ignore()
         else:
             event.accept()
+        if event.isAccepted():
+            self.closing = True
+            if self.save_thread is not None:
+                self.save_thread.wait()  # Never abandon a save half way
+            self.validation_thread.stop()
+            self.close_journal()
@@ -0,0 +1,127 @@
+# app/library_workers.py
+"""Background threads of the main window's schedule library.
+
+They start with the window, so this module stays free of pandas: the
+threads import the schedule readers when they get their first file.
+"""
+
+import logging
+import os
+import threading
+from collections import deque
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from utils.schedule_cache import file_stamp
+
+
+class LibraryIndexThread(QThread):
+    """Extracts schedule metadata for the library index, one file at a time.
+
+    Files are queued with add(); the thread only reads them and reports
+    each result, the index itself is written by the GUI thread.
+    """
+    extracted = pyqtSignal(str, object, object, object)  # file name, size, mtime_ns (past 32 bits), metadata
+    error = pyqtSignal(Exception)
+
+    def __init__(self, directory, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self._queue = deque()
+        self._stopping = False
+        self._condition = threading.Condition()
+
+    def add(self, names):
+        with self._condition:
+            queued = set(self._queue)
+            self._queue.extend(name for name in names if name not in queued)
+            self._condition.notify_all()
+
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._stopping)
+                if self._stopping:
+                    return
+                name = self._queue.popleft()
+            path = os.path.join(self.directory, name)
+            try:
+                from utils.schedule_library import extract_metadata
+
+                stat = os.stat(path)
+                self.extracted.emit(name, stat.st_size, stat.st_mtime_ns, extract_metadata(path))
+            except FileNotFoundError:
+                pass  # Removed since it was queued; the next scan drops it from the index
+            except Exception as e:
+                logging.exception(f"Indexing {path} failed")
+                self.error.emit(e)
+
+
+class PrefetchThread(QThread):
+    """Parses the schedules the user is likely to open next into a ScheduleCache.
+
+    The thread runs at the lowest priority and only starts a file while it
+    isn't paused; the main window pauses it on user input and resumes it
+    once the application has been idle for a while. A file being parsed
+    when input arrives is finished first.
+    """
+    prefetched = pyqtSignal(str)  # file path
+    error = pyqtSignal(Exception)
+
+    def __init__(self, cache, timezone, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.timezone = timezone
+        self._queue = deque()
+        self._paused = True
+        self._stopping = False
+        self._condition = threading.Condition()
+
+    def prefetch(self, file_paths):
+        """Replaces the queue with `file_paths`, most wanted first."""
+        with self._condition:
+            self._queue = deque(file_paths)
+            self._condition.notify_all()
+
+    def pause(self):
+        with self._condition:
+            self._paused = True
+
+    def resume(self):
+        with self._condition:
+            self._paused = False
+            self._condition.notify_all()
+
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: (self._queue and not self._paused) or self._stopping)
+                if self._stopping:
+                    return
+                file_path = self._queue.popleft()
+            if file_path in self.cache or not self.cache.has_room():
+                continue
+            try:
+                from utils.schedule_store import load_schedule
+
+                stamp = file_stamp(file_path)
+                display_df, internal_df = load_schedule(file_path, self.timezone)
+                self.cache.put(file_path, stamp, display_df, internal_df)
+                logging.info(f"Prefetched {file_path}")
+                self.prefetched.emit(file_path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logging.warning(f"Prefetching {file_path} failed: {e}")
@@ -2,42 +2,61 @@ import os
 import sys
 import re
 import logging
-import ftplib
-import configparser
+from datetime import date
 from zoneinfo import ZoneInfo
 from PyQt6.QtWidgets import (
-    QMainWindow, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QListWidget, QListWidgetItem,
-    QProgressDialog, QScrollArea, QMessageBox, QFileDialog, QMenu, QStatusBar, QWidget,QLineEdit,QDialog, QFormLayout
+    QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTreeWidget, QTreeWidgetItem, QHeaderView,
+    QProgressDialog, QScrollArea, QMessageBox, QFileDialog, QMenu, QStatusBar, QWidget,QLineEdit,QDialog, QFormLayout,
+    QCheckBox, QDateEdit, QComboBox, QTableWidget, QTableWidgetItem, QAbstractItemView
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QFileSystemWatcher, QTimer, QDate, QEvent
 from PyQt6.QtGui import QIcon, QAction
-from lxml import etree
-import pandas as pd
-from app.edit_window import EditWindow
-from utils.excel_processor import process_excel
-from utils.xmltv_converter import dataframe_to_xmltv, validate_xmltv, download_dtd
+from app.library_workers import LibraryIndexThread, PrefetchThread
+from utils.schedule_formats import NATIVE_EXTENSION
+from utils.schedule_library import ScheduleLibrary, SEARCH_LIMIT
+from utils.schedule_cache import ScheduleCache, file_stamp
+from utils.ftp_publisher import load_ftp_credentials, save_ftp_credentials, publish_file
+from utils.instrumentation import Trace, export_chrome_trace, recent_traces, span
+
+# pandas, lxml, openpyxl and the editor are imported where they're first
+# needed (mostly on worker threads) so that the window paints without them
+
+
 
 
 class LoadExcelThread(QThread):
-    finished = pyqtSignal(pd.DataFrame, pd.DataFrame, str)
+    finished = pyqtSignal(object, object, str)  # display_df, internal_df, file path
     error = pyqtSignal(Exception)
+    traced = pyqtSignal(object)  # Trace of the run, after finished or error
 
-    def __init__(self, file_path, timezone):
+    def __init__(self, file_path, timezone, cache=None):
         super().__init__()
         self.file_path = file_path
         self.timezone = timezone
+        self.cache = cache
 
     def run(self):
+        trace = Trace("Učitavanje", file=os.path.basename(self.file_path))
         try:
-            display_df, internal_df = process_excel(self.file_path, self.timezone)
+            with trace.activate():
+                from utils.schedule_store import load_schedule
+
+                stamp = file_stamp(self.file_path)
+                display_df, internal_df = load_schedule(self.file_path, self.timezone)
+                if self.cache is not None:
+                    with span('cache'):
+                        self.cache.put(self.file_path, stamp, display_df.copy(), internal_df.copy())
             self.finished.emit(display_df, internal_df, self.file_path)
         except Exception as e:
             self.error.emit(e)
+        finally:
+            self.traced.emit(trace)
 
 
 class SaveXMLTVThread(QThread):
     finished = pyqtSignal(str)
     error = pyqtSignal(Exception)
+    traced = pyqtSignal(object)  # Trace of the run, after finished or error
 
     def __init__(self, display_df, internal_df, save_path):
         super().__init__()
@@ -46,24 +65,25 @@ class SaveXMLTVThread(QThread):
         self.save_path = save_path
 
     def run(self):
+        trace = Trace("Spremanje XMLTV", file=os.path.basename(self.save_path))
         try:
-            xml_tree = dataframe_to_xmltv(self.display_df, self.internal_df, self.parent().TIMEZONE)
-            xml_str = etree.tostring(xml_tree, pretty_print=True, encoding='UTF-8', xml_declaration=True)
-            dtd_path = 'resources/xmltv.dtd'
-
-            if not os.path.exists(dtd_path):
-                download_dtd(dtd_path)
-
-            validate_xmltv(etree.ElementTree(etree.fromstring(xml_str)), dtd_path)
+            with trace.activate():
+                from utils.pipeline import write_xmltv
 
-            with open(self.save_path, 'wb') as f:
-                f.write(xml_str)
+                write_xmltv(self.display_df, self.internal_df, self.save_path, self.parent().TIMEZONE)
             self.finished.emit(self.save_path)
         except Exception as e:
             self.error.emit(e)
+        finally:
+            self.traced.emit(trace)
 
 
 class ExcelToXMLTVApp(QMainWindow):
+    PREFETCH_COUNT = 5  # Schedules kept ready for opening
+    IDLE_MS = 2000  # Quiet time before prefetching resumes
+    USER_INPUT_EVENTS = (QEvent.Type.KeyPress, QEvent.Type.MouseButtonPress, QEvent.Type.Wheel)
+    first_painted = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Excel to XMLTV Converter/Editor - DIADORA TV")
@@ -74,6 +94,7 @@ class ExcelToXMLTVApp(QMainWindow):
         self.display_df = None
         self.internal_df = None
         self.excel_file_path = None
+        self.open_editor_after_load = False
         self.xmltv_file_path = None
         self.ftp_credentials = None
         self.excel_save_dir = os.path.join(os.getcwd(), 'saved_excels')
@@ -82,43 +103,22 @@ class ExcelToXMLTVApp(QMainWindow):
         # Initialize logging
         logging.basicConfig(filename='converter.log', level=logging.INFO, 
                             format='%(asctime)s - %(levelname)s - %(message)s')
-        
+
+        self.init_library()
 
         self.init_ui()
         self.create_status_bar()
         self.create_menu()
+        # The library is listed once the window is on screen
+        self.painted = False
+        self.first_painted.connect(lambda: QTimer.singleShot(0, self.refresh_library))
         self.load_default_ftp_credentials()
         self.load_ftp_credentials() # Load saved FTP credentials after loading defaults
 
 
     def load_default_ftp_credentials(self):
         """Load FTP credentials from config.ini."""
-        self.default_ftp_credentials = {
-            'host': '',
-            'username': '',
-            'password': '',
-            'port': 21
-        }
-        config_path = os.path.join(self.excel_save_dir, 'config.ini')
-
-        if not os.path.exists(config_path):
-            logging.warning(f"Config file {config_path} not found. Using default FTP credentials.")
-            return
-
-        try:
-            config = configparser.ConfigParser()
-            config.read(config_path)
-
-            if 'FTP' in config:
-                self.default_ftp_credentials.update({
-                    'host': config['FTP'].get('host', ''),
-                    'username': config['FTP'].get('username', ''),
-                    'password': config['FTP'].get('password', ''),
-                    'port': config['FTP'].getint('port', 21),
-                })
-            logging.info(f"Loaded FTP credentials from {config_path}: {self.default_ftp_credentials}")
-        except Exception as e:
-            logging.error(f"Error loading config file {config_path}: {e}")
+        self.default_ftp_credentials = load_ftp_credentials(os.path.join(self.excel_save_dir, 'config.ini'))
             
     def convert_time_format(time_str):
         """Converts time string from HH.mm to HH:mm format."""
@@ -164,15 +164,132 @@ class ExcelToXMLTVApp(QMainWindow):
         self.message.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(self.message)
 
-        self.excel_list_widget = QListWidget()
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Spremljene Excel datoteke:"))
+        filter_layout.addStretch()
+        self.date_filter_checkbox = QCheckBox("Razdoblje od")
+        self.date_filter_checkbox.toggled.connect(self.load_excel_file_list)
+        filter_layout.addWidget(self.date_filter_checkbox)
+        self.date_from_edit = QDateEdit(QDate.currentDate())
+        self.date_to_edit = QDateEdit(QDate.currentDate().addDays(6))
+        for date_edit in (self.date_from_edit, self.date_to_edit):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("dd.MM.yyyy")
+            date_edit.dateChanged.connect(self.on_date_filter_changed)
+        filter_layout.addWidget(self.date_from_edit)
+        filter_layout.addWidget(QLabel("do"))
+        filter_layout.addWidget(self.date_to_edit)
+        self.sort_combo = QComboBox()
+        for label, order in (("Po nazivu", 'name'), ("Po datumu emitiranja", 'date'), ("Po izmjeni", 'modified')):
+            self.sort_combo.addItem(label, order)
+        self.sort_combo.currentIndexChanged.connect(self.load_excel_file_list)
+        filter_layout.addWidget(self.sort_combo)
+        main_layout.addLayout(filter_layout)
+
+        self.excel_list_widget = QTreeWidget()
+        self.excel_list_widget.setHeaderLabels(["Datoteka", "Razdoblje", "Emisija", "Kanal"])
+        self.excel_list_widget.setRootIsDecorated(False)
+        self.excel_list_widget.setUniformRowHeights(True)
+        self.excel_list_widget.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.excel_list_widget.header().setStretchLastSection(False)
         self.excel_list_widget.itemDoubleClicked.connect(self.open_excel_file)
         self.excel_list_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.excel_list_widget.customContextMenuRequested.connect(self.open_excel_context_menu)
-        main_layout.addWidget(QLabel("Spremljene Excel datoteke:"))
         main_layout.addWidget(self.excel_list_widget)
 
+    def init_library(self):
+        """Opens the index of saved schedules and keeps it in sync with the folder.
+
+        The folder watcher only triggers a scan, which compares sizes and
+        modification times with the index; new or changed files are read
+        for their metadata on a background thread.
+        """
+        self.library = ScheduleLibrary(self.excel_save_dir)
+
+        self.library_thread = LibraryIndexThread(self.excel_save_dir, parent=self)
+        self.library_thread.extracted.connect(self.on_library_file_indexed)
+        self.library_thread.start()
+
+        # Saves and copies touch the folder several times in a row; scan once they settle
+        self.library_scan_timer = QTimer(self)
+        self.library_scan_timer.setSingleShot(True)
+        self.library_scan_timer.setInterval(300)
+        self.library_scan_timer.timeout.connect(self.refresh_library)
+
+        # Files indexed in a burst refresh the list once
+        self.library_list_timer = QTimer(self)
+        self.library_list_timer.setSingleShot(True)
+        self.library_list_timer.setInterval(200)
+        self.library_list_timer.timeout.connect(self.load_excel_file_list)
+        self.library_list_timer.timeout.connect(self.refresh_conflicts)
+
+        # Overlaps and gaps between files, updated per changed file; created by refresh_conflicts()
+        self.library_conflicts = None
+
+        self.library_watcher = QFileSystemWatcher([self.excel_save_dir], self)
+        self.library_watcher.directoryChanged.connect(self.library_scan_timer.start)
+
+        # Recently used schedules are parsed ahead of time whenever the user is idle
+        self.schedule_cache = ScheduleCache()
+        self.prefetch_thread = PrefetchThread(self.schedule_cache, self.TIMEZONE, parent=self)
+        self.prefetch_thread.start(QThread.Priority.LowestPriority)
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(self.IDLE_MS)
+        self.idle_timer.timeout.connect(self.prefetch_thread.resume)
+        self.idle_timer.start()
+        QApplication.instance().installEventFilter(self)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            self.first_painted.emit()
+
+    def eventFilter(self, watched, event):
+        if event.type() in self.USER_INPUT_EVENTS:
+            self.prefetch_thread.pause()
+            self.idle_timer.start()
+        return super().eventFilter(watched, event)
+
+    def refresh_library(self):
+        stale = self.library.scan()
+        if stale:
+            self.library_thread.add(stale)
         self.load_excel_file_list()
-        
+        self.refresh_conflicts()
+        self.schedule_prefetch()
+
+    def on_library_file_indexed(self, file_name, size, mtime_ns, metadata):
+        self.library.update(file_name, size, mtime_ns, metadata)
+        self.library_list_timer.start()
+        self.schedule_prefetch()
+
+    def refresh_conflicts(self):
+        if self.library_conflicts is None:
+            from utils.schedule_conflicts import LibraryConflicts
+
+            self.library_conflicts = LibraryConflicts(self.library)
+        if not self.library_conflicts.refresh():
+            return
+        count = len(self.library_conflicts.conflicts())
+        self.conflict_label.setText(f"Sukobi među datotekama: {count}" if count else "")
+
+    def schedule_prefetch(self):
+        self.prefetch_thread.prefetch([os.path.join(self.excel_save_dir, name)
+                                       for name in self.library.recent_files(self.PREFETCH_COUNT)])
+
+    def on_date_filter_changed(self):
+        if self.date_filter_checkbox.isChecked():
+            self.load_excel_file_list()
+
+    def closeEvent(self, event):
+        QApplication.instance().removeEventFilter(self)
+        self.prefetch_thread.stop()
+        self.library_thread.stop()
+        self.library.close()
+        super().closeEvent(event)
+
     def enter_ftp_credentials(self):
         """Open the FTP credentials dialog and save credentials if modified."""
         dialog = FTPCredentialsDialog(self.default_ftp_credentials, self)
@@ -185,37 +302,11 @@ class ExcelToXMLTVApp(QMainWindow):
             QMessageBox.information(self, "Uspjeh", "FTP podaci su uspješno spremljeni.")
             
     def load_ftp_credentials(self):
-        config_path = os.path.join(self.excel_save_dir, 'config.ini')
         self.ftp_credentials = self.default_ftp_credentials.copy() # Start with defaults
 
-        if os.path.exists(config_path):
-            config = configparser.ConfigParser()
-            try:
-                config.read(config_path)
-                if 'FTP' in config:
-                    self.ftp_credentials.update({
-                        'host': config['FTP'].get('host', ''),
-                        'username': config['FTP'].get('username', ''),
-                        'password': config['FTP'].get('password', ''),
-                        'port': config['FTP'].getint('port', 21),
-                    })
-                    logging.info(f"Loaded FTP credentials from {config_path}: {self.ftp_credentials}")
-            except Exception as e:
-                logging.error(f"Error loading config file {config_path}: {e}. Using default credentials.")
-
     def save_ftp_credentials(self):
         """Save the FTP credentials to config.ini."""
-        config = configparser.ConfigParser()
-        config['FTP'] = {
-            'host': self.ftp_credentials['host'],
-            'username': self.ftp_credentials['username'],
-            'password': self.ftp_credentials['password'],
-            'port': str(self.ftp_credentials['port']),
-        }
-        config_path = os.path.join(self.excel_save_dir, 'config.ini')
-        with open(config_path, 'w') as configfile:
-            config.write(configfile)
-        logging.info(f"FTP credentials saved to {config_path}")
+        save_ftp_credentials(os.path.join(self.excel_save_dir, 'config.ini'), self.ftp_credentials)
 
     def create_menu(self):
         menubar = self.menuBar()
@@ -233,6 +324,19 @@ class ExcelToXMLTVApp(QMainWindow):
         file_menu.addAction(save_action)
         self.save_action = save_action
 
+        search_action = QAction('Pretraži arhivu', self)
+        search_action.setShortcut('Ctrl+Shift+F')
+        search_action.triggered.connect(self.search_archive)
+        file_menu.addAction(search_action)
+
+        conflicts_action = QAction('Sukobi među datotekama', self)
+        conflicts_action.triggered.connect(self.show_conflicts)
+        file_menu.addAction(conflicts_action)
+
+        timings_action = QAction('Izvezi mjerenja vremena (Chrome trace)', self)
+        timings_action.triggered.connect(self.export_timings)
+        file_menu.addAction(timings_action)
+
         exit_action = QAction('Izlaz', self)
         exit_action.setShortcut('Ctrl+Q')
         exit_action.triggered.connect(self.close)
@@ -267,20 +371,60 @@ class ExcelToXMLTVApp(QMainWindow):
     def create_status_bar(self):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
+        self.conflict_label = QLabel("")
+        self.status_bar.addPermanentWidget(self.conflict_label)
         self.status_bar.showMessage('Spreman za rad')
 
     def load_excel_file_list(self):
+        """Fills the file list from the library index, filtered and sorted as chosen above it."""
+        date_from = date_to = None
+        if self.date_filter_checkbox.isChecked():
+            date_from = self.date_from_edit.date().toPyDate()
+            date_to = self.date_to_edit.date().toPyDate()
+        entries = self.library.entries(date_from, date_to, self.sort_combo.currentData())
+
+        current = self.excel_list_widget.currentItem()
+        current_name = current.text(0) if current else None
         self.excel_list_widget.clear()
-        if os.path.exists(self.excel_save_dir):
-            for file_name in os.listdir(self.excel_save_dir):
-                if file_name.endswith(('.xlsx', '.xls')):
-                    self.excel_list_widget.addItem(QListWidgetItem(file_name))
-
-    def load_excel(self, file_path=None):
+        items = []
+        for entry in entries:
+            if entry['hash'] is None:
+                period, rows = "indeksiranje...", ""
+            elif entry['error']:
+                period, rows = "nečitljivo", ""
+            elif entry['first_date']:
+                first, last = (date.fromisoformat(entry[key]).strftime('%d.%m.%Y') for key in ('first_date', 'last_date'))
+                period, rows = f"{first} – {last}", str(entry['row_count'])
+            else:
+                period, rows = "bez emisija", "0"
+            item = QTreeWidgetItem([entry['name'], period, rows, entry['channel'] or ""])
+            item.setTextAlignment(2, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            if entry['error']:
+                item.setToolTip(1, entry['error'])
+            items.append(item)
+        self.excel_list_widget.addTopLevelItems(items)
+        for column in range(1, 4):
+            self.excel_list_widget.resizeColumnToContents(column)
+        for item in items:
+            if item.text(0) == current_name:
+                self.excel_list_widget.setCurrentItem(item)
+                break
+
+    def load_excel(self, file_path=None, open_editor=False):
+        """Loads a schedule, from the prefetch cache when it's there; optionally opens the editor afterwards."""
         if not file_path:
-            file_path, _ = QFileDialog.getOpenFileName(self, "Odaberi Excel datoteku", self.excel_save_dir, "Excel datoteke (*.xlsx *.xls)") # Directly open file dialog
+            file_path, _ = QFileDialog.getOpenFileName(
+                self, "Odaberi Excel datoteku", self.excel_save_dir,
+                f"Rasporedi (*.xlsx *.xls *{NATIVE_EXTENSION});;Excel datoteke (*.xlsx *.xls);;Raspored (*{NATIVE_EXTENSION})"
+            )
         if file_path:
             self.excel_file_path = file_path
+            self.open_editor_after_load = open_editor
+            cached = self.schedule_cache.get(file_path)
+            if cached is not None:
+                logging.info(f"Opened {file_path} from the prefetch cache")
+                self.on_schedule_loaded(*cached, file_path)
+                return
             self.progress_dialog = QProgressDialog("Učitavanje Excel datoteke...", "Prekid", 0, 0, self)
             self.progress_dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
             self.progress_dialog.setAutoClose(True)
@@ -288,9 +432,10 @@ class ExcelToXMLTVApp(QMainWindow):
             self.progress_dialog.setCancelButton(None)
             self.status_bar.showMessage("Učitavanje...", 3000)
 
-            self.load_thread = LoadExcelThread(file_path, self.TIMEZONE)
+            self.load_thread = LoadExcelThread(file_path, self.TIMEZONE, self.schedule_cache)
             self.load_thread.finished.connect(self.on_load_finished)
             self.load_thread.error.connect(self.on_load_error)
+            self.load_thread.traced.connect(self.show_trace)
             self.load_thread.start()
             self.progress_dialog.show()
             
@@ -317,6 +462,9 @@ class ExcelToXMLTVApp(QMainWindow):
 
     def on_load_finished(self, display_df, internal_df, file_path):
         self.progress_dialog.close()
+        self.on_schedule_loaded(display_df, internal_df, file_path)
+
+    def on_schedule_loaded(self, display_df, internal_df, file_path):
         self.display_df = display_df
         self.internal_df = internal_df
         self.excel_file_path = file_path
@@ -324,6 +472,11 @@ class ExcelToXMLTVApp(QMainWindow):
         self.save_action.setEnabled(True)
         self.save_button.setEnabled(True)
         self.edit_button.setEnabled(True)
+        if os.path.dirname(os.path.abspath(file_path)) == os.path.abspath(self.excel_save_dir):
+            self.library.mark_opened(os.path.basename(file_path))
+        if self.open_editor_after_load:
+            self.open_editor_after_load = False
+            self.edit_excel()
 
     def on_load_error(self, e):
         self.progress_dialog.close()
@@ -361,16 +514,37 @@ class ExcelToXMLTVApp(QMainWindow):
             self.save_thread.setParent(self) #Crucial line: Set the parent explicitly
             self.save_thread.finished.connect(self.on_save_finished)
             self.save_thread.error.connect(self.on_save_error)
+            self.save_thread.traced.connect(self.show_trace)
             self.save_thread.start()
 
     def edit_excel(self):
         if self.excel_file_path and self.display_df is not None:
+            from app.edit_window import EditWindow
+
             edit_window = EditWindow(self.display_df, self.internal_df, self.excel_file_path, self.excel_save_dir, self)
         edit_window.data_saved.connect(self.on_edit_window_data_saved) #Connect the signal
         edit_window.exec()
 
     def on_edit_window_data_saved(self): #New slot to handle signal
-        self.load_excel_file_list()  # Refresh file list
+        self.refresh_library()  # Refresh file list
+
+    def search_archive(self):
+        dialog = ArchiveSearchDialog(self.library, self)
+        dialog.file_requested.connect(self.open_archived_file)
+        dialog.exec()
+
+    def show_conflicts(self):
+        self.refresh_conflicts()
+        dialog = ConflictsDialog(self.library_conflicts.conflicts(), self)
+        dialog.file_requested.connect(self.open_archived_file)
+        dialog.exec()
+
+    def open_archived_file(self, file_name):
+        file_path = os.path.join(self.excel_save_dir, file_name)
+        if os.path.exists(file_path):
+            self.load_excel(file_path)
+        else:
+            QMessageBox.warning(self, "Upozorenje", "Odabrana datoteka ne postoji.")
 
     def upload_to_ftp(self):
         if not self.xmltv_file_path:
@@ -384,22 +558,40 @@ class ExcelToXMLTVApp(QMainWindow):
             if not self.ftp_credentials:
                 return #Exit if still not available
 
+        trace = Trace("Slanje na FTP", file=os.path.basename(self.xmltv_file_path))
         try:
-            ftp = ftplib.FTP()
-            ftp.connect(self.ftp_credentials['host'], self.ftp_credentials['port'])
-            ftp.login(self.ftp_credentials['username'], self.ftp_credentials['password'])
-            with open(self.xmltv_file_path, 'rb') as file:
-                ftp.storbinary(f"STOR {os.path.basename(self.xmltv_file_path)}", file)
-            ftp.quit()
+            with trace.activate(), span('publish'):
+                publish_file(self.xmltv_file_path, self.ftp_credentials)
+            self.show_trace(trace)
             QMessageBox.information(self, "Uspjeh", "XMLTV datoteka je uspješno poslana na FTP server.")
         except Exception as e:
+            self.show_trace(trace)
             QMessageBox.critical(self, "Greška", f"Greška pri slanju na FTP: {e}")
 
+    def show_trace(self, trace):
+        """Shows how long the steps of a load, save or upload took."""
+        self.status_bar.showMessage(trace.summary(), 15000)
+
+    def export_timings(self):
+        traces = recent_traces()
+        if not traces:
+            QMessageBox.information(self, "Mjerenja", "Još nema zabilježenih mjerenja.")
+            return
+        save_path, _ = QFileDialog.getSaveFileName(self, "Izvezi mjerenja vremena", self.excel_save_dir,
+                                                   "Chrome trace (*.json)")
+        if save_path:
+            try:
+                count = export_chrome_trace(save_path, traces)
+            except OSError as e:
+                QMessageBox.critical(self, "Greška", f"Greška pri izvozu mjerenja: {e}")
+                return
+            self.status_bar.showMessage(f"Izvezeno {count} mjerenja u {save_path}", 5000)
+
     def open_excel_file(self, item):
-        file_name = item.text()
+        file_name = item.text(0)
         file_path = os.path.join(self.excel_save_dir, file_name)
         if os.path.exists(file_path):
-            self.load_excel(file_path)
+            self.load_excel(file_path, open_editor=True)
 
     def open_excel_context_menu(self, position):
         """Open a context menu on right-click for the Excel list."""
@@ -427,7 +619,7 @@ class ExcelToXMLTVApp(QMainWindow):
         """Opens the folder containing the saved Excel files."""
         item = self.excel_list_widget.currentItem()
         if item:
-            file_name = item.text()
+            file_name = item.text(0)
             file_path = os.path.join(self.excel_save_dir, file_name)
             if os.path.exists(file_path):
                 try:
@@ -444,7 +636,7 @@ class ExcelToXMLTVApp(QMainWindow):
         """Load the selected Excel file."""
         item = self.excel_list_widget.currentItem()
         if item:
-            file_name = item.text()
+            file_name = item.text(0)
             file_path = os.path.join(self.excel_save_dir, file_name)
             if os.path.exists(file_path):
                 # Call the load_excel function for the selected file
@@ -458,7 +650,7 @@ class ExcelToXMLTVApp(QMainWindow):
         """Delete the selected Excel file."""
         item = self.excel_list_widget.currentItem()
         if item:
-            file_name = item.text()
+            file_name = item.text(0)
             file_path = os.path.join(self.excel_save_dir, file_name)
             reply = QMessageBox.question(
                 self,
@@ -469,7 +661,7 @@ class ExcelToXMLTVApp(QMainWindow):
             if reply == QMessageBox.StandardButton.Yes:
                 try:
                     os.remove(file_path)
-                    self.load_excel_file_list()  # Refresh the list
+                    self.refresh_library()  # Refresh the list
                     QMessageBox.information(self, "Obavijest", f"Datoteka '{file_name}' je uspješno obrisana.")
                 except Exception as e:
                     QMessageBox.critical(self, "Greška", f"Došlo je do greške prilikom brisanja datoteke:\n{e}")
@@ -489,6 +681,9 @@ class ExcelToXMLTVApp(QMainWindow):
         <h2>3. Glavni prozor:</h2>
         <p><b>Odabir datoteke:</b> Glavni prozor prikazuje popis Excel datoteka pronađenih u direktoriju <code>saved_excels</code>.</p>
         <p><b>Učitavanje Excel datoteka:</b> Kliknite "Učitaj Excel" da biste otvorili dijalog za odabir datoteke ili jednostavno povucimo i ispustimo Excel datoteku (.xls, .xlsx) izravno na popis. Traka napretka pokazuje napredak učitavanja. Statusna traka će prikazati poruke o statusu učitavanja.</p>
+        <p><b>Popis datoteka:</b> Uz svaku datoteku prikazano je razdoblje koje pokriva i broj emisija. Popis se sam osvježava kad se datoteke u mapi dodaju, promijene ili obrišu. Odaberite "Razdoblje od" za prikaz samo onih datoteka koje pokrivaju zadane datume, a padajućim izbornikom odaberite redoslijed.</p>
+        <p><b>Pretraživanje arhive:</b> Meni <b>'Datoteka' > 'Pretraži arhivu'</b> (Ctrl+Shift+F) pretražuje nazive, opise, kategorije i epizode u svim spremljenim rasporedima odjednom. Rezultati su poredani od najnovijih; dvostruki klik učitava datoteku u kojoj je emisija.</p>
+        <p><b>Sukobi među datotekama:</b> Aplikacija prati vremena emisija u svim spremljenim rasporedima i javlja preklapanja, praznine dulje od minute i duplikate (ista emisija u isto vrijeme) i kad su emisije u različitim datotekama, npr. kad zadnja emisija jednog tjedna traje do 07:00, a sljedeći tjedan počinje u 06:00. Broj sukoba prikazan je u statusnoj traci, a popis u meniju <b>'Datoteka' > 'Sukobi među datotekama'</b>.</p>
         <p><b>Kontekstni izbornik Excel datoteke:</b> Desni klik na Excel datoteku na popisu pruža sljedeće opcije:</p>
         <ul>
             <li>"Učitaj Excel": Učitava odabranu Excel datoteku za uređivanje.</li>
@@ -500,8 +695,8 @@ class ExcelToXMLTVApp(QMainWindow):
         <p><b>Unos podataka:</b> Nakon učitavanja Excel datoteke, otvara se prozor za uređivanje. Možete izravno uređivati tablicu. Prilikom unosa podataka u stupac "POČETAK", jednostavno unesite sate i minute (npr. "1430"). Aplikacija automatski dodaje dvotočku.</p>
         <p><b>Dodavanje redaka:</b> Desni klik u tablici za dodavanje ili brisanje redaka ili korištenje gumba "Dodaj red" i "Obriši red" na alatnoj traci.</p>
         <p><b>Pretraživanje i zamjena:</b> Upotrijebite polja "Traži" i "Zamijeni sa" za pretraživanje i zamjenu teksta u tablici. Gumb zamijeni koristi tekst unesen u ova polja.</p>
-        <p><b>Pomicanje datuma:</b> Upotrijebite gumbe "Datum +7" i "Datum +14" za pomicanje datuma u stupcu "DATUM" za 7 ili 14 dana, redom. Funkcionalnost poništavanja/ponavljanja dostupna je pomoću gumba "Poništi" i "Ponovi".</p>
-        <p><b>Spremanje promjena:</b> Kliknite "Spremi" za spremanje promjena u trenutno otvorenu Excel datoteku ili "Spremi kao" za spremanje u novu Excel datoteku. Aplikacija provjerava preklapanja vremena između programa prije spremanja. Ako se otkrije preklapanje, prikazat će se upozorenje. Ako su podaci neispravni, to će također biti otkriveno.</p>
+        <p><b>Pomicanje datuma:</b> Upotrijebite gumb "Datum +7" za pomicanje datuma u stupcu "DATUM" za 7 dana ili "Pomakni datume..." za pomak za proizvoljan broj dana (i unatrag) na svim redovima, odabranim redovima ili unutar raspona datuma. Funkcionalnost poništavanja/ponavljanja dostupna je pomoću gumba "Poništi" i "Ponovi".</p>
+        <p><b>Spremanje promjena:</b> Kliknite "Spremi" za spremanje promjena u trenutno otvorenu Excel datoteku ili "Spremi kao" za spremanje u novu Excel datoteku. U dijalogu "Spremi kao" možete odabrati i format "Raspored" (.raspored) koji se otvara i sprema puno brže od Excela; Excel ostaje za razmjenu datoteka. Aplikacija provjerava preklapanja vremena između programa prije spremanja. Ako se otkrije preklapanje, prikazat će se upozorenje. Ako su podaci neispravni, to će također biti otkriveno.</p>
 
         <h2>5. Validacija podataka:</h2>
         <p>Aplikacija provjerava preklapanja vremena između programa prije spremanja. Ako se otkrije preklapanje vremena, prikazat će se upozorenje, sprječavajući spremanje datoteka s nevažećim podacima. Također će biti otkrivena i nedostajuća obvezna polja.</p>
@@ -596,4 +791,130 @@ class FTPCredentialsDialog(QDialog):
             'username': self.username_input.text(),
             'password': self.password_input.text(),
             'port': int(self.port_input.text()) if self.port_input.text().isdigit() else 21,
-        }
\ No newline at end of file
+        }
+
+
+class ArchiveSearchDialog(QDialog):
+    """Searches the programmes of every schedule in the library as the query is typed."""
+    file_requested = pyqtSignal(str)  # file name in saved_excels
+
+    COLUMNS = [("Datum", 'date'), ("Početak", 'start_time'), ("Naziv emisije", 'title'), ("Epizoda", 'episode'),
+               ("Kategorija", 'category'), ("Opis", 'description'), ("Datoteka", 'file')]
+
+    def __init__(self, library, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Pretraživanje arhive")
+        self.resize(900, 500)
+        self.library = library
+        self.results = []
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        self.query_input = QLineEdit(self)
+        self.query_input.setPlaceholderText("Naziv, opis, kategorija ili epizoda...")
+        self.query_input.setClearButtonEnabled(True)
+        layout.addWidget(self.query_input)
+
+        # Each keystroke restarts the timer, so a query runs once typing pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.run_search)
+        self.query_input.textChanged.connect(self.search_timer.start)
+
+        self.results_table = QTableWidget(0, len(self.COLUMNS), self)
+        self.results_table.setHorizontalHeaderLabels([label for label, _ in self.COLUMNS])
+        self.results_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.results_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.results_table.verticalHeader().setVisible(False)
+        self.results_table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
+        self.results_table.cellDoubleClicked.connect(self.open_result)
+        layout.addWidget(self.results_table)
+
+        self.result_label = QLabel("")
+        layout.addWidget(self.result_label)
+
+    def run_search(self):
+        query = self.query_input.text()
+        try:
+            self.results = self.library.search(query)
+        except Exception as e:
+            logging.error(f"Archive search for {query!r} failed: {e}")
+            self.results = []
+        self.results_table.setRowCount(len(self.results))
+        for row, result in enumerate(self.results):
+            for column, (_, key) in enumerate(self.COLUMNS):
+                self.results_table.setItem(row, column, QTableWidgetItem(result[key] or ""))
+        for column in range(len(self.COLUMNS)):
+            if column != 5:  # The description stretches over the remaining width
+                self.results_table.resizeColumnToContents(column)
+        if not query.strip():
+            self.result_label.setText("")
+        elif len(self.results) >= SEARCH_LIMIT:
+            self.result_label.setText(f"Prikazano prvih {len(self.results)} rezultata, suzite pretragu.")
+        else:
+            self.result_label.setText(f"Pronađeno: {len(self.results)}")
+
+    def open_result(self, row, column):
+        self.file_requested.emit(self.results[row]['file'])
+        self.accept()
+
+
+class ConflictsDialog(QDialog):
+    """Lists overlaps, gaps and duplicates found across the saved schedules."""
+    file_requested = pyqtSignal(str)  # file name in saved_excels
+
+    ROW_LIMIT = 2000
+
+    def __init__(self, conflicts, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Sukobi među datotekama")
+        self.resize(1000, 500)
+        self.conflicts = conflicts[:self.ROW_LIMIT]
+        self.init_ui(len(conflicts))
+
+    def init_ui(self, total):
+        import pandas as pd
+
+        from utils.schedule_conflicts import DUPLICATE, GAP, OVERLAP
+
+        kind_labels = {OVERLAP: "Preklapanje", GAP: "Praznina", DUPLICATE: "Duplikat"}
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        self.conflicts_table = QTableWidget(len(self.conflicts), 7, self)
+        self.conflicts_table.setHorizontalHeaderLabels(
+            ["Vrsta", "Od", "Do", "Datoteka", "Emisija", "Sljedeća datoteka", "Sljedeća emisija"]
+        )
+        self.conflicts_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.conflicts_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.conflicts_table.verticalHeader().setVisible(False)
+        for row, conflict in enumerate(self.conflicts):
+            values = [
+                kind_labels[conflict.kind],
+                pd.Timestamp(conflict.start_ns).strftime('%d.%m.%Y. %H:%M'),
+                pd.Timestamp(conflict.stop_ns).strftime('%d.%m.%Y. %H:%M'),
+                conflict.first[0], str(conflict.first[2] or ""),
+                conflict.second[0], str(conflict.second[2] or ""),
+            ]
+            for column, value in enumerate(values):
+                self.conflicts_table.setItem(row, column, QTableWidgetItem(value))
+        self.conflicts_table.resizeColumnsToContents()
+        self.conflicts_table.cellDoubleClicked.connect(self.open_conflict)
+        layout.addWidget(self.conflicts_table)
+
+        if not total:
+            text = "Nema sukoba među spremljenim rasporedima."
+        elif total > len(self.conflicts):
+            text = f"Prikazano prvih {len(self.conflicts)} od {total} sukoba."
+        else:
+            text = f"Sukoba: {total}. Dvostruki klik učitava datoteku u kojoj je emisija."
+        layout.addWidget(QLabel(text))
+
+    def open_conflict(self, row, column):
+        conflict = self.conflicts[row]
+        self.file_requested.emit(conflict.first[0] if column in (3, 4) else conflict.second[0])
+        self.accept()
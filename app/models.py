@@ -1,11 +1,95 @@
 # app/models.py
 
+from contextlib import contextmanager
 from PyQt6.QtCore import QAbstractTableModel, Qt, QModelIndex, QVariant
 from PyQt6.QtGui import QBrush, QColor
 import pandas as pd
 import logging
 
-class PandasModel(QAbstractTableModel):
+
+class BatchedUpdatesMixin:
+    """Coalesces dataChanged signals of a table model.
+
+    Code that changes cells calls `notify_changed()` instead of emitting
+    dataChanged itself. Outside a batch the signal goes out immediately.
+    Inside `with model.batch_updates():` the touched ranges are collected
+    and merged at the end, so a bulk operation repaints and runs connected
+    slots once, not per cell. `_cells_changed()` gets the exact merged
+    ranges, for subclasses that act on the changed data; only the repaint
+    may widen them to one bounding range.
+    """
+    MAX_BATCH_RANGES = 16  # Past this many separate ranges, one bounding range is cheaper to repaint
+
+    _batch_depth = 0
+    _pending_ranges = None
+
+    @contextmanager
+    def batch_updates(self):
+        if self._batch_depth == 0:
+            self._pending_ranges = []
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                ranges, self._pending_ranges = self._pending_ranges, None
+                merged = self.coalesce_ranges(ranges)
+                for top, left, bottom, right in merged:
+                    self._cells_changed(top, left, bottom, right)
+                for top, left, bottom, right in self.coalesce_ranges(merged, self.MAX_BATCH_RANGES):
+                    self._emit_changed(top, left, bottom, right)
+
+    def notify_changed(self, top, left, bottom, right):
+        """Reports that cells in the given inclusive range changed."""
+        if self._batch_depth:
+            self._pending_ranges.append((top, left, bottom, right))
+        else:
+            self._cells_changed(top, left, bottom, right)
+            self._emit_changed(top, left, bottom, right)
+
+    def _cells_changed(self, top, left, bottom, right):
+        """Called once per exactly changed range, before the repaint. Does nothing here."""
+
+    def _emit_changed(self, top, left, bottom, right):
+        # Rows past rowCount() (not fetched yet) don't exist for the view
+        bottom = min(bottom, self.rowCount() - 1)
+        if top <= bottom:
+            self.dataChanged.emit(self.index(top, left), self.index(bottom, right), [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+
+    @staticmethod
+    def coalesce_ranges(ranges, limit=None):
+        """Merges (top, left, bottom, right) ranges into as few bounding ranges as possible.
+
+        Ranges over the same columns whose rows overlap or touch are joined,
+        then ranges over the same rows whose columns overlap or touch. With
+        a `limit`, if more than that remain, a single range covering
+        everything is returned.
+        """
+        if not ranges:
+            return []
+
+        def merge(items, key, start, end):
+            merged = []
+            for item in sorted(items, key=lambda r: (key(r), r[start])):
+                last = merged[-1] if merged else None
+                if last and key(last) == key(item) and item[start] <= last[end] + 1:
+                    bounds = list(last)
+                    bounds[end] = max(last[end], item[end])
+                    merged[-1] = tuple(bounds)
+                else:
+                    merged.append(item)
+            return merged
+
+        merged = merge(ranges, lambda r: (r[1], r[3]), 0, 2)  # Join rows within a column span
+        merged = merge(merged, lambda r: (r[0], r[2]), 1, 3)  # Join columns within a row span
+        if limit is not None and len(merged) > limit:
+            return [(min(r[0] for r in merged), min(r[1] for r in merged),
+                     max(r[2] for r in merged), max(r[3] for r in merged))]
+        return merged
+
+
+class PandasModel(BatchedUpdatesMixin, QAbstractTableModel):
     def __init__(self, df=pd.DataFrame(), table=None, parent=None):  # Add table=None here
         super().__init__(parent)
         self._df = df.copy()
@@ -61,7 +145,7 @@ class PandasModel(QAbstractTableModel):
             self._redo_stack.clear()
 
             self._df.iloc[index.row(), index.column()] = value
-            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+            self.notify_changed(index.row(), index.column(), index.row(), index.column())
             return True
         return False
 
@@ -70,9 +154,10 @@ class PandasModel(QAbstractTableModel):
 
     def undo(self):
         if self._undo_stack:
+            self.beginResetModel()
             self._redo_stack.append(self._df.copy())
             self._df = self._undo_stack.pop()
-            self.layoutChanged.emit()
+            self.endResetModel()
             logging.info("Undo operacija izvršena.")
             return True
         logging.info("Nema izmjena za poništiti.")
@@ -80,9 +165,10 @@ class PandasModel(QAbstractTableModel):
 
     def redo(self):
         if self._redo_stack:
+            self.beginResetModel()
             self._undo_stack.append(self._df.copy())
             self._df = self._redo_stack.pop()
-            self.layoutChanged.emit()
+            self.endResetModel()
             logging.info("Redo operacija izvršena.")
             return True
         logging.info("Nema izmjena za ponovno primijeniti.")
@@ -93,8 +179,6 @@ class PandasModel(QAbstractTableModel):
         self.beginInsertRows(QModelIndex(), position, position)
         self._undo_stack.append(self._df.copy())
         self._redo_stack.clear()
-        # Force the QTableView to update:
-        #self.table.viewport().update() 
 
         # Create a new empty row with the correct number of columns
         new_row = pd.DataFrame([[pd.NA] * len(self._df.columns)], columns=self._df.columns)
@@ -102,15 +186,9 @@ class PandasModel(QAbstractTableModel):
         # Insert the new row at the specified position
         self._df = pd.concat([self._df.iloc[:position], new_row, self._df.iloc[position:]]).reset_index(drop=True)
 
-        self.endInsertRows()
+        self.endInsertRows()  # rowsInserted is all the view needs to update
         logging.info(f"Redak umetnut na poziciju {position}.")
 
-        # Emit layoutChanged signal to force a complete update
-        self.layoutChanged.emit()
-
-        # Force the QTableView to update:
-        self.table.viewport().update()
-
     def remove_row(self, position):
         """Uklanjanje reda na specificiranu poziciju."""
         if position < 0 or position >= self.rowCount():
@@ -121,7 +199,5 @@ class PandasModel(QAbstractTableModel):
         self._redo_stack.clear()
         self._df = self._df.drop(self._df.index[position]).reset_index(drop=True)
         self.endRemoveRows()
-        # Force the QTableView to update:
-        self.table.viewport().update() 
         logging.info(f"Redak uklonjen na poziciji {position}.")
         return True
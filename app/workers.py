@@ -0,0 +1,156 @@
+# app/workers.py
+
+import logging
+import os
+import threading
+from collections import deque
+
+import numpy as np
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from utils.instrumentation import Trace
+from utils.schedule_validation import REQUIRED_COLUMNS, ScheduleValidator
+from utils.schedule_store import save_schedule
+
+
+class ValidationThread(QThread):
+    """Keeps the schedule validator on a background thread.
+
+    The editor posts each edit as a job carrying a copy of just the rows it
+    touched, so the worker never reads the live DataFrame. Jobs are applied
+    in order; a full rebuild makes everything queued before it stale, so
+    those jobs are dropped. The problem list is built only once the queue
+    is empty, which turns a burst of edits into a single result.
+    """
+    problemsReady = pyqtSignal(int, object)  # generation, [(row, message), ...]
+    error = pyqtSignal(Exception)
+
+    def __init__(self, problem_limit=500, parent=None):
+        super().__init__(parent)
+        self.problem_limit = problem_limit
+        self.validator = ScheduleValidator()
+        self.generation = 0  # Last submitted job, results for older ones are stale
+        self._jobs = deque()
+        self._busy = False
+        self._stopping = False
+        self._condition = threading.Condition()
+
+    def rebuild(self, df, start_ns):
+        values = df[REQUIRED_COLUMNS].copy()
+        return self._submit(('rebuild', (values, start_ns.copy())), replace=True)
+
+    def update_rows(self, df, rows, start_ns):
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        rows = rows[(rows >= 0) & (rows < len(df))]
+        if not len(rows):
+            return self.generation
+        return self._submit(self._apply_job(df, rows, start_ns))
+
+    def insert_rows(self, df, position, count, start_ns):
+        rows = np.arange(position, position + count)
+        return self._submit(('make_room', (position, count)), self._apply_job(df, rows, start_ns))
+
+    def remove_rows(self, position, count):
+        return self._submit(('remove_rows', (position, count)))
+
+    def problems(self, limit=None):
+        """Waits for all submitted jobs and returns the up-to-date problems."""
+        with self._condition:
+            self._condition.wait_for(lambda: not (self._jobs or self._busy) or self._stopping)
+            return self.validator.problems(limit)
+
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self.wait()
+
+    def _apply_job(self, df, rows, start_ns):
+        return ('apply_rows', (rows, df[REQUIRED_COLUMNS].iloc[rows].copy(), start_ns[rows].copy()))
+
+    def _submit(self, *jobs, replace=False):
+        with self._condition:
+            if replace:
+                self._jobs.clear()
+            self.generation += 1
+            for method, args in jobs:
+                self._jobs.append((self.generation, method, args))
+            self._condition.notify_all()
+            return self.generation
+
+    def run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._jobs or self._stopping)
+                if self._stopping:
+                    return
+                generation, method, args = self._jobs.popleft()
+                self._busy = True
+            try:
+                getattr(self.validator, method)(*args)
+                with self._condition:
+                    pending = bool(self._jobs)
+                if not pending:
+                    self.problemsReady.emit(generation, self.validator.problems(self.problem_limit))
+            except Exception as e:
+                logging.exception("Validation job failed")
+                self.error.emit(e)
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+
+class SaveWorkbookThread(QThread):
+    """Saves a snapshot of the schedule atomically while the editor stays usable.
+
+    The format (Excel workbook or native schedule file) follows the extension.
+
+    `revision` identifies the model state the snapshot was taken from, so
+    the editor can mark exactly that state as saved even if more edits
+    were made during the save.
+    """
+    progress = pyqtSignal(int, int)  # rows written, total rows
+    finished = pyqtSignal(str, int)  # save path, revision
+    error = pyqtSignal(Exception)
+    traced = pyqtSignal(object)  # Trace of the run, after finished or error
+
+    def __init__(self, data_frame, save_path, revision, parent=None):
+        super().__init__(parent)
+        self.data_frame = data_frame
+        self.save_path = save_path
+        self.revision = revision
+        self.succeeded = False
+
+    def run(self):
+        trace = Trace("Spremanje rasporeda", file=os.path.basename(self.save_path), rows=len(self.data_frame))
+        try:
+            with trace.activate():
+                save_schedule(self.data_frame, self.save_path, progress=self.progress.emit)
+            self.succeeded = True
+            self.finished.emit(self.save_path, self.revision)
+        except Exception as e:
+            self.error.emit(e)
+        finally:
+            self.traced.emit(trace)
+
+
+class CompactJournalThread(QThread):
+    """Folds the edit journal into a single snapshot of the table off the GUI thread."""
+    finished = pyqtSignal(str, int, int)  # compacted file, journal offset, journal epoch
+    error = pyqtSignal(Exception)
+
+    def __init__(self, journal, data_frame, offset, parent=None):
+        super().__init__(parent)
+        self.journal = journal
+        self.data_frame = data_frame
+        self.offset = offset
+        self.epoch = journal.epoch
+        self.temp_path = journal.path + '.compact'
+
+    def run(self):
+        try:
+            self.journal.write_compacted(self.data_frame, self.temp_path)
+            self.finished.emit(self.temp_path, self.offset, self.epoch)
+        except Exception as e:
+            self.error.emit(e)
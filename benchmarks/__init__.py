@@ -0,0 +1,6 @@
+"""Benchmarks for the conversion pipeline and the editor model.
+
+    python -m benchmarks --weeks 1,4,13 --compare benchmarks/results/<earlier>.json
+
+See runner.py for the stages and generator.py for the synthetic schedules.
+"""
@@ -0,0 +1,116 @@
+# benchmarks/generator.py
+
+import os
+import random
+from datetime import date, datetime, timedelta
+
+import openpyxl
+
+CATEGORIES = ['Film', 'Serija', 'Dokumentarni', 'Informativni', 'Zabavni', 'Sport', 'Glazbeni', 'Dječji']
+TITLE_WORDS = ['Jutro', 'Vijesti', 'Dalmacija', 'Kronika', 'More', 'Otoci', 'Zvuk', 'Priče', 'Kuhinja', 'Sport',
+               'Obzor', 'Luka', 'Split', 'Zadar', 'Šibenik', 'Večer', 'Klapa', 'Ljeto', 'Ribari', 'Putovanja']
+DESCRIPTION_WORDS = ['emisija', 'donosi', 'razgovor', 'gost', 'tema', 'tjedna', 'reportaža', 'iz', 'grada', 'o',
+                     'ljudima', 'koji', 'žive', 'uz', 'more', 'i', 'na', 'otocima', 'glazba', 'uživo', 'povijest',
+                     'kultura', 'baština', 'priča', 'obitelji', 'sezona', 'nastavak', 'vijesti', 'dana', 'čuvari']
+NOTES = ["Napomena: moguće izmjene programa", "PROGRAM PODLOŽAN PROMJENAMA", "Reprize označene s R", "-"]
+
+
+class ScheduleSpec:
+    """Shape of a synthetic schedule.
+
+    Args:
+        weeks (int): Length of the schedule.
+        programmes_per_day (int): Programmes per day, evenly spaced from 06:00 with jitter.
+        channels (int): Workbooks written, one per channel as the application keeps them.
+        description_words (int): Average words per description (0 for none).
+        noise (float): Share of extra non-programme rows: repeated headers,
+            notes and rows with impossible dates, all of which the reader
+            has to skip. (Entirely blank rows aren't generated: process_excel()
+            can't read them yet.)
+        seed (int): Makes the output reproducible.
+    """
+
+    def __init__(self, weeks=1, programmes_per_day=40, channels=1, description_words=30, noise=0.02, seed=0,
+                 start=date(2024, 3, 4)):
+        self.weeks = weeks
+        self.programmes_per_day = programmes_per_day
+        self.channels = channels
+        self.description_words = description_words
+        self.noise = noise
+        self.seed = seed
+        self.start = start
+
+    @property
+    def programmes(self):
+        """Programme rows per channel."""
+        return self.weeks * 7 * self.programmes_per_day
+
+    def to_dict(self):
+        return {'weeks': self.weeks, 'programmes_per_day': self.programmes_per_day, 'channels': self.channels,
+                'description_words': self.description_words, 'noise': self.noise, 'seed': self.seed,
+                'start': self.start.isoformat(), 'programmes': self.programmes}
+
+
+def _description(rng, words):
+    if not words:
+        return None
+    count = max(1, int(rng.gauss(words, words / 3)))
+    text = ' '.join(rng.choice(DESCRIPTION_WORDS) for _ in range(count))
+    return text[0].upper() + text[1:] + '.'
+
+
+def _noise_row(rng, day):
+    kind = rng.randrange(3)
+    if kind == 0:
+        return ['DATUM', 'VRIJEME', 'NAZIV EMISIJE', 'ŽANR', 'EPZ', 'P/R', 'OPIS']
+    if kind == 1:
+        return [rng.choice(NOTES)] + [None] * 6
+    # Looks like a date but isn't one, e.g. 31.02.
+    return [f"{rng.choice([30, 31])}.02.{day.year}.", '12:00', 'Pogrešan datum', None, None, None, None]
+
+
+def generate_rows(spec, channel=0):
+    """Yields the rows of one channel's workbook: a title block, then programmes mixed with noise."""
+    rng = random.Random(spec.seed * 1000 + channel)
+    yield [f"PROGRAMSKA SHEMA - KANAL {channel + 1}"] + [None] * 6
+    yield ['DATUM', 'VRIJEME', 'NAZIV EMISIJE', 'ŽANR', 'EPZ', 'P/R', 'OPIS']
+    step = 24 * 60 / spec.programmes_per_day
+    titles = [' '.join(rng.sample(TITLE_WORDS, rng.randint(1, 3))) for _ in range(max(10, spec.programmes_per_day))]
+    for day_offset in range(spec.weeks * 7):
+        day = spec.start + timedelta(days=day_offset)
+        base = datetime.combine(day, datetime.min.time()) + timedelta(hours=6)
+        previous = -1
+        for i in range(spec.programmes_per_day):
+            # Jittered but strictly increasing minutes, never past 05:59 the next morning
+            minute = int(i * step + rng.uniform(0, step * 0.4))
+            minute = min(max(minute, previous + 1), 24 * 60 - 1 - (spec.programmes_per_day - 1 - i))
+            previous = minute
+            start = base + timedelta(minutes=minute)
+            separator = '.' if rng.random() < 0.1 else ':'  # Some schedulers type 20.15
+            episode = rng.choice([None, rng.randint(1, 200), f"{rng.randint(1, 30)}/{rng.randint(30, 60)}"])
+            if rng.random() < spec.noise:
+                yield _noise_row(rng, day)
+            yield [
+                start.strftime('%d.%m.%Y.'), start.strftime(f'%H{separator}%M'), rng.choice(titles),
+                rng.choice(CATEGORIES), episode, rng.choice(['P', 'R']),
+                _description(rng, spec.description_words),
+            ]
+
+
+def write_workbook(path, spec, channel=0):
+    """Writes one channel's synthetic schedule as .xlsx (streamed, so large ones stay cheap)."""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Raspored')
+    for row in generate_rows(spec, channel):
+        sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+def write_workbooks(directory, spec):
+    """Writes one workbook per channel into `directory` and returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    name = f"w{spec.weeks}_d{spec.programmes_per_day}_s{spec.seed}"
+    return [write_workbook(os.path.join(directory, f"{name}_kanal{channel + 1}.xlsx"), spec, channel)
+            for channel in range(spec.channels)]
+
@@ -0,0 +1,282 @@
+# benchmarks/runner.py
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from importlib import metadata
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from benchmarks.generator import ScheduleSpec, write_workbooks
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+DTD_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'resources', 'xmltv.dtd')
+PACKAGES = ('pandas', 'numpy', 'openpyxl', 'lxml', 'PyQt6')
+MODEL_EDITS = 200  # setData() calls in the model_edits stage
+
+
+class Stage:
+    """One timed step. `run(ctx)` works on the `needs` outputs of earlier stages; its result is stored as `ctx.<output>`."""
+
+    def __init__(self, name, run, output=None, needs=(), needs_qt=False):
+        self.name = name
+        self.run = run
+        self.output = output
+        self.needs = needs
+        self.needs_qt = needs_qt
+
+
+def _load_workbooks(ctx):
+    from utils.excel_processor import process_excel
+
+    return [process_excel(path, ctx.timezone) for path in ctx.workbooks]
+
+
+def _to_xmltv(ctx):
+    from utils.xmltv_converter import dataframe_to_xmltv
+
+    return [dataframe_to_xmltv(display_df, internal_df, ctx.timezone) for display_df, internal_df in ctx.frames]
+
+
+def _serialize(ctx):
+    from lxml import etree
+
+    return [etree.tostring(tree, pretty_print=True, encoding='UTF-8', xml_declaration=True) for tree in ctx.trees]
+
+
+def _validate(ctx):
+    from utils.xmltv_converter import validate_xmltv
+
+    return [validate_xmltv(tree, DTD_PATH) for tree in ctx.trees]
+
+
+def _save_workbook(ctx):
+    # What EditWindow.save_workbook() runs on its SaveWorkbookThread
+    from utils.schedule_store import save_schedule
+
+    for i, (display_df, _) in enumerate(ctx.frames):
+        save_schedule(display_df, os.path.join(ctx.directory, f'saved_{i}.xlsx'))
+
+
+def _save_native(ctx):
+    from utils.schedule_store import save_schedule
+
+    paths = [os.path.join(ctx.directory, f'saved_{i}.raspored') for i in range(len(ctx.frames))]
+    for path, (display_df, _) in zip(paths, ctx.frames):
+        save_schedule(display_df, path)
+    return paths
+
+
+def _load_native(ctx):
+    from utils.schedule_store import load_schedule
+
+    return [load_schedule(path, ctx.timezone) for path in ctx.native_paths]
+
+
+def _model_init(ctx):
+    from PyQt6.QtGui import QUndoStack
+    from app.edit_window import DataFrameModel
+
+    ctx.undo_stack = QUndoStack()
+    return [DataFrameModel(display_df, ctx.undo_stack) for display_df, _ in ctx.frames]
+
+
+def _model_scan(ctx):
+    """Reads every cell the view has fetched, as painting the table does."""
+    from PyQt6.QtCore import Qt
+
+    roles = (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.BackgroundRole)
+    for model in ctx.models:
+        for row in range(model.rowCount()):
+            for column in range(model.columnCount()):
+                index = model.index(row, column)
+                for role in roles:
+                    model.data(index, role)
+
+
+def _model_edits(ctx):
+    """Edits start times through setData(), each an undoable command that rechecks stop times."""
+    for model in ctx.models:
+        column = model.get_data_frame().columns.get_loc('START TIME')
+        rows = min(model.rowCount(), MODEL_EDITS)
+        for row in range(rows):
+            model.setData(model.index(row, column), f'{row % 24:02d}:{row % 60:02d}')
+        for _ in range(rows):
+            ctx.undo_stack.undo()
+
+
+STAGES = [
+    Stage('process_excel', _load_workbooks, 'frames'),
+    Stage('dataframe_to_xmltv', _to_xmltv, 'trees', needs=('frames',)),
+    Stage('serialize', _serialize, needs=('trees',)),
+    Stage('validate_xmltv', _validate, needs=('trees',)),
+    Stage('save_workbook', _save_workbook, needs=('frames',)),
+    Stage('save_native', _save_native, 'native_paths', needs=('frames',)),
+    Stage('load_native', _load_native, needs=('native_paths',)),
+    Stage('model_init', _model_init, 'models', needs=('frames',), needs_qt=True),
+    Stage('model_scan', _model_scan, needs=('models',), needs_qt=True),
+    Stage('model_edits', _model_edits, needs=('models',), needs_qt=True),
+]
+
+
+def select_stages(names):
+    """The named stages and the ones they depend on, in run order."""
+    producers = {stage.output: stage for stage in STAGES if stage.output}
+    wanted = set()
+    pending = [stage for stage in STAGES if stage.name in names]
+    while pending:
+        stage = pending.pop()
+        if stage.name not in wanted:
+            wanted.add(stage.name)
+            pending += [producers[output] for output in stage.needs]
+    return [stage for stage in STAGES if stage.name in wanted]
+
+
+def _qt_available():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from PyQt6.QtWidgets import QApplication
+    except ImportError:
+        return False
+    if QApplication.instance() is None:
+        _qt_available.app = QApplication([])  # Kept alive for the whole run
+    return True
+
+
+def measure(stage, ctx, repeat, memory):
+    """Runs a stage `repeat` times, plus once under tracemalloc if `memory`.
+
+    Returns:
+        tuple: (stage output of the last run, seconds per run, peak traced bytes or None)
+    """
+    seconds = []
+    output = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = stage.run(ctx)
+        seconds.append(time.perf_counter() - started)
+    peak = None
+    if memory:
+        # A separate run: tracing slows Python code down and would skew the timings
+        tracemalloc.start()
+        try:
+            stage.run(ctx)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return output, seconds, peak
+
+
+def run_size(spec, stages, repeat, memory, directory):
+    """Benchmarks every stage on one schedule size and returns a result dict per stage."""
+    started = time.perf_counter()
+    workbooks = write_workbooks(os.path.join(directory, 'input'), spec)
+    generate_seconds = time.perf_counter() - started
+    ctx = SimpleNamespace(workbooks=workbooks, directory=directory, timezone=ZoneInfo('Europe/Zagreb'))
+    rows = spec.programmes * spec.channels
+    results = [{'stage': 'generate', 'weeks': spec.weeks, 'programmes': rows, 'seconds': [generate_seconds],
+                'best': generate_seconds, 'median': generate_seconds, 'peak_memory_bytes': None,
+                'file_bytes': sum(os.path.getsize(path) for path in workbooks)}]
+    for stage in stages:
+        output, seconds, peak = measure(stage, ctx, repeat, memory)
+        if stage.output:
+            setattr(ctx, stage.output, output)
+        best = min(seconds)
+        results.append({'stage': stage.name, 'weeks': spec.weeks, 'programmes': rows,
+                        'seconds': [round(value, 6) for value in seconds], 'best': round(best, 6),
+                        'median': round(statistics.median(seconds), 6), 'peak_memory_bytes': peak,
+                        'rows_per_second': round(rows / best) if best else None})
+        print(f"  {stage.name:<20} {best * 1000:10.1f} ms" +
+              (f" {peak / 2**20:10.1f} MiB" if peak is not None else ""), flush=True)
+    return results
+
+
+def environment():
+    packages = {}
+    for package in PACKAGES:
+        try:
+            packages[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            packages[package] = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(RESULTS_DIR), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {'created': datetime.now().isoformat(timespec='seconds'), 'commit': commit,
+            'python': sys.version.split()[0], 'platform': platform.platform(), 'machine': platform.machine(),
+            'packages': packages}
+
+
+def compare(previous, current):
+    """Formats best times of `current` against `previous` for the stages and sizes both have."""
+    before = {(result['stage'], result['programmes']): result['best'] for result in previous['results']}
+    lines = [f"Compared with {previous['environment'].get('created')} ({previous['environment'].get('commit')}):",
+             f"  {'stage':<20} {'rows':>8} {'before ms':>10} {'now ms':>10} {'change':>8}"]
+    for result in current['results']:
+        old = before.get((result['stage'], result['programmes']))
+        if old:
+            lines.append(f"  {result['stage']:<20} {result['programmes']:>8} {old * 1000:10.1f} "
+                         f"{result['best'] * 1000:10.1f} {(result['best'] / old - 1) * 100:+7.1f}%")
+    return '\n'.join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description="Times the pipeline stages on synthetic schedules of several sizes.")
+    parser.add_argument('--weeks', default='1,4,13', help="schedule lengths to run, comma separated (default: 1,4,13)")
+    parser.add_argument('--per-day', type=int, default=40, help="programmes per day (default: 40)")
+    parser.add_argument('--channels', type=int, default=1, help="workbooks per size, one per channel (default: 1)")
+    parser.add_argument('--description-words', type=int, default=30, help="average description length (default: 30)")
+    parser.add_argument('--noise', type=float, default=0.02, help="share of header/note/bad-date rows (default: 0.02)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage; the best counts (default: 3)")
+    parser.add_argument('--stages', help="only these stages, comma separated: " + ', '.join(s.name for s in STAGES))
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc run per stage")
+    parser.add_argument('-o', '--output', help=f"results file (default: {RESULTS_DIR}/<time>.json)")
+    parser.add_argument('--compare', help="earlier results file to compare with")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)  # The pipeline logs every validation at INFO
+
+    stages = STAGES
+    if args.stages:
+        wanted = args.stages.split(',')
+        unknown = set(wanted) - {stage.name for stage in STAGES}
+        if unknown:
+            build_parser().error(f"unknown stages: {', '.join(sorted(unknown))}")
+        stages = select_stages(wanted)
+    if any(stage.needs_qt for stage in stages) and not _qt_available():
+        print("PyQt6 not available, skipping the model stages", file=sys.stderr)
+        stages = [stage for stage in stages if not stage.needs_qt]
+
+    run = {'environment': environment(), 'specs': [], 'results': []}
+    for weeks in (int(value) for value in args.weeks.split(',')):
+        spec = ScheduleSpec(weeks, args.per_day, args.channels, args.description_words, args.noise, args.seed)
+        run['specs'].append(spec.to_dict())
+        print(f"{weeks} weeks, {spec.programmes * spec.channels} programmes:", flush=True)
+        with tempfile.TemporaryDirectory(prefix='xmltv-bench-') as directory:
+            run['results'] += run_size(spec, stages, args.repeat, not args.no_memory, directory)
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(run, f, ensure_ascii=False, indent=2)
+    print(f"Results written to {output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print(compare(json.load(f), run))
+    return 0
@@ -0,0 +1,217 @@
+# cli.py
+"""Command-line pipeline for servers and cron jobs; never imports PyQt6.
+
+Usage:
+    python -m cli convert raspored1.xlsx raspored2.raspored -o izlaz/ --publish
+    python -m cli watch /srv/rasporedi -o /srv/xmltv --publish
+    python -m cli serve /srv/xmltv --host 0.0.0.0 --port 8080
+    python -m cli api --work-dir /var/lib/xmltv-api --publish
+    python -m cli timings logs/timings.jsonl -o trace.json
+
+`convert` prints one JSON summary on stdout. `watch` runs until stopped
+(Ctrl+C or SIGTERM) and prints one JSON line per converted file; `serve`
+serves the guides in a directory over HTTP and `api` runs the local
+REST API (see utils/rest_api.py), both until stopped. `timings` turns
+the timing log the application writes into a Chrome trace file. Exit
+codes: 0 when every file was converted (or the watch was stopped), 1 when
+any file failed, 2 for invalid arguments or settings.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from utils.ftp_publisher import load_ftp_credentials
+from utils.guide_server import DEFAULT_HOST, DEFAULT_PORT, GuideServer
+from utils.instrumentation import export_chrome_trace, read_json_lines
+from utils.rest_api import DEFAULT_PORT as DEFAULT_API_PORT, DEFAULT_WORKERS as DEFAULT_API_WORKERS, ConversionAPI
+from utils.pipeline import DTD_PATH, convert_file, output_path_for
+from utils.schedule_formats import DEFAULT_TIMEZONE
+from utils.watch_daemon import DEFAULT_QUEUE_SIZE, DEFAULT_SETTLE, DEFAULT_WORKERS, WatchDaemon
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+DEFAULT_CONFIG = os.path.join('saved_excels', 'config.ini')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m cli', description="Excel/raspored -> XMLTV bez grafičkog sučelja.")
+    parser.add_argument('-v', '--verbose', action='store_true', help="detaljniji zapis na stderr")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert = commands.add_parser('convert', help="pretvori rasporede u XMLTV, provjeri i po želji objavi")
+    convert.add_argument('inputs', nargs='+', help="Excel (.xlsx/.xls) ili .raspored datoteke")
+    add_pipeline_arguments(convert)
+    convert.set_defaults(handler=run_convert)
+
+    watch = commands.add_parser('watch', help="prati mape i automatski pretvara (i objavljuje) nove ili izmijenjene rasporede")
+    watch.add_argument('directories', nargs='+', help="mape koje se prate")
+    add_pipeline_arguments(watch)
+    watch.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f"datoteke koje se obrađuju istovremeno (zadano: {DEFAULT_WORKERS})")
+    watch.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE, help=f"datoteke koje čekaju obradu (zadano: {DEFAULT_QUEUE_SIZE})")
+    watch.add_argument('--settle', type=float, default=DEFAULT_SETTLE, help=f"sekunde bez promjene prije obrade (zadano: {DEFAULT_SETTLE})")
+    watch.add_argument('--poll', type=float, metavar='SEKUNDE', help="provjeravaj mape svakih SEKUNDE umjesto inotifyja (npr. za mrežne mape)")
+    watch.set_defaults(handler=run_watch)
+
+    serve = commands.add_parser('serve', help="poslužuj XMLTV vodiče iz mape preko HTTP-a")
+    serve.add_argument('directory', help="mapa s XMLTV datotekama (npr. izlazna mapa naredbe watch)")
+    serve.add_argument('--host', default=DEFAULT_HOST, help=f"adresa (zadano: {DEFAULT_HOST}; 0.0.0.0 za sve mreže)")
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"port (zadano: {DEFAULT_PORT})")
+    serve.set_defaults(handler=run_serve)
+
+    api = commands.add_parser('api', help="lokalni REST API za učitavanje, provjeru, izvoz i objavu rasporeda")
+    api.add_argument('--host', default=DEFAULT_HOST, help=f"adresa (zadano: {DEFAULT_HOST})")
+    api.add_argument('--port', type=int, default=DEFAULT_API_PORT, help=f"port (zadano: {DEFAULT_API_PORT})")
+    api.add_argument('--work-dir', default='api_jobs', help="mapa za učitane datoteke i izvoze (zadano: api_jobs)")
+    api.add_argument('--workers', type=int, default=DEFAULT_API_WORKERS, help=f"procesi za poslove (zadano: {DEFAULT_API_WORKERS})")
+    api.add_argument('--dtd', default=DTD_PATH, help="XMLTV DTD za provjeru")
+    api.add_argument('--publish', action='store_true', help="omogući objavu na FTP")
+    api.add_argument('--config', default=DEFAULT_CONFIG, help=f"ini datoteka s [FTP] podacima (zadano: {DEFAULT_CONFIG})")
+    api.set_defaults(handler=run_api)
+
+    timings = commands.add_parser('timings', help="pretvori zapis mjerenja vremena (JSON lines) u Chrome trace")
+    timings.add_argument('log', help="zapis mjerenja, npr. logs/timings.jsonl")
+    timings.add_argument('-o', '--output', default='trace.json', help="Chrome trace datoteka (zadano: trace.json)")
+    timings.add_argument('--last', type=int, metavar='N', help="samo zadnjih N mjerenja")
+    timings.set_defaults(handler=run_timings)
+    return parser
+
+
+def add_pipeline_arguments(parser):
+    parser.add_argument('-o', '--output-dir', help="mapa za XMLTV datoteke (zadano: uz ulaznu datoteku)")
+    parser.add_argument('--timezone', default=DEFAULT_TIMEZONE, help=f"vremenska zona rasporeda (zadano: {DEFAULT_TIMEZONE})")
+    parser.add_argument('--dtd', default=DTD_PATH, help="XMLTV DTD za provjeru")
+    parser.add_argument('--no-validate', action='store_true', help="preskoči provjeru prema DTD-u")
+    parser.add_argument('--publish', action='store_true', help="pošalji XMLTV datoteke na FTP")
+    parser.add_argument('--config', default=DEFAULT_CONFIG, help=f"ini datoteka s [FTP] podacima (zadano: {DEFAULT_CONFIG})")
+
+
+def usage_error(message):
+    print(json.dumps({'ok': False, 'error': message}, ensure_ascii=False))
+    return EXIT_USAGE
+
+
+def check_pipeline_arguments(args):
+    """Validates the shared options; returns (ftp_credentials, error message or None)."""
+    try:
+        ZoneInfo(args.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None, f"Unknown timezone: {args.timezone}"
+    ftp_credentials = None
+    if args.publish:
+        ftp_credentials = load_ftp_credentials(args.config)
+        if not ftp_credentials['host']:
+            return None, f"FTP host is not configured in {args.config}"
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    return ftp_credentials, None
+
+
+def run_convert(args):
+    ftp_credentials, error = check_pipeline_arguments(args)
+    if error:
+        return usage_error(error)
+
+    started = time.perf_counter()
+    results = [
+        convert_file(input_path, output_path_for(input_path, args.output_dir), args.timezone, args.dtd,
+                     validate=not args.no_validate, ftp_credentials=ftp_credentials)
+        for input_path in args.inputs
+    ]
+    failed = sum(not result['ok'] for result in results)
+    summary = {
+        'ok': not failed,
+        'converted': len(results) - failed,
+        'failed': failed,
+        'seconds': round(time.perf_counter() - started, 6),
+        'files': results,
+    }
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def run_watch(args):
+    ftp_credentials, error = check_pipeline_arguments(args)
+    if error:
+        return usage_error(error)
+    missing = [directory for directory in args.directories if not os.path.isdir(directory)]
+    if missing:
+        return usage_error(f"Not a directory: {', '.join(missing)}")
+    if args.workers < 1 or args.queue_size < 1 or args.settle < 0 or (args.poll is not None and args.poll <= 0):
+        return usage_error("--workers and --queue-size must be positive, --settle and --poll not negative")
+
+    def print_result(result):
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+    daemon = WatchDaemon(args.directories, args.output_dir, args.timezone, args.dtd, not args.no_validate,
+                         ftp_credentials, args.workers, args.queue_size, args.settle, args.poll, print_result)
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        daemon.stop()
+    return EXIT_OK
+
+
+def run_serve(args):
+    if not os.path.isdir(args.directory):
+        return usage_error(f"Not a directory: {args.directory}")
+    server = GuideServer(args.directory, args.host, args.port)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # Stop like Ctrl+C
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        return usage_error(f"Cannot listen on {args.host}:{args.port}: {e}")
+    return EXIT_OK
+
+
+def run_api(args):
+    if args.workers < 1:
+        return usage_error("--workers must be positive")
+    ftp_credentials = None
+    if args.publish:
+        ftp_credentials = load_ftp_credentials(args.config)
+        if not ftp_credentials['host']:
+            return usage_error(f"FTP host is not configured in {args.config}")
+    api = ConversionAPI(args.work_dir, args.host, args.port, args.workers, ftp_credentials, args.dtd)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # Stop like Ctrl+C
+    try:
+        asyncio.run(api.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        return usage_error(f"Cannot listen on {args.host}:{args.port}: {e}")
+    return EXIT_OK
+
+
+def run_timings(args):
+    try:
+        traces = read_json_lines(args.log)
+    except OSError as e:
+        return usage_error(f"Cannot read {args.log}: {e}")
+    if args.last is not None:
+        traces = traces[-args.last:] if args.last > 0 else []
+    count = export_chrome_trace(args.output, traces)
+    print(json.dumps({'ok': True, 'traces': count, 'output': args.output}, ensure_ascii=False))
+    return EXIT_OK
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(levelname)s:%(message)s')
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,9 @@
 import sys
 import logging
-from PyQt6 import QtGui
-from PyQt6.QtWidgets import QApplication
 import os
 
-from app.main_window import ExcelToXMLTVApp  # Import your main GUI application
+from utils.instrumentation import JsonLinesSink, add_sink
+from utils.startup_profile import StartupProfile
 
 basedir = os.path.dirname(__file__)
 
@@ -17,6 +16,10 @@ except ImportError:
     pass
 
 def main():
+    # `python main.py --profile-startup` prints import and start-up times once the window has painted, then quits
+    profile = StartupProfile(enabled='--profile-startup' in sys.argv)
+    profile.install()
+
     # Create the logs directory if it doesn't exist
     log_dir = os.path.join(basedir, 'logs')
     if not os.path.exists(log_dir):
@@ -32,27 +35,38 @@ def main():
     )
     logging.info("Aplikacija je pokrenuta.")  # Log that the app has started
 
+    # Timings of every load, save and upload, one JSON object per line (`python -m cli timings` makes a Chrome trace)
+    add_sink(JsonLinesSink(os.path.join(log_dir, 'timings.jsonl')))
+
+    # PyQt6 and the GUI are imported here, after the profiler is installed
+    with profile.phase("import PyQt6"):
+        from PyQt6 import QtGui
+        from PyQt6.QtWidgets import QApplication
+
     # Create the QApplication
-    app = QApplication(sys.argv)
-    app.setWindowIcon(QtGui.QIcon(os.path.join(basedir, 'resources', 'icon.ico')))
-    
-    # Initialize the main window *FIRST*
-    window = ExcelToXMLTVApp()
-    window.show()
+    with profile.phase("QApplication"):
+        app = QApplication(sys.argv)
+        app.setWindowIcon(QtGui.QIcon(os.path.join(basedir, 'resources', 'icon.ico')))
 
-    # Load and apply stylesheet *AFTER* creating the window
-    style_path = os.path.join(basedir, 'resources', 'styles.qss')
-    if os.path.exists(style_path):
-        with open(style_path, 'r') as f:
-            qss = f.read()
-            app.setStyleSheet(qss)  # Now applied AFTER window creation
-    else:
-        logging.warning(f"Stylesheet not found: {style_path}")
+    # Apply the stylesheet before any widget exists, so nothing is styled twice
+    with profile.phase("stylesheet"):
+        style_path = os.path.join(basedir, 'resources', 'styles.qss')
+        if os.path.exists(style_path):
+            with open(style_path, 'r') as f:
+                app.setStyleSheet(f.read())
+        else:
+            logging.warning(f"Stylesheet not found: {style_path}")
 
     # Initialize and display the main window
     try:
-        window = ExcelToXMLTVApp()  # Main window instance
-        window.show()
+        with profile.phase("import app.main_window"):
+            from app.main_window import ExcelToXMLTVApp
+        with profile.phase("main window"):
+            window = ExcelToXMLTVApp()  # Main window instance
+        with profile.phase("show"):
+            window.show()
+        if profile.enabled:
+            window.first_painted.connect(lambda: report_startup(profile, app))
         exit_code = app.exec()
         logging.info("Aplikacija je zatvorena.")  # Log application exit
         sys.exit(exit_code)
@@ -60,5 +74,13 @@ def main():
         logging.critical("Dogodila se neočekivana greška:", exc_info=True)
         sys.exit(1)
 
+def report_startup(profile, app):
+    profile.mark("first paint (since start)")
+    profile.uninstall()
+    report = profile.report()
+    logging.info(f"Startup profile:\n{report}")
+    print(report)
+    app.quit()
+
 if __name__ == "__main__":
     main()
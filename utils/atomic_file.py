@@ -0,0 +1,58 @@
+# utils/atomic_file.py
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Read once at import: os.umask() can only be read by setting it, which would race with other threads later
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def atomic_output(target_path):
+    """Yields a temporary path to write instead of `target_path`, then moves it into place.
+
+    The temporary file is created in the target's directory so the final
+    `os.replace` is a single rename. It is flushed to disk before the
+    rename, and the directory is flushed after it. The file gets the
+    permissions of the target it replaces, or the usual ones for a new file
+    (0666 minus the umask) rather than mkstemp's 0600. If the body raises,
+    the target is untouched and the temporary file is removed.
+
+    Example:
+        with atomic_output(path) as temp_path:
+            workbook.save(temp_path)
+    """
+    directory = os.path.dirname(os.path.abspath(target_path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target_path)}.", suffix='.tmp', dir=directory)
+    os.close(fd)
+    try:
+        yield temp_path
+        with open(temp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.chmod(temp_path, _target_mode(target_path))
+        os.replace(temp_path, target_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    fsync_directory(directory)
+
+
+def _target_mode(target_path):
+    try:
+        return os.stat(target_path).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def fsync_directory(directory):
+    """Makes a rename in `directory` durable; not supported (nor needed) on Windows."""
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,325 @@
+# utils/bulk_edit.py
+
+import csv
+import io
+import re
+import logging
+
+import numpy as np
+import pandas as pd
+
+
+class CellChanges:
+    """A sparse set of cell edits stored as parallel arrays.
+
+    `rows` and `cols` are positional indices into the DataFrame, `old_values`
+    holds what was there before and `new_values` what should be written. One
+    instance is enough to undo or redo a whole bulk operation.
+    """
+
+    def __init__(self, rows, cols, old_values, new_values):
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.old_values = np.asarray(old_values, dtype=object)
+        self.new_values = np.asarray(new_values, dtype=object)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def concat(cls, parts):
+        """Joins several change sets into one."""
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls([], [], [], [])
+        return cls(
+            np.concatenate([part.rows for part in parts]),
+            np.concatenate([part.cols for part in parts]),
+            np.concatenate([part.old_values for part in parts]),
+            np.concatenate([part.new_values for part in parts]),
+        )
+
+    def bounds(self):
+        """Returns (top, left, bottom, right) of the rectangle covering all changes."""
+        return int(self.rows.min()), int(self.cols.min()), int(self.rows.max()), int(self.cols.max())
+
+
+def find_replace_changes(df, find_text, replace_text, columns=None, row_mask=None,
+                         case_sensitive=False, regex=False):
+    """Computes a find-and-replace over whole columns with vectorized `str.replace`.
+
+    Only the matched substring is replaced, not the whole cell. Empty cells
+    (NaN/None) are never touched.
+
+    Args:
+        df (pd.DataFrame): Table to search. It is not modified.
+        find_text (str): Text or regular expression to look for.
+        replace_text (str): Replacement. With `regex=True` group references
+            such as `\\1` are allowed.
+        columns (list[int] | None): Column positions to search, all if None.
+        row_mask (np.ndarray | None): Boolean mask of rows in scope, all if None.
+        case_sensitive (bool): Match case exactly.
+        regex (bool): Treat `find_text` as a regular expression.
+
+    Returns:
+        CellChanges: Only the cells whose value actually changes.
+
+    Raises:
+        re.error: If `regex` is set and `find_text` is not a valid pattern.
+    """
+    flags = 0 if case_sensitive else re.IGNORECASE
+    if regex:
+        pattern = re.compile(find_text, flags)
+    else:
+        pattern = re.compile(re.escape(find_text), flags)
+        replace_text = replace_text.replace('\\', '\\\\')  # Literal replacement, no group references
+
+    if columns is None:
+        columns = range(df.shape[1])
+    if row_mask is None:
+        positions = np.arange(len(df))
+    else:
+        positions = np.flatnonzero(row_mask)
+
+    parts = []
+    for col in columns:
+        series = df.iloc[positions, col]
+        text = series.astype('string')
+        replaced = text.str.replace(pattern, replace_text, regex=True)
+        changed = (replaced != text).fillna(False).to_numpy(dtype=bool)
+        if not changed.any():
+            continue
+        parts.append(CellChanges(
+            positions[changed],
+            np.full(changed.sum(), col),
+            series.to_numpy(dtype=object)[changed],
+            replaced.to_numpy(dtype=object)[changed],
+        ))
+
+    changes = CellChanges.concat(parts)
+    logging.debug(f"Find/replace '{find_text}' -> '{replace_text}': {len(changes)} cells changed.")
+    return changes
+
+
+# "12", "12.0" (numbers read from Excel as floats) or a double episode "12-13"
+EPISODE_PATTERN = r'^\s*(\d+)(?:\.0+)?(?:\s*-\s*(\d+)(?:\.0+)?)?\s*$'
+
+
+def _parse_episodes(series):
+    """Extracts (first, last) episode numbers as nullable Int64 columns; last is NA for single episodes."""
+    parts = series.astype('string').str.extract(EPISODE_PATTERN)
+    return parts[0].astype('Int64'), parts[1].astype('Int64')
+
+
+def _format_episodes(first, last):
+    text = first.astype('string')
+    has_range = last.notna()
+    text[has_range] = text[has_range] + '-' + last[has_range].astype('string')
+    return text
+
+
+def increment_episode_changes(df, step=1, row_mask=None):
+    """Adds `step` to every parseable EPISODE NUMBER in scope.
+
+    Both ends of a double episode (`N-M`) are shifted. Values that aren't
+    episode numbers are left alone.
+
+    Returns:
+        CellChanges: The cells that change.
+    """
+    col = df.columns.get_loc('EPISODE NUMBER')
+    positions = np.arange(len(df)) if row_mask is None else np.flatnonzero(row_mask)
+    series = df.iloc[positions, col]
+
+    first, last = _parse_episodes(series)
+    matched = first.notna().to_numpy(dtype=bool)
+    new_text = _format_episodes(first + step, last + step)
+
+    return CellChanges(
+        positions[matched],
+        np.full(matched.sum(), col),
+        series.to_numpy(dtype=object)[matched],
+        new_text.to_numpy(dtype=object)[matched],
+    )
+
+
+def auto_number_series_changes(df, row_mask=None, start=1):
+    """Numbers episodes consecutively per title (series) with a groupby.
+
+    Within each title the first row in scope that already has an episode
+    number anchors the sequence; rows before and after it are numbered
+    around it (titles with no numbers at all start at `start`). A double
+    episode `N-M` takes up M - N + 1 numbers, so the numbering stays
+    continuous around it. Rows without a title are skipped.
+
+    Returns:
+        CellChanges: The cells that change.
+    """
+    col = df.columns.get_loc('EPISODE NUMBER')
+    positions = np.arange(len(df)) if row_mask is None else np.flatnonzero(row_mask)
+    titles = df['NAZIV EMISIJE'].iloc[positions].astype('string').str.strip().str.casefold()
+    has_title = (titles.notna() & (titles != '')).to_numpy(dtype=bool)
+    positions = positions[has_title]
+    titles = titles[has_title].reset_index(drop=True)
+    series = df.iloc[positions, col]
+
+    first, last = _parse_episodes(series.reset_index(drop=True))
+    width = (last - first + 1).where(last.notna() & (last >= first), 1).fillna(1)
+
+    groups = titles.groupby(titles, sort=False)
+    offset = width.groupby(titles, sort=False).cumsum() - width
+    seed = (first - offset).groupby(titles, sort=False).transform('first').fillna(start)
+    new_first = seed + offset
+    new_last = (new_first + width - 1).where(width > 1)
+    new_text = _format_episodes(new_first, new_last)
+
+    old_text = series.astype('string').str.strip().reset_index(drop=True)
+    changed = (old_text != new_text).fillna(True).to_numpy(dtype=bool)
+    logging.debug(f"Series numbering over {groups.ngroups} titles: {changed.sum()} cells changed.")
+    return CellChanges(
+        positions[changed],
+        np.full(changed.sum(), col),
+        series.to_numpy(dtype=object)[changed],
+        new_text.to_numpy(dtype=object)[changed],
+    )
+
+
+def parse_dates(series):
+    """Parses DATE values (`DD.MM.YYYY.`, trailing dot optional) in one pass; NaT where invalid."""
+    text = series.astype('string').str.strip().str.rstrip('.') + '.'
+    return pd.to_datetime(text, format='%d.%m.%Y.', errors='coerce')
+
+
+def shift_date_changes(df, days, row_mask=None, date_from=None, date_to=None):
+    """Moves DATE values by `days` (negative moves back) as one vectorized operation.
+
+    Args:
+        df (pd.DataFrame): Table with a DATE column. It is not modified.
+        days (int): Offset in days.
+        row_mask (np.ndarray | None): Boolean mask of rows in scope, all if None.
+        date_from, date_to (datetime.date | None): Optional inclusive range;
+            only rows whose current date falls inside it are moved.
+
+    Returns:
+        CellChanges: The DATE cells that change. Unparseable dates are skipped.
+    """
+    col = df.columns.get_loc('DATE')
+    positions = np.arange(len(df)) if row_mask is None else np.flatnonzero(row_mask)
+    series = df.iloc[positions, col]
+    dates = parse_dates(series)
+
+    in_scope = dates.notna()
+    if date_from is not None:
+        in_scope &= dates >= pd.Timestamp(date_from)
+    if date_to is not None:
+        in_scope &= dates <= pd.Timestamp(date_to)
+    in_scope = in_scope.to_numpy(dtype=bool)
+    if not days or not in_scope.any():
+        return CellChanges([], [], [], [])
+
+    shifted = (dates[in_scope] + pd.Timedelta(days=days)).dt.strftime('%d.%m.%Y.')
+    return CellChanges(
+        positions[in_scope],
+        np.full(in_scope.sum(), col),
+        series.to_numpy(dtype=object)[in_scope],
+        shifted.to_numpy(dtype=object),
+    )
+
+
+def parse_tsv(text):
+    """Splits clipboard text copied from a spreadsheet into a rectangular list of rows.
+
+    Cells are tab separated, rows newline separated; quoted cells may contain
+    tabs or newlines. Short rows are padded with empty strings.
+    """
+    rows = list(csv.reader(io.StringIO(text.replace('\r\n', '\n')), delimiter='\t'))
+    width = max((len(row) for row in rows), default=0)
+    return [row + [''] * (width - len(row)) for row in rows]
+
+
+def block_changes(df, rows, cols, values):
+    """Computes the changes for writing a 2-D block of `values` to `rows` x `cols`.
+
+    START TIME values typed as `HHMM` are stored as `HH:MM`, like single-cell
+    edits. Cells whose text doesn't change are left out.
+
+    Returns:
+        CellChanges: The cells that change.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    values = np.asarray(values, dtype=object).reshape(len(rows), len(cols))
+    parts = []
+    for j, col in enumerate(cols):
+        new = pd.Series(values[:, j], dtype=object)
+        if df.columns[col] == 'START TIME':
+            text = new.astype('string')
+            new = text.str.replace(r'^(\d{2})(\d{2})$', r'\1:\2', regex=True).astype(object).where(text.notna(), new)
+        old = df.iloc[rows, col].to_numpy(dtype=object)
+        changed = pd.Series(old, dtype=object).astype(str).to_numpy() != new.astype(str).to_numpy()
+        if changed.any():
+            parts.append(CellChanges(rows[changed], np.full(changed.sum(), col), old[changed], new.to_numpy(dtype=object)[changed]))
+    return CellChanges.concat(parts)
+
+
+def paste_changes(df, top, left, block):
+    """Pastes a rectangular block (e.g. from parse_tsv) with its top-left corner at (top, left).
+
+    The block is clipped to the table; rows and columns are never added.
+    """
+    block = np.array(block, dtype=object, ndmin=2)
+    height = min(block.shape[0], len(df) - top)
+    width = min(block.shape[1], df.shape[1] - left)
+    if height <= 0 or width <= 0:
+        return CellChanges([], [], [], [])
+    return block_changes(df, np.arange(top, top + height), range(left, left + width), block[:height, :width])
+
+
+def fill_down_changes(df, rows, cols):
+    """Copies the value of the first of `rows` into the others, for each column in `cols`."""
+    rows = np.sort(np.asarray(rows, dtype=np.int64))
+    if len(rows) < 2:
+        return CellChanges([], [], [], [])
+    first = df.iloc[rows[0], list(cols)].to_numpy(dtype=object)
+    return block_changes(df, rows[1:], cols, np.tile(first, (len(rows) - 1, 1)))
+
+
+def fill_series_changes(df, rows, cols):
+    """Continues a series from the first of `rows` into the others, for each column in `cols`.
+
+    The step comes from the first two rows when both hold values of the
+    series type, otherwise it is one (a day for DATE). DATE values go up by
+    days, START TIME by minutes (it needs both seed rows) and episode
+    numbers by the step, keeping the width of double episodes (`N-M`).
+    Columns whose first value isn't of any of these types are left alone.
+    """
+    rows = np.sort(np.asarray(rows, dtype=np.int64))
+    if len(rows) < 2:
+        return CellChanges([], [], [], [])
+    k = np.arange(len(rows) - 1) + 1
+    parts = []
+    for col in cols:
+        seed = df.iloc[rows[:2], col]
+        column_name = df.columns[col]
+        if column_name == 'DATE':
+            dates = parse_dates(seed)
+            if pd.isna(dates.iloc[0]):
+                continue
+            step = (dates.iloc[1] - dates.iloc[0]) if pd.notna(dates.iloc[1]) and len(rows) > 2 else pd.Timedelta(days=1)
+            series = (dates.iloc[0] + pd.to_timedelta(k * step.value)).strftime('%d.%m.%Y.')
+        elif column_name == 'START TIME':
+            times = pd.to_datetime(seed.astype('string').str.strip().str.replace('.', ':', regex=False), format='%H:%M', errors='coerce')
+            if times.isna().any() or len(rows) < 3:
+                continue
+            step = times.iloc[1] - times.iloc[0]
+            series = (times.iloc[0] + pd.to_timedelta(k * step.value)).strftime('%H:%M')
+        else:
+            first, last = _parse_episodes(seed.reset_index(drop=True))
+            if pd.isna(first.iloc[0]):
+                continue
+            width = 1 if pd.isna(last.iloc[0]) else int(last.iloc[0] - first.iloc[0] + 1)
+            step = int(first.iloc[1] - first.iloc[0]) if pd.notna(first.iloc[1]) and len(rows) > 2 else width
+            new_first = pd.Series(int(first.iloc[0]) + k * step, dtype='Int64')
+            new_last = (new_first + width - 1).where(pd.Series(width > 1, index=new_first.index))
+            series = _format_episodes(new_first, new_last)
+        parts.append(block_changes(df, rows[1:], [col], np.asarray(series, dtype=object)))
+    return CellChanges.concat(parts)
@@ -0,0 +1,256 @@
+# utils/edit_journal.py
+
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+JOURNAL_SUFFIX = '.journal'
+FORMAT_VERSION = 1
+
+
+def journal_path(workbook_path):
+    """The journal lives next to its workbook: `raspored.xlsx` -> `raspored.xlsx.journal`."""
+    return workbook_path + JOURNAL_SUFFIX
+
+
+def _workbook_stamp(workbook_path):
+    """Size and modification time identify the exact workbook version a journal applies to."""
+    stat = os.stat(workbook_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _plain(values):
+    """Converts cell values to JSON-friendly Python objects; missing values become None."""
+    values = np.asarray(values, dtype=object)
+    return [None if pd.isna(value) else value.item() if isinstance(value, np.generic) else value
+            for value in values.ravel()]
+
+
+def _dumps(record):
+    return (json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+
+
+def _snapshot(data_frame):
+    return {'op': 'snapshot', 'columns': [str(column) for column in data_frame.columns],
+            'values': _plain(data_frame.to_numpy(dtype=object)), 'width': data_frame.shape[1]}
+
+
+def _read_records(path):
+    """Reads a journal up to the first damaged line (a crash can cut the last one short)."""
+    records = []
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logging.warning(f"Ignoring damaged journal line in {path}")
+                break
+    return records
+
+
+class EditJournal:
+    """Append-only JSON-lines log of the edits made to a workbook since it was last saved.
+
+    The first line names the workbook version the journal builds on. Every
+    further line is one committed change, written as the resulting cell
+    values (not as an undoable command), so undo and redo are journaled
+    like any other edit and replaying is a plain sequence of writes:
+
+    - `cells`: a rectangle of cells, by row position and column name
+    - `insert`: whole rows inserted at a position
+    - `remove`: a run of rows removed at a position
+    - `snapshot`: the complete table, written by compaction
+
+    Appending a line costs one small write, so every edit is journaled.
+    Compaction replaces the log with a single snapshot in the background
+    so that replay stays short.
+    """
+
+    def __init__(self, workbook_path):
+        self.workbook_path = workbook_path
+        self.path = journal_path(workbook_path)
+        self.records = 0  # Change records since the last snapshot or base
+        self.epoch = 0  # Bumped whenever the base changes; a compaction from an older epoch is stale
+        self._file = None
+
+    def start(self):
+        """Starts an empty journal for the workbook as it is on disk now."""
+        self._write_new(self.path, [self._base()])
+        self.records = 0
+        self._open()
+
+    def resume(self):
+        """Keeps appending to an existing journal (e.g. after it was replayed).
+
+        The journal is rewritten first without any damaged tail, so new
+        records never follow a half-written line.
+        """
+        records = _read_records(self.path)
+        temp_path = self.path + '.tmp'
+        self._write_new(temp_path, records)
+        os.replace(temp_path, self.path)
+        self.records = len(records) - 1
+        self._open()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """Closes and deletes the journal; nothing is left to recover."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def offset(self):
+        """Current end of the journal; records appended later can be carried over by rebase()."""
+        return self._file.tell()
+
+    def record_cells(self, top, columns, values):
+        """Logs the new values of rows `top`.. in `columns` (2-D, one row per table row)."""
+        values = np.asarray(values, dtype=object)
+        self._append({'op': 'cells', 'row': int(top), 'columns': [str(column) for column in columns],
+                      'values': _plain(values), 'width': values.shape[1]})
+
+    def record_insert(self, position, frame):
+        self._append({'op': 'insert', 'row': int(position), 'columns': [str(column) for column in frame.columns],
+                      'values': _plain(frame.to_numpy(dtype=object)), 'width': frame.shape[1]})
+
+    def record_remove(self, position, count):
+        self._append({'op': 'remove', 'row': int(position), 'count': int(count)})
+
+    def record_snapshot(self, data_frame):
+        """Logs the whole table, for changes that replace it at once."""
+        self._append(_snapshot(data_frame))
+
+    def rebase(self, offset, workbook_path=None):
+        """Restarts the journal on the workbook as now saved, keeping records appended after `offset`.
+
+        Used after a save: edits made while the snapshot was being written
+        aren't in the new file, so they stay in the journal. With
+        `workbook_path` (Save As) the journal moves next to the new file.
+        """
+        source = self.path
+        if workbook_path is not None:
+            self.workbook_path = workbook_path
+            self.path = journal_path(workbook_path)
+        self._carry_over(offset, [self._base()], source)
+        if source != self.path:
+            os.remove(source)
+        self.epoch += 1
+
+    def write_compacted(self, data_frame, temp_path):
+        """Writes a compacted journal (base + snapshot of `data_frame`) to `temp_path`.
+
+        Safe to run on a worker thread; finish with finish_compaction() on
+        the thread that appends records.
+        """
+        self._write_new(temp_path, [self._base(), _snapshot(data_frame)])
+
+    def finish_compaction(self, temp_path, offset, epoch):
+        """Swaps in a compacted journal, adding the records appended after `offset` meanwhile.
+
+        Returns False (and drops the compacted file) if the journal was
+        rebased since the compaction started.
+        """
+        head = _read_records(temp_path)
+        os.remove(temp_path)
+        if epoch != self.epoch:
+            return False
+        self._carry_over(offset, head, self.path)
+        return True
+
+    def _carry_over(self, offset, head, source):
+        self._file.flush()
+        with open(source, 'rb') as f:
+            f.seek(offset)
+            tail = f.read()
+        self.close()
+        temp_path = self.path + '.tmp'
+        self._write_new(temp_path, head, tail)
+        os.replace(temp_path, self.path)
+        self.records = tail.count(b'\n')
+        self._open()
+
+    def _base(self):
+        return {'op': 'base', 'version': FORMAT_VERSION,
+                'workbook': os.path.basename(self.workbook_path), **_workbook_stamp(self.workbook_path)}
+
+    def _write_new(self, path, records, tail=b''):
+        with open(path, 'wb') as f:
+            f.writelines(_dumps(record) for record in records)
+            f.write(tail)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _open(self):
+        self._file = open(self.path, 'ab')
+
+    def _append(self, record):
+        self._file.write(_dumps(record))
+        self._file.flush()  # Reaches the OS right away, so an application crash loses nothing
+        self.records += 1
+
+
+def load_journal(workbook_path):
+    """Reads the journal of `workbook_path` if it has changes to recover.
+
+    A journal whose base doesn't match the workbook on disk (the file was
+    replaced by something else) can't be replayed and is ignored, as is a
+    truncated last line from a crash mid-write.
+
+    Returns:
+        list[dict] | None: The records after the base line, or None if
+        there is nothing to recover.
+    """
+    path = journal_path(workbook_path)
+    if not os.path.exists(path) or not os.path.exists(workbook_path):
+        return None
+    records = _read_records(path)
+    if not records or records[0].get('op') != 'base' or records[0].get('version') != FORMAT_VERSION:
+        return None
+    base = records[0]
+    stamp = _workbook_stamp(workbook_path)
+    if base['size'] != stamp['size'] or base['mtime_ns'] != stamp['mtime_ns']:
+        logging.warning(f"Journal {path} belongs to another version of the workbook, ignoring it.")
+        return None
+    return records[1:] or None
+
+
+def _block(record):
+    width = record['width']
+    values = np.empty(len(record['values']), dtype=object)
+    values[:] = record['values']
+    return values.reshape(-1, width) if width else values.reshape(0, 0)
+
+
+def replay_journal(data_frame, records):
+    """Applies journal records to the DataFrame loaded from the journal's base workbook.
+
+    Returns:
+        pd.DataFrame: A new DataFrame with every recorded change applied.
+    """
+    df = data_frame.copy()
+    for record in records:
+        op = record['op']
+        if op == 'snapshot':
+            df = pd.DataFrame(_block(record), columns=record['columns'])
+        elif op == 'cells':
+            block = _block(record)
+            rows = np.arange(record['row'], record['row'] + len(block))
+            for j, column in enumerate(record['columns']):
+                if not pd.api.types.is_object_dtype(df[column]):
+                    df[column] = df[column].astype(object)
+                df.iloc[rows, df.columns.get_loc(column)] = block[:, j]
+        elif op == 'insert':
+            frame = pd.DataFrame(_block(record), columns=record['columns'])
+            position = record['row']
+            df = pd.concat([df.iloc[:position], frame, df.iloc[position:]]).reset_index(drop=True)
+        elif op == 'remove':
+            df = df.drop(df.index[record['row']:record['row'] + record['count']]).reset_index(drop=True)
+    logging.info(f"Replayed {len(records)} journal records.")
+    return df
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 import logging
 from zoneinfo import ZoneInfo
 
+from utils.instrumentation import span
 from utils.validators import format_datetime, is_date
 
 def process_excel(file_path, timezone):
@@ -27,19 +28,19 @@ def process_excel(file_path, timezone):
     """
     try:
         # Read Excel file without headers
-        df = pd.read_excel(file_path, header=None)
-        logging.debug(f"Excel file loaded: {file_path}")
-        logging.debug(f"First 5 rows before filtering:\n{df.head()}")
+        with span('read'):
+            df = pd.read_excel(file_path, header=None)
+        logging.debug(f"Excel file loaded: {file_path}, {len(df)} rows")
 
         # Filter rows starting with a date
-        df = df[df[0].apply(is_date)].copy()
+        with span('filter'):
+            df = df[df[0].apply(is_date)].copy()
 
         if df.empty:
             logging.debug("No rows starting with a date.")
             raise ValueError("No rows starting with a date.")
 
         logging.debug(f"Number of rows after filtering: {len(df)}")
-        logging.debug(f"First 5 rows after filtering:\n{df.head()}")
 
         # Reset index after filtering
         df.reset_index(drop=True, inplace=True)
@@ -63,63 +64,62 @@ def process_excel(file_path, timezone):
         if 'episode-num' not in df.columns:
             raise ValueError("Renaming column 'EPZ' to 'episode-num' failed.")
 
-        # Correct Date format in 'Date' column
-        df['Date'] = df['Date'].astype(str).str.strip()
-        df['Date'] = df['Date'].apply(lambda x: x + '.' if not x.endswith('.') else x)
-        
-        # Correct Time format in 'Time' column
-        df['Time'] = df['Time'].astype(str).str.strip()
-        df['Time'] = df['Time'].apply(lambda x: x if ":" in x else x.replace(".", ":"))
-
-
-        # Create 'start' time
-        df['start'] = df.apply(lambda row: format_datetime(row['Date'], row['Time']), axis=1)
-
-        # Create 'stop' time as the 'start' time of the next row
-        df['stop'] = df['start'].shift(-1)
-
-        # If 'stop' time is not available (last program), set to 07:00 the next day
-        for i in range(len(df)):
-            if pd.isna(df.at[i, 'stop']):
-                start_dt = pd.to_datetime(df.at[i, 'start'])
-                next_day = start_dt + timedelta(days=1)
-                stop_dt = next_day.replace(hour=7, minute=0, second=0)
-                df.at[i, 'stop'] = stop_dt
-
-        # Check if 'start' and 'stop' times are correctly formatted
-        for idx, row in df.iterrows():
-            if not re.match(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\+\d{2}:\d{2}$', str(row['start'])):  # Updated regex for datetime format
-                raise ValueError(f"Incorrect 'start' time format in row {idx + 2}: {row['start']}")
-            if not re.match(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\+\d{2}:\d{2}$', str(row['stop'])):  # Updated regex for datetime format
-                raise ValueError(f"Incorrect 'stop' time format in row {idx + 2}: {row['stop']}")
-
-        # Create new columns for display
-        df['DATE'] = pd.to_datetime(df['start']).dt.strftime('%d.%m.%Y.')
-        df['START TIME'] = pd.to_datetime(df['start']).dt.strftime('%H:%M')
-        df['STOP TIME'] = pd.to_datetime(df['stop']).dt.strftime('%H:%M')
-        df['NAZIV EMISIJE'] = df['Title']
-        df['EPISODE NUMBER'] = df['episode-num']
-        df['P/R'] = df['P/R']
-        df['CATEGORY'] = df['Category']
-        df['OPIS emisije'] = df['Description']
-
-        # Create display_df with correct column mapping
-        display_df = pd.DataFrame({
-            'DATE': df['DATE'],
-            'START TIME': df['START TIME'],
-            'NAZIV EMISIJE': df['Title'],
-            'CATEGORY': df['Category'],
-            'EPISODE NUMBER': df['episode-num'],
-            'P/R': df['P/R'],
-            'OPIS emisije': df['Description']
-        })
-
-        # Create internal DataFrame with all necessary data for XMLTV
-        internal_df = df[['start', 'stop', 'Title', 'Description', 'Category', 'episode-num']].copy()
-        internal_df.rename(columns={'Title': 'title', 'Description': 'desc'}, inplace=True)
-
-        logging.debug(f"display_df:\n{display_df.head()}")
-        logging.debug(f"internal_df:\n{internal_df.head()}")
+        with span('parse'):
+            # Correct Date format in 'Date' column
+            df['Date'] = df['Date'].astype(str).str.strip()
+            df['Date'] = df['Date'].apply(lambda x: x + '.' if not x.endswith('.') else x)
+
+            # Correct Time format in 'Time' column
+            df['Time'] = df['Time'].astype(str).str.strip()
+            df['Time'] = df['Time'].apply(lambda x: x if ":" in x else x.replace(".", ":"))
+
+            # Create 'start' time
+            df['start'] = df.apply(lambda row: format_datetime(row['Date'], row['Time']), axis=1)
+
+        with span('stop_times'):
+            # Create 'stop' time as the 'start' time of the next row
+            df['stop'] = df['start'].shift(-1)
+
+            # If 'stop' time is not available (last program), set to 07:00 the next day
+            for i in range(len(df)):
+                if pd.isna(df.at[i, 'stop']):
+                    start_dt = pd.to_datetime(df.at[i, 'start'])
+                    next_day = start_dt + timedelta(days=1)
+                    stop_dt = next_day.replace(hour=7, minute=0, second=0)
+                    df.at[i, 'stop'] = stop_dt
+
+            # Check if 'start' and 'stop' times are correctly formatted
+            for idx, row in df.iterrows():
+                if not re.match(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\+\d{2}:\d{2}$', str(row['start'])):  # Updated regex for datetime format
+                    raise ValueError(f"Incorrect 'start' time format in row {idx + 2}: {row['start']}")
+                if not re.match(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\+\d{2}:\d{2}$', str(row['stop'])):  # Updated regex for datetime format
+                    raise ValueError(f"Incorrect 'stop' time format in row {idx + 2}: {row['stop']}")
+
+        with span('frames'):
+            # Create new columns for display
+            df['DATE'] = pd.to_datetime(df['start']).dt.strftime('%d.%m.%Y.')
+            df['START TIME'] = pd.to_datetime(df['start']).dt.strftime('%H:%M')
+            df['STOP TIME'] = pd.to_datetime(df['stop']).dt.strftime('%H:%M')
+            df['NAZIV EMISIJE'] = df['Title']
+            df['EPISODE NUMBER'] = df['episode-num']
+            df['P/R'] = df['P/R']
+            df['CATEGORY'] = df['Category']
+            df['OPIS emisije'] = df['Description']
+
+            # Create display_df with correct column mapping
+            display_df = pd.DataFrame({
+                'DATE': df['DATE'],
+                'START TIME': df['START TIME'],
+                'NAZIV EMISIJE': df['Title'],
+                'CATEGORY': df['Category'],
+                'EPISODE NUMBER': df['episode-num'],
+                'P/R': df['P/R'],
+                'OPIS emisije': df['Description']
+            })
+
+            # Create internal DataFrame with all necessary data for XMLTV
+            internal_df = df[['start', 'stop', 'Title', 'Description', 'Category', 'episode-num']].copy()
+            internal_df.rename(columns={'Title': 'title', 'Description': 'desc'}, inplace=True)
 
         return display_df, internal_df
 
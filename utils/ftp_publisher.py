@@ -0,0 +1,75 @@
+# utils/ftp_publisher.py
+
+import configparser
+import logging
+import os
+
+DEFAULT_PORT = 21
+
+
+def default_credentials():
+    return {'host': '', 'username': '', 'password': '', 'port': DEFAULT_PORT}
+
+
+def load_ftp_credentials(config_path):
+    """Reads FTP credentials from the [FTP] section of an ini file.
+
+    Missing values (or a missing file) fall back to default_credentials().
+
+    Returns:
+        dict: Keys `host`, `username`, `password` and `port`.
+    """
+    credentials = default_credentials()
+    if not os.path.exists(config_path):
+        logging.warning(f"Config file {config_path} not found. Using default FTP credentials.")
+        return credentials
+    try:
+        config = configparser.ConfigParser()
+        config.read(config_path)
+        if 'FTP' in config:
+            credentials.update({
+                'host': config['FTP'].get('host', ''),
+                'username': config['FTP'].get('username', ''),
+                'password': config['FTP'].get('password', ''),
+                'port': config['FTP'].getint('port', DEFAULT_PORT),
+            })
+        logging.info(f"Loaded FTP credentials for {credentials['host']} from {config_path}")
+    except Exception as e:
+        logging.error(f"Error loading config file {config_path}: {e}")
+    return credentials
+
+
+def save_ftp_credentials(config_path, credentials):
+    config = configparser.ConfigParser()
+    config['FTP'] = {
+        'host': credentials['host'],
+        'username': credentials['username'],
+        'password': credentials['password'],
+        'port': str(credentials['port']),
+    }
+    with open(config_path, 'w') as configfile:
+        config.write(configfile)
+    logging.info(f"FTP credentials saved to {config_path}")
+
+
+def publish_file(file_path, credentials, timeout=30):
+    """Uploads a file to the FTP server under its own name.
+
+    Raises:
+        ValueError: If no host is configured.
+        ftplib.all_errors: If connecting, logging in or uploading fails.
+    """
+    import ftplib  # Pulls in ssl; only needed when publishing
+
+    if not credentials.get('host'):
+        raise ValueError("FTP host is not configured.")
+    ftp = ftplib.FTP(timeout=timeout)
+    try:
+        ftp.connect(credentials['host'], int(credentials.get('port') or DEFAULT_PORT))
+        ftp.login(credentials['username'], credentials['password'])
+        with open(file_path, 'rb') as file:
+            ftp.storbinary(f"STOR {os.path.basename(file_path)}", file)
+        ftp.quit()
+    finally:
+        ftp.close()
+    logging.info(f"Uploaded {file_path} to {credentials['host']}")
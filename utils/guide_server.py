@@ -0,0 +1,312 @@
+# utils/guide_server.py
+
+import asyncio
+import json
+import logging
+import os
+import re
+import unicodedata
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import quote, unquote, urlsplit
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+GUIDE_SUFFIXES = ('.xml', '.xml.gz')  # Guides, per-day shards and their pre-compressed variants
+LATEST_NAME = 'latest.xml'  # Alias for the most recently written guide
+KEEP_ALIVE_SECONDS = 15
+MAX_HEADER_BYTES = 16 * 1024
+
+REASONS = {200: 'OK', 202: 'Accepted', 206: 'Partial Content', 304: 'Not Modified', 400: 'Bad Request',
+           404: 'Not Found', 405: 'Method Not Allowed', 409: 'Conflict', 411: 'Length Required',
+           413: 'Content Too Large', 416: 'Range Not Satisfiable', 431: 'Request Header Fields Too Large',
+           500: 'Internal Server Error'}
+RANGE_PATTERN = re.compile(r'bytes=(\d*)-(\d*)$')
+CONTROL_CHARACTERS = re.compile(r'[\x00-\x1f\x7f]')
+
+
+async def read_request(reader):
+    """Reads a request line and headers.
+
+    Returns:
+        tuple | None: (method, target, version, headers with lower-case
+        names), or None if the request is malformed.
+    """
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    parts = lines[0].split(' ')
+    if len(parts) != 3 or not parts[2].startswith('HTTP/1.'):
+        return None
+    headers = {}
+    for line in lines[1:]:
+        name, separator, value = line.partition(':')
+        if separator:
+            headers[name.strip().lower()] = value.strip()
+    return parts[0], parts[1], parts[2], headers
+
+
+def keep_alive(version, headers):
+    connection = headers.get('connection', '').lower()
+    return connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+
+
+def header_value(name, value):
+    """`value` made safe for a header line: no control characters (no injected headers) and Latin-1 only."""
+    value = str(value)
+    safe = CONTROL_CHARACTERS.sub(' ', value).encode('latin-1', 'replace').decode('latin-1')
+    if safe != value:
+        logging.warning(f"Header {name} had characters that can't be sent, replaced: {value!r}")
+    return safe
+
+
+def content_disposition(file_name):
+    """`attachment` with an ASCII `filename` for old clients and the exact name as UTF-8 in `filename*` (RFC 6266)."""
+    ascii_name = unicodedata.normalize('NFKD', file_name).encode('ascii', 'ignore').decode('ascii')  # č -> c
+    fallback = ''.join(c if ' ' <= c < '\x7f' and c not in '"\\' else '_' for c in ascii_name)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(file_name, safe='')}"
+
+
+async def send_response(writer, status, headers=None, body=b'', length=None, close=False):
+    """Writes the status line and headers, then `body` if given (bodies from files follow separately)."""
+    lines = [f'HTTP/1.1 {status} {REASONS[status]}', f'Date: {formatdate(usegmt=True)}']
+    lines += [f'{name}: {header_value(name, value)}' for name, value in (headers or {}).items()]
+    if status != 304:
+        lines.append(f'Content-Length: {len(body) if length is None else length}')
+    if close:
+        lines.append('Connection: close')
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+    await writer.drain()
+
+
+class Representation:
+    """One file as it's sent: the guide itself, or its `.gz` sibling with Content-Encoding: gzip."""
+
+    def __init__(self, path, stat, encoding=None):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.encoding = encoding
+        # Changes whenever the file is rewritten; the encoding is part of it since the bytes differ
+        self.etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{"-gz" if encoding else ""}"'
+        self.last_modified = formatdate(int(stat.st_mtime), usegmt=True)
+
+
+def parse_range(header, size):
+    """Parses a single `bytes=` range.
+
+    Returns:
+        tuple | None: (start, stop) with stop exclusive, None to send the
+        whole file (no header, several ranges or an unknown unit).
+
+    Raises:
+        ValueError: If the range can't be satisfied (416).
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size
+    start = int(first)
+    stop = min(int(last) + 1, size) if last else size
+    if start >= size or stop <= start:
+        raise ValueError(header)
+    return start, stop
+
+
+def _etag_matches(header, etag):
+    if header.strip() == '*':
+        return True
+    # Weak comparison, as If-None-Match requires
+    return etag in (tag.strip().removeprefix('W/') for tag in header.split(','))
+
+
+def _not_modified_since(header, mtime):
+    try:
+        return int(mtime) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def _accepts_gzip(header):
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            q = params.strip().removeprefix('q=')
+            try:
+                return float(q) > 0 if q else True
+            except ValueError:
+                return False
+    return False
+
+
+class GuideServer:
+    """Serves the XMLTV guides in one directory over HTTP/1.1 with asyncio.
+
+    `GET /` lists the guides as JSON, `GET /<name>` sends one, and
+    `/latest.xml` the most recently written `.xml`. Responses carry ETag and
+    Last-Modified, so polling clients revalidate with If-None-Match or
+    If-Modified-Since and get a 304 without a body. A client accepting gzip
+    gets the pre-compressed `<name>.gz` when one at least as new exists.
+    Single byte ranges are honoured. Bodies are sent with loop.sendfile(),
+    which uses the sendfile system call where the platform has it.
+    """
+
+    def __init__(self, directory, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.directory = os.path.abspath(directory)
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = self.server.sockets[0].getsockname()[1]  # The real one when 0 was asked for
+        logging.info(f"Serving guides from {self.directory} on http://{self.host}:{self.port}/")
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), KEEP_ALIVE_SECONDS)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await send_response(writer, 431, close=True)
+                    return
+                if request is None:
+                    await send_response(writer, 400, close=True)
+                    return
+                method, target, version, headers = request
+                persistent = keep_alive(version, headers)
+                await self._respond(writer, method, target, headers, persistent)
+                if not persistent:
+                    return
+        except ConnectionError:
+            pass
+        except Exception:
+            logging.exception("Guide server request failed")
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, method, target, headers, persistent):
+        if method not in ('GET', 'HEAD'):
+            await send_response(writer, 405, {'Allow': 'GET, HEAD'}, close=not persistent)
+            return
+        name = unquote(urlsplit(target).path).lstrip('/')
+        if name == '':
+            body = json.dumps({'guides': self.guides()}, ensure_ascii=False).encode('utf-8')
+            await send_response(writer, 200, {'Content-Type': 'application/json; charset=utf-8',
+                                           'Cache-Control': 'no-cache'},
+                             body if method == 'GET' else b'', len(body), close=not persistent)
+            return
+        representation = self._representation(name, headers)
+        if representation is None:
+            await send_response(writer, 404, close=not persistent)
+            return
+        await self._send_file(writer, method, representation, headers, persistent)
+
+    def guides(self):
+        """The servable files, newest first, as dicts for the JSON index."""
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.is_file() and entry.name.endswith(GUIDE_SUFFIXES):
+                    stat = entry.stat()
+                    representation = Representation(entry.path, stat)
+                    entries.append({'name': entry.name, 'size': stat.st_size, 'etag': representation.etag,
+                                    'last_modified': representation.last_modified, 'mtime': stat.st_mtime})
+        entries.sort(key=lambda entry: entry['mtime'], reverse=True)
+        for entry in entries:
+            del entry['mtime']
+        return entries
+
+    def _latest(self):
+        newest = None
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.is_file() and entry.name.endswith('.xml'):
+                    mtime = entry.stat().st_mtime_ns
+                    if newest is None or mtime > newest[0]:
+                        newest = (mtime, entry.name)
+        return newest and newest[1]
+
+    def _representation(self, name, headers):
+        if name == LATEST_NAME and not os.path.exists(os.path.join(self.directory, name)):
+            name = self._latest()
+            if name is None:
+                return None
+        # Only plain file names inside the directory, never paths
+        if '/' in name or '\\' in name or name.startswith('.') or not name.endswith(GUIDE_SUFFIXES):
+            return None
+        path = os.path.join(self.directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if name.endswith('.xml') and _accepts_gzip(headers.get('accept-encoding')):
+            try:
+                gz_stat = os.stat(path + '.gz')
+                if gz_stat.st_mtime_ns >= stat.st_mtime_ns:
+                    return Representation(path + '.gz', gz_stat, encoding='gzip')
+            except OSError:
+                pass
+        return Representation(path, stat)
+
+    async def _send_file(self, writer, method, representation, headers, persistent):
+        content_type = 'application/gzip' if representation.path.endswith('.xml.gz') and not representation.encoding \
+            else 'application/xml; charset=utf-8'
+        response_headers = {
+            'Content-Type': content_type,
+            'ETag': representation.etag,
+            'Last-Modified': representation.last_modified,
+            'Cache-Control': 'no-cache',
+            'Accept-Ranges': 'bytes',
+            'Vary': 'Accept-Encoding',
+        }
+        if representation.encoding:
+            response_headers['Content-Encoding'] = representation.encoding
+
+        if_none_match = headers.get('if-none-match')
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, representation.etag)
+        else:
+            not_modified = 'if-modified-since' in headers and \
+                _not_modified_since(headers['if-modified-since'], representation.mtime)
+        if not_modified:
+            await send_response(writer, 304, response_headers, close=not persistent)
+            return
+
+        byte_range = None
+        if_range = headers.get('if-range')
+        if if_range is None or if_range in (representation.etag, representation.last_modified):
+            try:
+                byte_range = parse_range(headers.get('range'), representation.size)
+            except ValueError:
+                response_headers['Content-Range'] = f'bytes */{representation.size}'
+                await send_response(writer, 416, response_headers, close=not persistent)
+                return
+        start, stop = byte_range or (0, representation.size)
+        status = 200
+        if byte_range is not None:
+            status = 206
+            response_headers['Content-Range'] = f'bytes {start}-{stop - 1}/{representation.size}'
+
+        with open(representation.path, 'rb') as file:
+            await send_response(writer, status, response_headers, length=stop - start, close=not persistent)
+            if method == 'GET' and stop > start:
+                await asyncio.get_running_loop().sendfile(writer.transport, file, start, stop - start)
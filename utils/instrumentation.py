@@ -0,0 +1,207 @@
+# utils/instrumentation.py
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+RECENT_TRACES = 100  # Finished traces kept in memory for export_chrome_trace()
+
+_active = threading.local()
+_recent = deque(maxlen=RECENT_TRACES)
+_sinks = []
+
+
+class Trace:
+    """Timings of one user-visible operation (loading a schedule, saving a guide...) as a list of spans.
+
+    A trace is recorded on the thread that activates it: span() anywhere
+    below, in the pipeline or the readers, adds to it, and does nothing when
+    no trace is active. Span names used across the pipeline are `read`,
+    `filter`, `parse`, `stop_times` and `frames` for loading, `convert` (the
+    tree build), `validate`, `serialize`, `compress` and `write` for
+    saving, and `publish` for the FTP upload.
+
+    Args:
+        name (str): What was done, shown in the status bar.
+        **attrs: JSON-serializable details, e.g. the file path.
+    """
+
+    def __init__(self, name, **attrs):
+        self.name = name
+        self.attrs = attrs
+        self.spans = []  # dicts: name, start and seconds (relative to the trace), depth, error, attrs
+        self.started_at = None  # Unix time
+        self.seconds = None
+        self.error = None
+        self.thread_id = None
+        self._started = None
+        self._depth = 0
+
+    @contextmanager
+    def activate(self):
+        """Records spans on this thread until the block ends, then hands the trace to the sinks."""
+        previous = getattr(_active, 'trace', None)
+        _active.trace = self
+        self.thread_id = threading.get_native_id()
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        try:
+            yield self
+        except BaseException as e:
+            self.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.seconds = time.perf_counter() - self._started
+            _active.trace = previous
+            _finish(self)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        record = {'name': name, 'start': time.perf_counter() - self._started, 'seconds': None,
+                  'depth': self._depth, 'error': None, 'attrs': attrs}
+        self.spans.append(record)
+        self._depth += 1
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._depth -= 1
+            record['seconds'] = time.perf_counter() - self._started - record['start']
+
+    def totals(self):
+        """Seconds per top-level span name, in the order they first ran."""
+        totals = {}
+        for record in self.spans:
+            if record['depth'] == 0 and record['seconds'] is not None:
+                totals[record['name']] = totals.get(record['name'], 0.0) + record['seconds']
+        return totals
+
+    def summary(self):
+        """One line for the status bar, e.g. `Učitavanje: 1.24 s (read 980 ms, filter 12 ms, ...)`."""
+        parts = ', '.join(f"{name} {_format_seconds(seconds)}" for name, seconds in self.totals().items())
+        text = f"{self.name}{' (neuspjelo)' if self.error else ''}: {_format_seconds(self.seconds or 0.0)}"
+        return f"{text} ({parts})" if parts else text
+
+    def to_dict(self):
+        return {
+            'trace': self.name,
+            'started': round(self.started_at, 6) if self.started_at is not None else None,
+            'seconds': round(self.seconds, 6) if self.seconds is not None else None,
+            'ok': self.error is None,
+            'error': self.error,
+            'attrs': self.attrs,
+            'thread': self.thread_id,
+            'spans': [dict(record, start=round(record['start'], 6),
+                           seconds=round(record['seconds'], 6) if record['seconds'] is not None else None)
+                      for record in self.spans],
+        }
+
+
+def _format_seconds(seconds):
+    return f"{seconds:.2f} s" if seconds >= 1 else f"{seconds * 1000:.0f} ms"
+
+
+@contextmanager
+def span(name, **attrs):
+    """Times the block as a span of the trace active on this thread, if there is one."""
+    trace = getattr(_active, 'trace', None)
+    if trace is None:
+        yield None
+        return
+    with trace.span(name, **attrs) as record:
+        yield record
+
+
+def add_sink(sink):
+    """Registers `sink(trace)` to be called with every finished trace, on the thread that recorded it."""
+    _sinks.append(sink)
+
+
+def remove_sink(sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def recent_traces():
+    """The last RECENT_TRACES finished traces, oldest first."""
+    return list(_recent)
+
+
+def _finish(trace):
+    _recent.append(trace)
+    logging.debug(trace.summary())
+    for sink in list(_sinks):
+        try:
+            sink(trace)
+        except Exception:
+            logging.exception(f"Writing timings of {trace.name} failed")
+
+
+class JsonLinesSink:
+    """Appends every finished trace to a file as one JSON object per line (see Trace.to_dict())."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, trace):
+        line = json.dumps(trace.to_dict(), ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+
+def read_json_lines(path):
+    """Reads traces written by JsonLinesSink back as dicts, skipping lines that don't parse."""
+    traces = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                traces.append(json.loads(line))
+            except ValueError:
+                continue
+    return traces
+
+
+def chrome_trace(traces):
+    """Converts traces to the Chrome trace event format, for chrome://tracing or Perfetto.
+
+    Args:
+        traces (list[Trace | dict]): Traces, or their to_dict() form as read back from a JSON lines file.
+
+    Returns:
+        dict: `{"traceEvents": [...]}` with one complete ("X") event per trace
+        and span, timestamps in microseconds since the epoch.
+    """
+    events = []
+    pid = os.getpid()
+    for trace in traces:
+        data = trace.to_dict() if isinstance(trace, Trace) else trace
+        if data.get('started') is None or data.get('seconds') is None:
+            continue  # Still running
+        origin = data['started'] * 1e6
+        tid = data.get('thread') or 0
+        events.append({'name': data['trace'], 'cat': 'trace', 'ph': 'X', 'ts': round(origin, 3),
+                       'dur': round(data['seconds'] * 1e6, 3), 'pid': pid, 'tid': tid,
+                       'args': dict(data.get('attrs') or {}, error=data.get('error'))})
+        for record in data.get('spans', []):
+            if record.get('seconds') is None:
+                continue
+            events.append({'name': record['name'], 'cat': data['trace'], 'ph': 'X',
+                           'ts': round(origin + record['start'] * 1e6, 3), 'dur': round(record['seconds'] * 1e6, 3),
+                           'pid': pid, 'tid': tid, 'args': dict(record.get('attrs') or {}, error=record.get('error'))})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def export_chrome_trace(path, traces=None):
+    """Writes `traces` (the recent ones by default) as a Chrome trace JSON file and returns how many were written."""
+    traces = recent_traces() if traces is None else traces
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(chrome_trace(traces), f, ensure_ascii=False)
+    return len(traces)
@@ -0,0 +1,143 @@
+# utils/pipeline.py
+
+import gzip
+import logging
+import os
+import time
+from contextlib import contextmanager
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+from lxml import etree
+
+from utils.atomic_file import atomic_output
+from utils.ftp_publisher import publish_file
+from utils.instrumentation import span
+from utils.schedule_store import DEFAULT_TIMEZONE, load_schedule
+from utils.xmltv_converter import dataframe_to_xmltv, download_dtd, validate_xmltv
+
+DTD_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'resources', 'xmltv.dtd')
+
+
+def _zone(timezone):
+    return ZoneInfo(timezone) if isinstance(timezone, str) else timezone
+
+
+class StageTimer:
+    """Collects how long each named pipeline stage took, in seconds, and which one failed.
+
+    Each stage is also a span of the trace active on the thread, if any (see utils.instrumentation).
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.failed = None
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            with span(name):
+                yield
+        except BaseException:
+            self.failed = self.failed or name
+            raise
+        finally:
+            self.timings[name] = round(time.perf_counter() - started, 6)
+
+
+def ensure_dtd(dtd_path=DTD_PATH):
+    """Makes sure the XMLTV DTD is on disk, downloading it the first time.
+
+    Raises:
+        FileNotFoundError: If it's missing and couldn't be downloaded.
+    """
+    if not os.path.exists(dtd_path) and not download_dtd(dtd_path):
+        raise FileNotFoundError(f"XMLTV DTD not available at {dtd_path}")
+    return dtd_path
+
+
+def build_xmltv(display_df, internal_df, timezone, dtd_path=DTD_PATH, validate=True, timer=None):
+    """Converts a loaded schedule to XMLTV bytes, validated against the DTD unless `validate` is False."""
+    timer = timer or StageTimer()
+    with timer.stage('convert'):
+        xml_tree = dataframe_to_xmltv(display_df, internal_df, _zone(timezone))
+    if validate:
+        with timer.stage('validate'):
+            validate_xmltv(xml_tree, ensure_dtd(dtd_path))
+    with timer.stage('serialize'):
+        return etree.tostring(xml_tree, pretty_print=True, encoding='UTF-8', xml_declaration=True)
+
+
+def write_xmltv(display_df, internal_df, save_path, timezone, dtd_path=DTD_PATH, validate=True, timer=None,
+                compress=False):
+    """Converts a loaded schedule and writes the XMLTV file atomically, gzipped if `compress` is True."""
+    timer = timer or StageTimer()
+    xml_bytes = build_xmltv(display_df, internal_df, timezone, dtd_path, validate, timer)
+    if compress:
+        with timer.stage('compress'):
+            xml_bytes = gzip.compress(xml_bytes, mtime=0)
+    with timer.stage('write'):
+        with atomic_output(save_path) as temp_path:
+            with open(temp_path, 'wb') as f:
+                f.write(xml_bytes)
+    return save_path
+
+
+def select_window(internal_df, date_from=None, date_to=None):
+    """Programmes starting between the local dates `date_from` and `date_to`, both inclusive; either may be None."""
+    local_start = internal_df['start'].dt.tz_localize(None)
+    keep = pd.Series(True, index=internal_df.index)
+    if date_from is not None:
+        keep &= local_start >= pd.Timestamp(date_from)
+    if date_to is not None:
+        keep &= local_start < pd.Timestamp(date_to) + pd.Timedelta(days=1)
+    return internal_df[keep]
+
+
+def output_path_for(input_path, output_dir=None):
+    """`week.xlsx` -> `week.xml`, next to the input or in `output_dir`."""
+    name = os.path.splitext(os.path.basename(input_path))[0] + '.xml'
+    return os.path.join(output_dir or os.path.dirname(os.path.abspath(input_path)), name)
+
+
+def convert_file(input_path, output_path=None, timezone=DEFAULT_TIMEZONE, dtd_path=DTD_PATH,
+                 validate=True, ftp_credentials=None):
+    """Runs one schedule through load -> convert -> validate -> write (-> publish).
+
+    Never raises for a bad input: the failure is reported in the result so
+    that a batch can go on with the next file.
+
+    Args:
+        input_path (str): Excel workbook or native schedule.
+        output_path (str | None): XMLTV destination; see output_path_for().
+        timezone (str | ZoneInfo): Timezone of the schedule times.
+        dtd_path (str): XMLTV DTD used for validation.
+        validate (bool): Validate against the DTD before writing.
+        ftp_credentials (dict | None): Upload the result when given.
+
+    Returns:
+        dict: `input`, `output`, `ok`, `programmes`, `published`,
+        `error` and `stage` (where it failed, None on success), `timings`
+        per stage and `seconds` in total, all JSON-serializable.
+    """
+    output_path = output_path or output_path_for(input_path)
+    timer = StageTimer()
+    result = {'input': input_path, 'output': output_path, 'ok': False, 'programmes': None,
+              'published': False, 'error': None, 'stage': None, 'timings': timer.timings}
+    started = time.perf_counter()
+    try:
+        with timer.stage('load'):
+            display_df, internal_df = load_schedule(input_path, _zone(timezone))
+        result['programmes'] = len(internal_df)
+        write_xmltv(display_df, internal_df, output_path, timezone, dtd_path, validate, timer)
+        if ftp_credentials is not None:
+            with timer.stage('publish'):
+                publish_file(output_path, ftp_credentials)
+            result['published'] = True
+        result['ok'] = True
+    except Exception as e:
+        logging.error(f"Converting {input_path} failed at {timer.failed}: {e}")
+        result.update(error=str(e), stage=timer.failed)
+    result['seconds'] = round(time.perf_counter() - started, 6)
+    return result
@@ -0,0 +1,399 @@
+# utils/rest_api.py
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from utils.ftp_publisher import publish_file
+from utils.guide_server import MAX_HEADER_BYTES, content_disposition, keep_alive, read_request, send_response
+from utils.pipeline import DTD_PATH, StageTimer, select_window, write_xmltv
+from utils.schedule_formats import DEFAULT_TIMEZONE, NATIVE_EXTENSION
+from utils.schedule_library import SCHEDULE_EXTENSIONS
+from utils.schedule_store import load_schedule, save_native_schedule
+from utils.schedule_validation import ScheduleValidator
+
+DEFAULT_PORT = 8081
+DEFAULT_WORKERS = 2
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+PROBLEM_LIMIT = 1000  # Validation problems kept per upload
+EXPORT_FORMATS = {'xml': False, 'xml.gz': True}  # format -> gzip
+UNSAFE_NAME_CHARACTERS = re.compile(r'[\x00-\x1f\x7f"/\\]')
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+# Jobs run in worker processes: module-level functions returning JSON-ready dicts,
+# with `error` and `stage` set instead of raising, like pipeline.convert_file()
+
+def clean_file_name(name):
+    """An uploaded file's name without any path, control characters or quotes; it ends up in headers and on FTP."""
+    name = UNSAFE_NAME_CHARACTERS.sub('', name.replace('\\', '/').rsplit('/', 1)[-1]).strip()
+    return 'raspored' + name if name.startswith('.') or not name else name  # `.xlsx` would have no extension
+
+
+def ingest_task(upload_path, schedule_path, timezone):
+    """Loads an uploaded schedule, validates it and keeps it as a native file for exports."""
+    timer = StageTimer()
+    result = {'ok': False, 'error': None, 'stage': None, 'timings': timer.timings}
+    try:
+        with timer.stage('load'):
+            display_df, internal_df = load_schedule(upload_path, ZoneInfo(timezone))
+        with timer.stage('validate'):
+            validator = ScheduleValidator()
+            validator.rebuild(display_df)
+            problems = validator.problems()
+        with timer.stage('store'):
+            save_native_schedule(display_df, schedule_path, timezone)
+        starts = internal_df['start'].dropna()
+        result.update(
+            ok=True, programmes=len(display_df), valid=validator.is_valid(), problem_count=len(problems),
+            problems=[{'row': row + 1, 'message': message} for row, message in problems[:PROBLEM_LIMIT]],
+            first_date=starts.min().date().isoformat() if len(starts) else None,
+            last_date=starts.max().date().isoformat() if len(starts) else None,
+        )
+    except Exception as e:
+        logging.error(f"Ingesting {upload_path} failed at {timer.failed}: {e}")
+        result.update(error=str(e), stage=timer.failed)
+    return result
+
+
+def export_task(schedule_path, output_path, timezone, date_from, date_to, validate, compress, dtd_path=DTD_PATH):
+    """Writes the XMLTV guide of a stored schedule, limited to a date window."""
+    timer = StageTimer()
+    result = {'ok': False, 'error': None, 'stage': None, 'timings': timer.timings}
+    try:
+        with timer.stage('load'):
+            display_df, internal_df = load_schedule(schedule_path, ZoneInfo(timezone))
+            internal_df = select_window(internal_df, date_from and date.fromisoformat(date_from),
+                                        date_to and date.fromisoformat(date_to))
+        write_xmltv(display_df, internal_df, output_path, timezone, dtd_path, validate, timer, compress)
+        result.update(ok=True, programmes=len(internal_df), size=os.path.getsize(output_path))
+    except Exception as e:
+        logging.error(f"Exporting {schedule_path} failed at {timer.failed}: {e}")
+        result.update(error=str(e), stage=timer.failed)
+    return result
+
+
+def publish_task(output_path, credentials):
+    timer = StageTimer()
+    result = {'ok': False, 'error': None, 'stage': None, 'timings': timer.timings}
+    try:
+        with timer.stage('publish'):
+            publish_file(output_path, credentials)
+        result['ok'] = True
+    except Exception as e:
+        logging.error(f"Publishing {output_path} failed: {e}")
+        result.update(error=str(e), stage=timer.failed)
+    return result
+
+
+class Job:
+    """One ingest, export or publish request and what became of it."""
+
+    def __init__(self, kind, source=None, **params):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.source = source  # Job this one works on: the ingest of an export, the export of a publish
+        self.params = params
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = {}
+
+    def to_dict(self, full=False):
+        """The job as JSON; validation problems are left out unless `full` is True."""
+        result = {key: value for key, value in self.result.items() if full or key != 'problems'}
+        return {
+            'id': self.id, 'kind': self.kind, 'source': self.source, 'params': self.params,
+            'status': self.status, 'result': result,
+            'queue_seconds': round(self.started - self.created, 6) if self.started else None,
+            'run_seconds': round(self.finished - self.started, 6) if self.finished else None,
+        }
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ConversionAPI:
+    """Local HTTP/JSON service around the conversion pipeline.
+
+    Requests are answered by asyncio at once; the work runs as jobs on a
+    process pool, at most `workers` at a time, and is polled by job id:
+
+        POST /ingest?name=raspored.xlsx   body: the workbook or .raspored file
+        POST /jobs/<ingest id>/export      body: {"format": "xml" | "xml.gz",
+                                                  "from": "YYYY-MM-DD", "to": "YYYY-MM-DD",
+                                                  "timezone": "...", "validate": true}
+        POST /jobs/<export id>/publish     uploads the guide to the configured FTP server
+        GET  /jobs, /jobs/<id>             status, result and per-stage timings
+        GET  /jobs/<ingest id>/validation  the problems found in the upload
+        GET  /jobs/<export id>/output      the generated guide
+
+    Posting returns 202 with the new job. Uploads and outputs are kept in
+    `work_dir`, one directory per ingest with a subdirectory per export.
+    An export is named after the ingested file (`week.xlsx` -> `week.xml`),
+    which is also the name it's published under.
+    """
+
+    def __init__(self, work_dir, host='127.0.0.1', port=DEFAULT_PORT, workers=DEFAULT_WORKERS,
+                 ftp_credentials=None, dtd_path=DTD_PATH):
+        self.work_dir = os.path.abspath(work_dir)
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.ftp_credentials = ftp_credentials
+        self.dtd_path = dtd_path
+        self.jobs = {}
+        self.server = None
+        self.executor = None
+        self._slots = None
+        self._tasks = set()
+
+    async def start(self):
+        os.makedirs(self.work_dir, exist_ok=True)
+        # Spawned workers don't inherit the event loop's threads and sockets
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        self._slots = asyncio.Semaphore(self.workers)
+        self.server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logging.info(f"Conversion API on http://{self.host}:{self.port}/ with {self.workers} workers")
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.executor.shutdown(cancel_futures=True)
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await send_response(writer, 431, close=True)
+                    return
+                if request is None:
+                    await send_response(writer, 400, close=True)
+                    return
+                method, target, version, headers = request
+                persistent = keep_alive(version, headers)
+                try:
+                    body = await self._read_body(reader, method, headers)
+                    await self._respond(writer, method, target, headers, body, persistent)
+                except RequestError as e:
+                    # A body we didn't read leaves the connection unusable
+                    persistent = persistent and e.status not in (411, 413)
+                    await self._send_json(writer, e.status, {'error': str(e)}, persistent)
+                if not persistent:
+                    return
+        except ConnectionError:
+            pass
+        except Exception:
+            logging.exception("Conversion API request failed")
+        finally:
+            writer.close()
+
+    async def _read_body(self, reader, method, headers):
+        if 'content-length' not in headers:
+            if method == 'POST' and headers.get('transfer-encoding'):
+                raise RequestError(411, "Content-Length is required")
+            return b''
+        try:
+            length = int(headers['content-length'])
+        except ValueError:
+            raise RequestError(411, "Invalid Content-Length")
+        if length > MAX_UPLOAD_BYTES:
+            raise RequestError(413, f"Uploads are limited to {MAX_UPLOAD_BYTES} bytes")
+        return await reader.readexactly(length)
+
+    async def _respond(self, writer, method, target, headers, body, persistent):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        if parts == ['ingest']:
+            self._allow(method, 'POST')
+            job = self._ingest(query.get('name', 'raspored.xlsx'), body)
+        elif parts == ['jobs']:
+            self._allow(method, 'GET')
+            await self._send_json(writer, 200, {'jobs': [job.to_dict() for job in self.jobs.values()]}, persistent)
+            return
+        elif len(parts) in (2, 3) and parts[0] == 'jobs':
+            source = self.jobs.get(parts[1])
+            if source is None:
+                raise RequestError(404, f"No job {parts[1]}")
+            action = parts[2] if len(parts) == 3 else None
+            if action is None:
+                self._allow(method, 'GET')
+                await self._send_json(writer, 200, source.to_dict(), persistent)
+                return
+            if action == 'validation':
+                self._allow(method, 'GET')
+                self._require(source, 'ingest')
+                result = source.result
+                await self._send_json(writer, 200, {key: result[key] for key in (
+                    'valid', 'problem_count', 'problems')}, persistent)
+                return
+            if action == 'output':
+                self._allow(method, 'GET')
+                self._require(source, 'export')
+                await self._send_output(writer, source, persistent)
+                return
+            if action == 'export':
+                self._allow(method, 'POST')
+                self._require(source, 'ingest')
+                job = self._export(source, self._json_body(body))
+            elif action == 'publish':
+                self._allow(method, 'POST')
+                self._require(source, 'export')
+                job = self._publish(source)
+            else:
+                raise RequestError(404, f"Unknown action {action}")
+        else:
+            raise RequestError(404, "Not found")
+        await self._send_json(writer, 202, job.to_dict(), persistent, {'Location': f'/jobs/{job.id}'})
+
+    @staticmethod
+    def _allow(method, allowed):
+        if method != allowed:
+            raise RequestError(405, f"Use {allowed}")
+
+    @staticmethod
+    def _require(job, kind):
+        if job.kind != kind:
+            raise RequestError(409, f"Job {job.id} is an {job.kind} job, not {kind}")
+        if job.status != DONE or not job.result.get('ok'):
+            raise RequestError(409, f"Job {job.id} is {job.status}" + (
+                f": {job.result['error']}" if job.result.get('error') else ""))
+
+    @staticmethod
+    def _json_body(body):
+        if not body.strip():
+            return {}
+        try:
+            options = json.loads(body)
+        except ValueError as e:
+            raise RequestError(400, f"Invalid JSON: {e}")
+        if not isinstance(options, dict):
+            raise RequestError(400, "Expected a JSON object")
+        return options
+
+    def _ingest(self, name, body):
+        name = clean_file_name(name)
+        extension = os.path.splitext(name)[1].lower()
+        if extension not in SCHEDULE_EXTENSIONS:
+            raise RequestError(400, f"Unsupported file type {extension or name}; use {', '.join(SCHEDULE_EXTENSIONS)}")
+        if not body:
+            raise RequestError(400, "Empty upload")
+        job = Job('ingest', name=name, size=len(body))
+        job_dir = os.path.join(self.work_dir, job.id)
+        os.makedirs(job_dir)
+        upload_path = os.path.join(job_dir, 'upload' + extension)
+        with open(upload_path, 'wb') as f:
+            f.write(body)
+        job.schedule_path = os.path.join(job_dir, 'schedule' + NATIVE_EXTENSION)
+        self._submit(job, ingest_task, upload_path, job.schedule_path, DEFAULT_TIMEZONE)
+        return job
+
+    def _export(self, source, options):
+        unknown = set(options) - {'format', 'from', 'to', 'timezone', 'validate'}
+        if unknown:
+            raise RequestError(400, f"Unknown options: {', '.join(sorted(unknown))}")
+        export_format = options.get('format', 'xml')
+        if export_format not in EXPORT_FORMATS:
+            raise RequestError(400, f"format must be one of {', '.join(EXPORT_FORMATS)}")
+        timezone = options.get('timezone', DEFAULT_TIMEZONE)
+        try:
+            ZoneInfo(timezone)
+        except (ZoneInfoNotFoundError, ValueError, TypeError):
+            raise RequestError(400, f"Unknown timezone: {timezone}")
+        for key in ('from', 'to'):
+            try:
+                options.get(key) and date.fromisoformat(options[key])
+            except (TypeError, ValueError):
+                raise RequestError(400, f"{key} must be a YYYY-MM-DD date")
+        validate = options.get('validate', True)
+        if not isinstance(validate, bool):
+            raise RequestError(400, "validate must be true or false")
+
+        job = Job('export', source.id, format=export_format, date_from=options.get('from'),
+                  date_to=options.get('to'), timezone=timezone, validate=validate)
+        # Named after the ingested file, since publishing uploads it under this name (what set-top boxes poll)
+        guide_name = os.path.splitext(source.params['name'])[0] + '.' + export_format
+        export_dir = os.path.join(self.work_dir, source.id, job.id)
+        os.makedirs(export_dir)
+        job.output_path = os.path.join(export_dir, guide_name)
+        self._submit(job, export_task, source.schedule_path, job.output_path, timezone, options.get('from'),
+                     options.get('to'), validate, EXPORT_FORMATS[export_format], self.dtd_path)
+        return job
+
+    def _publish(self, source):
+        if not self.ftp_credentials or not self.ftp_credentials.get('host'):
+            raise RequestError(409, "FTP is not configured for this service")
+        job = Job('publish', source.id)
+        self._submit(job, publish_task, source.output_path, self.ftp_credentials)
+        return job
+
+    def _submit(self, job, function, *args):
+        self.jobs[job.id] = job
+        task = asyncio.get_running_loop().create_task(self._run(job, function, *args))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job, function, *args):
+        async with self._slots:  # A job is running exactly while it holds a worker
+            job.status = RUNNING
+            job.started = time.time()
+            try:
+                job.result = await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+            except Exception as e:  # The pool itself failed, e.g. a worker was killed
+                logging.exception(f"Job {job.id} crashed")
+                job.result = {'ok': False, 'error': str(e), 'stage': None, 'timings': {}}
+            job.finished = time.time()
+            job.status = DONE if job.result.get('ok') else FAILED
+        logging.info(f"Job {job.id} ({job.kind}) {job.status} in {job.finished - job.started:.3f} s: "
+                     f"{job.result.get('timings')}")
+
+    async def _send_output(self, writer, job, persistent):
+        name = os.path.basename(job.output_path)
+        content_type = 'application/gzip' if name.endswith('.gz') else 'application/xml; charset=utf-8'
+        with open(job.output_path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            await send_response(writer, 200, {'Content-Type': content_type,
+                                              'Content-Disposition': content_disposition(name)},
+                                length=size, close=not persistent)
+            await asyncio.get_running_loop().sendfile(writer.transport, file, 0, size)
+
+    @staticmethod
+    async def _send_json(writer, status, payload, persistent, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        await send_response(writer, status, {'Content-Type': 'application/json; charset=utf-8', **(headers or {})},
+                            body, close=not persistent)
@@ -0,0 +1,94 @@
+# utils/schedule_cache.py
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+
+
+def file_stamp(file_path):
+    """Size and modification time; a cached schedule is valid only for the same stamp."""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def frames_size(*frames):
+    """Memory held by DataFrames, strings included."""
+    return int(sum(frame.memory_usage(index=True, deep=True).sum() for frame in frames))
+
+
+class ScheduleCache:
+    """Least-recently-used cache of parsed schedules, bounded by a memory budget.
+
+    Entries are `(display_df, internal_df)` pairs keyed by file path and
+    tagged with the file's stamp, so a file that changed on disk is a miss.
+    The editor modifies the frames it's given, so get() hands out copies
+    and the cached pair stays as parsed. Safe to share between threads.
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self._entries = OrderedDict()  # path -> (stamp, frames, size)
+        self._lock = threading.Lock()
+
+    def __contains__(self, file_path):
+        return self._valid_entry(file_path) is not None
+
+    def get(self, file_path):
+        """Returns copies of the cached (display_df, internal_df), or None on a miss."""
+        entry = self._valid_entry(file_path)
+        if entry is None:
+            return None
+        with self._lock:
+            if file_path in self._entries:
+                self._entries.move_to_end(file_path)
+        _, (display_df, internal_df), _ = entry
+        return display_df.copy(), internal_df.copy()
+
+    def put(self, file_path, stamp, display_df, internal_df):
+        """Caches a parsed schedule, evicting the least recently used ones to stay in budget.
+
+        Args:
+            stamp (tuple): file_stamp() taken before the file was read.
+        """
+        size = frames_size(display_df, internal_df)
+        if size > self.budget_bytes:
+            logging.debug(f"Not caching {file_path}: {size} bytes exceed the whole budget.")
+            return
+        with self._lock:
+            self._remove(file_path)
+            self._entries[file_path] = (stamp, (display_df, internal_df), size)
+            self.used_bytes += size
+            while self.used_bytes > self.budget_bytes:
+                evicted, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.used_bytes -= evicted_size
+                logging.debug(f"Evicted {evicted} from the schedule cache.")
+
+    def has_room(self):
+        return self.used_bytes < self.budget_bytes
+
+    def discard(self, file_path):
+        with self._lock:
+            self._remove(file_path)
+
+    def _remove(self, file_path):
+        entry = self._entries.pop(file_path, None)
+        if entry is not None:
+            self.used_bytes -= entry[2]
+
+    def _valid_entry(self, file_path):
+        with self._lock:
+            entry = self._entries.get(file_path)
+        if entry is None:
+            return None
+        try:
+            current = file_stamp(file_path)
+        except OSError:
+            current = None
+        if current != entry[0]:
+            self.discard(file_path)
+            return None
+        return entry
@@ -0,0 +1,264 @@
+# utils/schedule_conflicts.py
+
+import bisect
+import logging
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from utils.schedule_times import NAT, derive_stop_times
+
+OVERLAP = 'overlap'
+GAP = 'gap'
+DUPLICATE = 'duplicate'
+MIN_GAP_NS = 60 * 10**9  # Shorter holes between programmes aren't reported
+
+
+class Conflict:
+    """A problem between two programmes of one channel, usually from different files.
+
+    `start_ns` and `stop_ns` delimit the overlapping or uncovered time as
+    naive local nanoseconds. `first` and `second` are `(file, position,
+    title)` of the programmes involved, in time order.
+    """
+
+    def __init__(self, kind, start_ns, stop_ns, first, second):
+        self.kind = kind
+        self.start_ns = start_ns
+        self.stop_ns = stop_ns
+        self.first = first
+        self.second = second
+
+    @property
+    def crosses_files(self):
+        return self.first[0] != self.second[0]
+
+    def __repr__(self):
+        return (f"Conflict({self.kind}, {pd.Timestamp(self.start_ns)}–{pd.Timestamp(self.stop_ns)}, "
+                f"{self.first} / {self.second})")
+
+
+def parse_iso_starts(values):
+    """Parses the library's ISO start times (`YYYY-MM-DDTHH:MM`, None if unknown) to int64 ns with NAT."""
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), format='%Y-%m-%dT%H:%M', errors='coerce')
+    return parsed.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+def _normalized(titles):
+    return np.array([str(title).strip().casefold() if title is not None else '' for title in titles], dtype=object)
+
+
+class ConflictIndex:
+    """Programme intervals of one channel from many files, sorted by start time.
+
+    A file's intervals come from its own start times: a programme runs until
+    the next one in the same file starts, and the last one until 07:00 the
+    next day, as in the editor. Rows with an unknown or out-of-order time
+    are the editor's to report and are left out.
+
+    Programmes are ordered by start, then file name and row, and conflicts
+    are found in one sweep over them, carrying the
+    furthest stop seen so far: a programme starting before it overlaps the
+    programme that reaches furthest (a duplicate if both start together
+    with the same title), and one starting after it leaves a gap. Building
+    is O(n log n). Replacing one file's intervals with set_file() only
+    sweeps the time span that file covered before and after the change.
+    """
+
+    def __init__(self, min_gap_ns=MIN_GAP_NS):
+        self.min_gap_ns = min_gap_ns
+        self.start = np.empty(0, dtype=np.int64)
+        self.stop = np.empty(0, dtype=np.int64)
+        self.file = np.empty(0, dtype=object)
+        self.position = np.empty(0, dtype=np.int64)
+        self.title = np.empty(0, dtype=object)
+        self.max_length = 0
+        self.conflicts = []  # Sorted by the start of the later programme
+        self._keys = []
+
+    def __len__(self):
+        return len(self.start)
+
+    def rebuild(self, files):
+        """Indexes many files at once.
+
+        Args:
+            files (dict): file name -> (start_ns, titles) in file row order.
+        """
+        parts = [self._intervals(name, start_ns, titles) for name, (start_ns, titles) in files.items()]
+        columns = [np.concatenate([part[i] for part in parts]) if parts else array
+                   for i, array in enumerate((self.start, self.stop, self.file, self.position, self.title))]
+        rank = {name: i for i, name in enumerate(sorted(files))}
+        file_rank = np.array([rank[name] for name in columns[2]], dtype=np.int64)
+        order = np.lexsort((columns[3], file_rank, columns[0]))
+        self.start, self.stop, self.file, self.position, self.title = (column[order] for column in columns)
+        self._update_max_length()
+        self.conflicts = self._sweep(0, len(self.start))
+        self._keys = [self._key(conflict) for conflict in self.conflicts]
+
+    def set_file(self, name, start_ns, titles):
+        """Replaces the intervals of one file (all of them if it's new) and rechecks the time it spans."""
+        old = self.file == name
+        spans = [(self.start[old].min(), self.stop[old].max())] if old.any() else []
+
+        start, stop, files, positions, new_titles = self._intervals(name, start_ns, titles)
+        if len(start):
+            spans.append((start.min(), stop.max()))
+        keep = ~old
+        self.start, self.stop, self.file, self.position, self.title = (
+            column[keep] for column in (self.start, self.stop, self.file, self.position, self.title)
+        )
+        order = np.argsort(start, kind='stable')
+        # Programmes starting together are kept in file name order, so results don't depend on update order
+        at = np.searchsorted(self.start, start[order], side='left')
+        tied_end = np.searchsorted(self.start, start[order], side='right')
+        for k in np.flatnonzero(tied_end > at):
+            at[k] += np.count_nonzero(self.file[at[k]:tied_end[k]] < name)
+        self.start = np.insert(self.start, at, start[order])
+        self.stop = np.insert(self.stop, at, stop[order])
+        self.file = np.insert(self.file, at, files[order])
+        self.position = np.insert(self.position, at, positions[order])
+        self.title = np.insert(self.title, at, new_titles[order])
+        self._update_max_length()
+        if spans:
+            self._recheck(min(span[0] for span in spans), max(span[1] for span in spans))
+
+    def remove_file(self, name):
+        self.set_file(name, np.empty(0, dtype=np.int64), [])
+
+    def _intervals(self, name, start_ns, titles):
+        start_ns = np.asarray(start_ns, dtype=np.int64)
+        stop_ns = derive_stop_times(start_ns)
+        valid = (start_ns != NAT) & (stop_ns != NAT) & (stop_ns > start_ns)
+        positions = np.flatnonzero(valid)
+        files = np.empty(len(positions), dtype=object)
+        files[:] = name
+        title_values = np.empty(len(titles), dtype=object)
+        title_values[:] = list(titles)
+        return start_ns[valid], stop_ns[valid], files, positions.astype(np.int64), title_values[valid]
+
+    def _update_max_length(self):
+        self.max_length = int((self.stop - self.start).max()) if len(self.start) else 0
+
+    def _recheck(self, low, high):
+        """Replaces the conflicts a change between `low` and `high` can affect."""
+        # A gap right after the span starts at a stop from inside it
+        after = np.searchsorted(self.start, high, side='right')
+        high_key = int(self.start[after]) if after < len(self.start) else high
+        # Sweep from the first programme that can still reach into the span
+        first = int(np.searchsorted(self.start, low - self.max_length, side='left'))
+        last = int(np.searchsorted(self.start, high_key, side='right'))
+        found = [conflict for conflict in self._sweep(first, last) if low <= self._key(conflict) <= high_key]
+
+        begin = bisect.bisect_left(self._keys, low)
+        end = bisect.bisect_right(self._keys, high_key)
+        self.conflicts[begin:end] = found
+        self._keys[begin:end] = [self._key(conflict) for conflict in found]
+
+    @staticmethod
+    def _key(conflict):
+        """When the later programme starts, which is what ties a conflict to a place in the index."""
+        return conflict.stop_ns if conflict.kind == GAP else conflict.start_ns
+
+    def _sweep(self, first, last):
+        rows = np.arange(first, last)
+        if first > 0:
+            # What reaches furthest from before the slice carries into it (the last such, as in a full sweep)
+            seed = first - 1 - int(np.argmax(self.stop[first - 1::-1]))
+            rows = np.concatenate([[seed], rows])
+        start = self.start[rows]
+        stop = self.stop[rows]
+        if len(start) < 2:
+            return []
+        reach = np.maximum.accumulate(stop)
+        index = np.arange(len(start))
+        owner = np.maximum.accumulate(np.where(stop == reach, index, 0))
+        previous_reach, previous_owner, later = reach[:-1], owner[:-1], index[1:]
+
+        overlaps = np.flatnonzero(start[1:] < previous_reach)
+        gaps = np.flatnonzero(start[1:] - previous_reach >= self.min_gap_ns)
+        titles = _normalized(self.title[rows])
+
+        def programme(i):
+            row = rows[i]
+            return (self.file[row], int(self.position[row]), self.title[row])
+
+        conflicts = []
+        for k in overlaps:
+            i, j = int(previous_owner[k]), int(later[k])
+            duplicate = start[i] == start[j] and titles[i] == titles[j]
+            conflicts.append(Conflict(DUPLICATE if duplicate else OVERLAP, int(start[j]),
+                                      int(min(stop[i], stop[j])), programme(i), programme(j)))
+        for k in gaps:
+            i, j = int(previous_owner[k]), int(later[k])
+            conflicts.append(Conflict(GAP, int(previous_reach[k]), int(start[j]), programme(i), programme(j)))
+        conflicts.sort(key=self._key)
+        return conflicts
+
+
+class LibraryConflicts:
+    """Conflict indexes for every channel in a ScheduleLibrary, synced by content hash.
+
+    refresh() loads intervals only for files whose hash changed since the
+    last call (all of them the first time) and updates their channel's
+    index incrementally.
+    """
+
+    def __init__(self, library, min_gap_ns=MIN_GAP_NS):
+        self.library = library
+        self.min_gap_ns = min_gap_ns
+        self.indexes = {}  # channel -> ConflictIndex
+        self.loaded = {}  # file name -> (hash, channel)
+
+    def refresh(self):
+        """Brings the indexes up to date with the library.
+
+        Returns:
+            bool: Whether anything changed.
+        """
+        current = self.library.indexed_files()
+        removed = [name for name in self.loaded if name not in current]
+        changed = [name for name, state in current.items() if self.loaded.get(name) != state]
+        if not removed and not changed:
+            return False
+
+        if not self.loaded:
+            by_channel = defaultdict(dict)
+            for name, start_ns, titles in self._file_times(changed):
+                by_channel[current[name][1]][name] = (start_ns, titles)
+            for channel, files in by_channel.items():
+                self._index(channel).rebuild(files)
+        else:
+            for name in removed:
+                self.indexes[self.loaded.pop(name)[1]].remove_file(name)
+            emptied = set(changed)
+            for name, start_ns, titles in self._file_times(changed):
+                emptied.discard(name)
+                previous = self.loaded.get(name)
+                if previous is not None and previous[1] != current[name][1]:
+                    self.indexes[previous[1]].remove_file(name)
+                self._index(current[name][1]).set_file(name, start_ns, titles)
+            # programme_times() yields nothing for a file that has no programmes now; drop its old intervals
+            for name in emptied:
+                previous = self.loaded.get(name)
+                if previous is not None:
+                    self.indexes[previous[1]].remove_file(name)
+        self.loaded = {name: current[name] for name in current}
+        logging.info(f"Conflict index updated: {len(changed)} files loaded, {len(removed)} removed, "
+                     f"{len(self.conflicts())} conflicts.")
+        return True
+
+    def conflicts(self, channel=None):
+        """All conflicts, or those of one channel, in time order."""
+        indexes = self.indexes.values() if channel is None else [self.indexes.get(channel, ConflictIndex())]
+        return sorted((conflict for index in indexes for conflict in index.conflicts), key=ConflictIndex._key)
+
+    def _index(self, channel):
+        if channel not in self.indexes:
+            self.indexes[channel] = ConflictIndex(self.min_gap_ns)
+        return self.indexes[channel]
+
+    def _file_times(self, names):
+        for name, starts, titles in self.library.programme_times(names):
+            yield name, parse_iso_starts(starts), titles
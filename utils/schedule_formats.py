@@ -0,0 +1,12 @@
+# utils/schedule_formats.py
+"""Schedule file names and defaults, importable without pandas for a fast start."""
+
+NATIVE_EXTENSION = '.raspored'
+DEFAULT_TIMEZONE = 'Europe/Zagreb'
+CHANNEL_ID = 'diadora-tv'
+
+DISPLAY_COLUMNS = ['DATE', 'START TIME', 'NAZIV EMISIJE', 'CATEGORY', 'EPISODE NUMBER', 'P/R', 'OPIS emisije']
+
+
+def is_native_schedule(file_path):
+    return file_path.lower().endswith(NATIVE_EXTENSION)
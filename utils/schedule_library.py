@@ -0,0 +1,338 @@
+# utils/schedule_library.py
+
+import hashlib
+import itertools
+import logging
+import os
+import sqlite3
+import time
+
+from utils.schedule_formats import CHANNEL_ID, DISPLAY_COLUMNS, NATIVE_EXTENSION, is_native_schedule
+
+# Reading schedules needs pandas and openpyxl; they're imported there, by the
+# indexing thread, so that opening the library doesn't load them
+
+LIBRARY_FILE = '.library.sqlite'
+LIBRARY_VERSION = 3  # Bumped when the index needs rebuilding; stored as PRAGMA user_version
+SCHEDULE_EXTENSIONS = ('.xlsx', '.xls', NATIVE_EXTENSION)
+SEARCH_LIMIT = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,       -- File name inside the library directory
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT,                   -- SHA-256 of the content; NULL until metadata is extracted
+    first_date TEXT,             -- ISO date of the first programme
+    last_date TEXT,              -- ISO date of the last programme
+    row_count INTEGER,
+    channel TEXT,
+    error TEXT,                  -- Why metadata couldn't be extracted, if it couldn't
+    indexed_at REAL,
+    opened_at REAL               -- Last time the file was opened in the application
+);
+CREATE INDEX IF NOT EXISTS files_dates ON files (first_date, last_date);
+CREATE TABLE IF NOT EXISTS programmes (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,          -- files.name
+    position INTEGER NOT NULL,   -- Row in the schedule
+    start TEXT,                  -- ISO local date and time, NULL if DATE/START TIME don't parse
+    date TEXT,                   -- DATE and START TIME as written in the schedule
+    start_time TEXT,
+    title TEXT,
+    category TEXT,
+    episode TEXT,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS programmes_file ON programmes (file);
+"""
+
+# External-content FTS5 table over the programmes, kept in sync by triggers
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS programme_search USING fts5(
+    title, description, category, episode,
+    content='programmes', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS programmes_insert AFTER INSERT ON programmes BEGIN
+    INSERT INTO programme_search (rowid, title, description, category, episode)
+    VALUES (new.id, new.title, new.description, new.category, new.episode);
+END;
+CREATE TRIGGER IF NOT EXISTS programmes_delete AFTER DELETE ON programmes BEGIN
+    INSERT INTO programme_search (programme_search, rowid, title, description, category, episode)
+    VALUES ('delete', old.id, old.title, old.description, old.category, old.episode);
+END;
+"""
+
+SEARCH_COLUMNS = ('title', 'description', 'category', 'episode')
+
+SORT_ORDERS = {
+    'name': 'name COLLATE NOCASE',
+    'date': 'first_date IS NULL, first_date DESC, name COLLATE NOCASE',
+    'modified': 'mtime_ns DESC',
+}
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_programmes(path):
+    """Reads the display columns of a schedule file, tolerating rows the editor would flag.
+
+    Unlike process_excel(), a workbook row with a bad time doesn't fail the
+    whole file: the library indexes whatever is there. Workbooks are
+    streamed in read-only mode; rows starting with a date are programmes.
+
+    Returns:
+        tuple: (display_df, channel)
+    """
+    import openpyxl
+    import pandas as pd
+
+    from utils.schedule_store import load_native_schedule, read_native_meta
+    from utils.validators import is_date
+
+    if is_native_schedule(path):
+        display_df, _ = load_native_schedule(path)
+        return display_df, read_native_meta(path).get('channel', CHANNEL_ID)
+
+    width = len(DISPLAY_COLUMNS)
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        rows = [tuple(row) + (None,) * (width - len(row))
+                for row in workbook.active.iter_rows(max_col=width, values_only=True)
+                if row and row[0] is not None and is_date(str(row[0]))]
+    finally:
+        workbook.close()
+    display_df = pd.DataFrame(rows, columns=DISPLAY_COLUMNS, dtype=object)
+    display_df['DATE'] = display_df['DATE'].astype(str).str.strip()
+    display_df['START TIME'] = display_df['START TIME'].astype(str).str.strip().str.replace('.', ':', regex=False)
+    return display_df, CHANNEL_ID
+
+
+def _text(series):
+    import pandas as pd
+
+    values = series.astype(object)
+    return [None if pd.isna(value) else str(value) for value in values]
+
+
+def extract_metadata(path):
+    """Reads what the library keeps about a schedule file.
+
+    Returns:
+        dict: Keys `hash`, `first_date`, `last_date`, `row_count`, `channel`,
+        `error` (None on success) and `programmes`, the rows for the search
+        index as tuples in the column order of the programmes table (after
+        `file`).
+    """
+    import numpy as np
+    import pandas as pd
+
+    from utils.bulk_edit import parse_dates
+    from utils.schedule_times import NAT, parse_start_times
+
+    metadata = {'hash': file_hash(path), 'first_date': None, 'last_date': None,
+                'row_count': None, 'channel': CHANNEL_ID, 'error': None, 'programmes': []}
+    try:
+        display_df, channel = read_programmes(path)
+        start_ns = parse_start_times(display_df['DATE'], display_df['START TIME'])
+        known = start_ns != NAT
+        dates = pd.DatetimeIndex(start_ns[known].view('datetime64[ns]'))
+        if not len(dates):
+            dates = pd.DatetimeIndex(parse_dates(display_df['DATE']).dropna())
+        metadata.update(row_count=len(display_df), channel=channel)
+        if len(dates):
+            metadata.update(first_date=dates.min().date().isoformat(), last_date=dates.max().date().isoformat())
+
+        starts = pd.DatetimeIndex(start_ns.view('datetime64[ns]')).strftime('%Y-%m-%dT%H:%M')
+        starts = np.where(known, np.asarray(starts, dtype=object), None)
+        metadata['programmes'] = list(zip(
+            range(len(display_df)), starts, _text(display_df['DATE']), _text(display_df['START TIME']),
+            _text(display_df['NAZIV EMISIJE']), _text(display_df['CATEGORY']),
+            _text(display_df['EPISODE NUMBER']), _text(display_df['OPIS emisije']),
+        ))
+    except Exception as e:
+        logging.warning(f"Could not read metadata of {path}: {e}")
+        metadata.update(channel=None, error=str(e))
+    return metadata
+
+
+def _match_expression(query):
+    """Turns free text into an FTS5 query: every word must match, as a prefix."""
+    words = query.split()
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+class ScheduleLibrary:
+    """Persistent index of the schedules in a directory.
+
+    The index is a SQLite file inside the directory. scan() is cheap: it
+    only compares file sizes and modification times with the index and
+    returns the files whose metadata must be (re)extracted, which callers
+    do with extract_metadata() (typically on a worker thread) and store
+    with update(). Queries then never touch the schedule files.
+
+    Every programme is also indexed for search(), with FTS5 when the
+    SQLite build has it and plain LIKE matching otherwise.
+    """
+
+    def __init__(self, directory, db_path=None):
+        self.directory = directory
+        self.db_path = db_path or os.path.join(directory, LIBRARY_FILE)
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute('PRAGMA journal_mode = WAL')  # No rollback journal popping in and out of the watched directory
+        if self.connection.execute('PRAGMA user_version').fetchone()[0] != LIBRARY_VERSION:
+            self.connection.executescript(
+                'DROP TABLE IF EXISTS programme_search; DROP TABLE IF EXISTS programmes; DROP TABLE IF EXISTS files;'
+            )
+            self.connection.execute(f'PRAGMA user_version = {LIBRARY_VERSION}')
+        self.connection.executescript(SCHEMA)
+        try:
+            self.connection.executescript(SEARCH_SCHEMA)
+            self.full_text = True
+        except sqlite3.OperationalError as e:
+            logging.warning(f"SQLite has no FTS5 ({e}), archive search falls back to LIKE.")
+            self.full_text = False
+
+    def close(self):
+        self.connection.close()
+
+    def scan(self):
+        """Syncs the index with the directory listing.
+
+        Returns:
+            list[str]: Names of new or changed files that need metadata.
+        """
+        on_disk = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith(SCHEDULE_EXTENSIONS):
+                    stat = entry.stat()
+                    on_disk[entry.name] = (stat.st_size, stat.st_mtime_ns)
+
+        indexed = {name: (size, mtime_ns, has_hash) for name, size, mtime_ns, has_hash
+                   in self.connection.execute('SELECT name, size, mtime_ns, hash IS NOT NULL FROM files')}
+        removed = [(name,) for name in indexed if name not in on_disk]
+        changed = [name for name, stamp in on_disk.items()
+                   if name not in indexed or indexed[name][:2] != stamp or not indexed[name][2]]
+
+        with self.connection:
+            self.connection.executemany('DELETE FROM files WHERE name = ?', removed)
+            self.connection.executemany('DELETE FROM programmes WHERE file = ?', removed)
+            self.connection.executemany(
+                'INSERT INTO files (name, size, mtime_ns) VALUES (?, ?, ?) '
+                'ON CONFLICT (name) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns, hash = NULL',
+                [(name, *on_disk[name]) for name in changed if name not in indexed or indexed[name][:2] != on_disk[name]]
+            )
+        if removed or changed:
+            logging.info(f"Library scan: {len(changed)} files to index, {len(removed)} removed.")
+        return sorted(changed)
+
+    def update(self, name, size, mtime_ns, metadata):
+        """Stores extracted metadata and programmes, unless the file changed again since it was read."""
+        with self.connection:
+            updated = self.connection.execute(
+                'UPDATE files SET hash = :hash, first_date = :first_date, last_date = :last_date, '
+                'row_count = :row_count, channel = :channel, error = :error, indexed_at = :indexed_at '
+                'WHERE name = :name AND size = :size AND mtime_ns = :mtime_ns',
+                {**metadata, 'name': name, 'size': size, 'mtime_ns': mtime_ns, 'indexed_at': time.time()}
+            ).rowcount
+            if updated:
+                self.connection.execute('DELETE FROM programmes WHERE file = ?', (name,))
+                self.connection.executemany(
+                    'INSERT INTO programmes (file, position, start, date, start_time, title, category, episode, description) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    ((name, *programme) for programme in metadata.get('programmes', ()))
+                )
+
+    def mark_opened(self, name):
+        with self.connection:
+            self.connection.execute('UPDATE files SET opened_at = ? WHERE name = ?', (time.time(), name))
+
+    def recent_files(self, limit):
+        """Readable files most likely to be opened next: recently opened ones first, then recently modified."""
+        return [name for name, in self.connection.execute(
+            'SELECT name FROM files WHERE hash IS NOT NULL AND error IS NULL '
+            'ORDER BY opened_at IS NULL, opened_at DESC, mtime_ns DESC LIMIT ?', (limit,)
+        )]
+
+    def indexed_files(self):
+        """Files with extracted metadata, as {name: (hash, channel)}."""
+        return {name: (content_hash, channel) for name, content_hash, channel in self.connection.execute(
+            'SELECT name, hash, channel FROM files WHERE hash IS NOT NULL AND error IS NULL'
+        )}
+
+    def programme_times(self, names):
+        """Yields `(name, starts, titles)` per file, in row order; starts are ISO strings or None.
+
+        Many files are read in one pass over the programmes table instead
+        of one query each.
+        """
+        names = list(names)
+        if len(names) > 50:
+            wanted = set(names)
+            rows = (row for row in self.connection.execute(
+                'SELECT file, start, title FROM programmes ORDER BY file, position') if row[0] in wanted)
+        else:
+            rows = (row for name in names for row in self.connection.execute(
+                'SELECT file, start, title FROM programmes WHERE file = ? ORDER BY position', (name,)))
+        for name, group in itertools.groupby(rows, key=lambda row: row[0]):
+            group = list(group)
+            yield name, [row[1] for row in group], [row[2] for row in group]
+
+    def entries(self, date_from=None, date_to=None, order='name'):
+        """Lists indexed files, optionally only those covering part of [date_from, date_to].
+
+        Args:
+            date_from, date_to (datetime.date | None): Inclusive range; files
+                whose dates aren't known yet are left out when filtering.
+            order (str): One of SORT_ORDERS.
+
+        Returns:
+            list[dict]: One dict per file with the index columns.
+        """
+        conditions, params = [], {}
+        if date_from is not None:
+            conditions.append('last_date >= :date_from')
+            params['date_from'] = date_from.isoformat()
+        if date_to is not None:
+            conditions.append('first_date <= :date_to')
+            params['date_to'] = date_to.isoformat()
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        cursor = self.connection.execute(f'SELECT * FROM files {where} ORDER BY {SORT_ORDERS[order]}', params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Finds programmes whose title, description, category or episode contain every word of `query`.
+
+        Words match as prefixes, case- and diacritic-insensitively with
+        FTS5; the LIKE fallback matches substrings and only ignores ASCII
+        case.
+
+        Returns:
+            list[dict]: Matches, latest first, with the programme columns and
+            `file` naming the schedule they're in.
+        """
+        words = query.split()
+        if not words:
+            return []
+        columns = 'p.file, p.position, p.start, p.date, p.start_time, p.title, p.category, p.episode, p.description'
+        if self.full_text:
+            sql = (f'SELECT {columns} FROM programme_search JOIN programmes p ON p.id = programme_search.rowid '
+                   'WHERE programme_search MATCH ? ORDER BY p.start DESC, p.file, p.position LIMIT ?')
+            params = [_match_expression(query), limit]
+        else:
+            any_column = '(' + ' OR '.join(f"p.{column} LIKE ? ESCAPE '!'" for column in SEARCH_COLUMNS) + ')'
+            patterns = ['%' + word.replace('!', '!!').replace('%', '!%').replace('_', '!_') + '%' for word in words]
+            sql = (f'SELECT {columns} FROM programmes p WHERE {" AND ".join([any_column] * len(words))} '
+                   'ORDER BY p.start DESC, p.file, p.position LIMIT ?')
+            params = [pattern for pattern in patterns for _ in SEARCH_COLUMNS] + [limit]
+        cursor = self.connection.execute(sql, params)
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
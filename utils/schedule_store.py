@@ -0,0 +1,215 @@
+# utils/schedule_store.py
+
+import logging
+import sqlite3
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from utils.atomic_file import atomic_output
+from utils.excel_processor import process_excel
+from utils.instrumentation import span
+from utils.workbook_writer import save_schedule_atomically
+from utils.schedule_formats import CHANNEL_ID, DEFAULT_TIMEZONE, DISPLAY_COLUMNS, is_native_schedule
+from utils.schedule_times import NAT, parse_start_times, derive_stop_times
+
+FORMAT_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE programmes (
+    position INTEGER PRIMARY KEY,            -- Row order in the schedule
+    start INTEGER,                           -- UTC Unix seconds, NULL if DATE/START TIME don't parse
+    stop INTEGER,                            -- UTC Unix seconds
+    date TEXT,                               -- DATE as shown in the editor
+    start_time TEXT,                         -- START TIME as shown in the editor
+    title TEXT,
+    category_id INTEGER REFERENCES categories(id),
+    episode,                                 -- No affinity: text, or a number read from Excel, kept as is
+    premiere TEXT,                           -- P/R
+    description TEXT
+);
+"""
+
+
+def _timezone_name(timezone):
+    return getattr(timezone, 'key', None) or str(timezone)
+
+
+def _cell_values(series):
+    """Column values as Python objects for sqlite3, with None for missing values."""
+    values = series.astype(object)
+    return values.where(values.notna(), None).tolist()
+
+
+def _utc_seconds(wall_ns, timezone):
+    """Converts naive wall-clock nanoseconds (NAT when unknown) to UTC Unix seconds (None when unknown)."""
+    local = pd.DatetimeIndex(wall_ns.view('datetime64[ns]'))
+    # Ambiguous autumn hours resolve to the first (summer time) occurrence, like datetime.replace(tzinfo=...)
+    aware = local.tz_localize(timezone, ambiguous=np.ones(len(local), dtype=bool), nonexistent='shift_forward')
+    seconds = aware.asi8 // 10**9
+    return [None if ns == NAT else int(s) for ns, s in zip(wall_ns, seconds)]
+
+
+def save_native_schedule(display_df, file_path, timezone=DEFAULT_TIMEZONE):
+    """Saves a schedule in the native SQLite format.
+
+    The display columns are stored as text, exactly as they appear in the
+    editor. Start and stop times are also stored as UTC integers, and
+    categories go in a lookup table. The file is written to a temporary
+    path and moved into place once complete.
+
+    Args:
+        display_df (pd.DataFrame): Schedule with the DISPLAY_COLUMNS.
+        file_path (str): Destination `.raspored` path.
+        timezone (ZoneInfo | str): Timezone of the DATE/START TIME values.
+
+    Raises:
+        ValueError: If a display column is missing.
+    """
+    missing = [column for column in DISPLAY_COLUMNS if column not in display_df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    timezone = _timezone_name(timezone)
+
+    with span('parse'):
+        start_ns = parse_start_times(display_df['DATE'], display_df['START TIME'])
+    with span('stop_times'):
+        stop_ns = derive_stop_times(start_ns)
+
+    categories = display_df['CATEGORY'].astype(object).where(display_df['CATEGORY'].notna(), None)
+    names = pd.unique(categories.dropna().astype(str))
+    codes = pd.Categorical(categories.astype('string'), categories=names).codes
+    category_ids = [None if code < 0 else int(code) + 1 for code in codes]
+
+    rows = zip(
+        range(len(display_df)),
+        _utc_seconds(start_ns, timezone),
+        _utc_seconds(stop_ns, timezone),
+        _cell_values(display_df['DATE']),
+        _cell_values(display_df['START TIME']),
+        _cell_values(display_df['NAZIV EMISIJE']),
+        category_ids,
+        _cell_values(display_df['EPISODE NUMBER']),
+        _cell_values(display_df['P/R']),
+        _cell_values(display_df['OPIS emisije']),
+    )
+    known_starts = start_ns[start_ns != NAT]
+    meta = {
+        'format_version': str(FORMAT_VERSION),
+        'timezone': timezone,
+        'channel': CHANNEL_ID,
+        'row_count': str(len(display_df)),
+        'first_date': str(pd.Timestamp(known_starts.min()).date()) if len(known_starts) else '',
+        'last_date': str(pd.Timestamp(known_starts.max()).date()) if len(known_starts) else '',
+    }
+
+    with span('write'), atomic_output(file_path) as temp_path:
+        connection = sqlite3.connect(temp_path)
+        try:
+            connection.execute('PRAGMA journal_mode = OFF')  # A fresh temporary file needs no rollback journal
+            connection.executescript(SCHEMA)
+            connection.executemany('INSERT INTO meta VALUES (?, ?)', meta.items())
+            connection.executemany('INSERT INTO categories VALUES (?, ?)', enumerate(names, start=1))
+            connection.executemany('INSERT INTO programmes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            connection.commit()
+        finally:
+            connection.close()
+    logging.info(f"Saved {len(display_df)} rows to {file_path}")
+
+
+def read_native_meta(file_path):
+    """Reads only the metadata table (row count, covered dates, channel...) of a native schedule."""
+    connection = sqlite3.connect(f"file:{file_path}?mode=ro", uri=True)
+    try:
+        return dict(connection.execute('SELECT key, value FROM meta'))
+    finally:
+        connection.close()
+
+
+def load_native_schedule(file_path, timezone=None):
+    """Loads a native schedule as (display_df, internal_df), like process_excel().
+
+    Args:
+        file_path (str): Path of a `.raspored` file.
+        timezone (ZoneInfo | str | None): Timezone for start/stop times;
+            the one stored in the file if None.
+
+    Returns:
+        tuple: (display_df, internal_df) with the same columns as
+        process_excel() returns. `Category` in internal_df is categorical.
+
+    Raises:
+        ValueError: If the file is of an unsupported format version.
+    """
+    with span('read'):
+        meta, df = _read_native_rows(file_path)
+    logging.debug(f"Loaded {len(df)} rows from {file_path}")
+
+    with span('frames'):
+        return _native_frames(df, meta, timezone)
+
+
+def _read_native_rows(file_path):
+    connection = sqlite3.connect(f"file:{file_path}?mode=ro", uri=True)
+    try:
+        meta = dict(connection.execute('SELECT key, value FROM meta'))
+        if int(meta.get('format_version', 0)) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported schedule format version: {meta.get('format_version')}")
+        df = pd.read_sql_query(
+            'SELECT p.start, p.stop, p.date, p.start_time, p.title, c.name AS category, p.episode, p.premiere, p.description '
+            'FROM programmes p LEFT JOIN categories c ON c.id = p.category_id ORDER BY p.position',
+            connection,
+            dtype={'start': 'Int64', 'stop': 'Int64'},
+        )
+    finally:
+        connection.close()
+    return meta, df
+
+
+def _native_frames(df, meta, timezone):
+    timezone = ZoneInfo(_timezone_name(timezone) if timezone is not None else meta['timezone'])
+    display_df = pd.DataFrame({
+        'DATE': df['date'],
+        'START TIME': df['start_time'],
+        'NAZIV EMISIJE': df['title'],
+        'CATEGORY': df['category'],
+        'EPISODE NUMBER': df['episode'],
+        'P/R': df['premiere'],
+        'OPIS emisije': df['description'],
+    })
+    internal_df = pd.DataFrame({
+        'start': pd.to_datetime(df['start'], unit='s', utc=True).dt.tz_convert(timezone),
+        'stop': pd.to_datetime(df['stop'], unit='s', utc=True).dt.tz_convert(timezone),
+        'title': df['title'],
+        'desc': df['description'],
+        'Category': df['category'].astype('category'),
+        'episode-num': df['episode'],
+    })
+    return display_df, internal_df
+
+
+def load_schedule(file_path, timezone):
+    """Loads a schedule from a native file or an Excel workbook, chosen by extension."""
+    if is_native_schedule(file_path):
+        return load_native_schedule(file_path, timezone)
+    return process_excel(file_path, timezone)
+
+
+def save_schedule(display_df, file_path, timezone=DEFAULT_TIMEZONE, progress=None):
+    """Saves a schedule as a native file or an Excel workbook, chosen by extension, atomically."""
+    if is_native_schedule(file_path):
+        save_native_schedule(display_df, file_path, timezone)
+        if progress is not None:
+            progress(len(display_df), len(display_df))
+        return
+    with span('write'):
+        save_schedule_atomically(display_df, file_path, progress)
@@ -0,0 +1,67 @@
+# utils/schedule_times.py
+
+import numpy as np
+import pandas as pd
+
+# Sentinel for "no valid time" in int64 nanosecond arrays (same value pandas uses for NaT)
+NAT = np.iinfo(np.int64).min
+
+
+def parse_start_times(dates, times):
+    """Parses DATE and START TIME display columns into wall-clock nanoseconds.
+
+    Both columns are parsed in one vectorized pass. Dates are expected as
+    `DD.MM.YYYY.` (the trailing dot is optional) and times as `HH:MM` or
+    `HH.MM`.
+
+    Args:
+        dates (array-like): Values of the DATE column.
+        times (array-like): Values of the START TIME column.
+
+    Returns:
+        np.ndarray: int64 array of naive local times in nanoseconds, with
+        `NAT` wherever the date or time can't be parsed.
+    """
+    dates = pd.Series(np.asarray(dates, dtype=object)).astype('string').str.strip()
+    times = pd.Series(np.asarray(times, dtype=object)).astype('string').str.strip()
+    dates = dates.str.rstrip('.') + '.'
+    times = times.str.replace('.', ':', regex=False)
+
+    parsed = pd.to_datetime(dates + ' ' + times, format='%d.%m.%Y. %H:%M', errors='coerce')
+    return parsed.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+DAY_NS = 24 * 3600 * 10**9
+LAST_STOP_NS = 7 * 3600 * 10**9  # The last programme of a schedule runs until 07:00 the next day
+
+
+def derive_stop_times(start_ns, rows=None):
+    """Derives stop times from start times: each programme runs until the next one starts.
+
+    Args:
+        start_ns (np.ndarray): int64 start times of the whole schedule.
+        rows (array-like | None): Row positions to compute, all rows if None.
+
+    Returns:
+        np.ndarray: int64 stop times for `rows`, `NAT` where unknown.
+    """
+    rows = np.arange(len(start_ns)) if rows is None else np.asarray(rows, dtype=np.int64)
+    following = rows + 1
+    has_next = following < len(start_ns)
+
+    stop = np.full(len(rows), NAT, dtype=np.int64)
+    stop[has_next] = start_ns[following[has_next]]
+
+    last = start_ns[rows[~has_next]]
+    known = last != NAT
+    last_stop = np.full(len(last), NAT, dtype=np.int64)
+    last_stop[known] = (last[known] // DAY_NS + 1) * DAY_NS + LAST_STOP_NS
+    stop[~has_next] = last_stop
+    return stop
+
+
+def format_clock(ns):
+    """Formats a single nanosecond wall-clock value as HH:MM, empty for `NAT`."""
+    if ns == NAT:
+        return ""
+    return pd.Timestamp(int(ns)).strftime('%H:%M')
@@ -0,0 +1,125 @@
+# utils/schedule_validation.py
+
+import logging
+
+import numpy as np
+
+from utils.schedule_times import NAT, parse_start_times
+
+REQUIRED_COLUMNS = ['DATE', 'START TIME', 'NAZIV EMISIJE']
+
+# Relation between a row and the row after it
+PAIR_OK = 0
+PAIR_OVERLAP = 1      # Both programmes start at the same time
+PAIR_OUT_OF_ORDER = 2  # The next programme starts before this one
+
+
+class ScheduleValidator:
+    """Keeps a live list of schedule problems and rechecks only what an edit touches.
+
+    Start times are stored as an int64 nanosecond array. A programme runs
+    until the next one starts, so two programmes overlap exactly when a row
+    doesn't start strictly before the row after it. Every check is therefore
+    local to a row and its neighbours, which is what makes incremental
+    updates possible.
+    """
+
+    def __init__(self):
+        self.start_ns = np.empty(0, dtype=np.int64)
+        self.missing = np.empty(0, dtype=bool)
+        self.pairs = np.empty(0, dtype=np.int8)
+
+    def rebuild(self, df, start_ns=None):
+        """Validates the whole table in one vectorized pass.
+
+        `start_ns` may pass start times the caller already parsed (e.g. the
+        editor model keeps them); otherwise they're parsed from `df`.
+        """
+        self.start_ns = self._parse(df, np.arange(len(df)), start_ns)
+        self.missing = self._missing(df, np.arange(len(df)))
+        self.pairs = np.zeros(len(df), dtype=np.int8)
+        self._check_pairs(np.arange(len(df)))
+
+    def update_rows(self, df, rows, start_ns=None):
+        """Revalidates the given row positions and the pairs they take part in."""
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        rows = rows[(rows >= 0) & (rows < len(self.start_ns))]
+        if not len(rows):
+            return
+        self.apply_rows(rows, df[REQUIRED_COLUMNS].iloc[rows], None if start_ns is None else start_ns[rows])
+
+    def apply_rows(self, rows, values, start_ns=None):
+        """Revalidates `rows` from a snapshot of just those rows.
+
+        `values` holds the REQUIRED_COLUMNS of `rows`, in the same order, and
+        `start_ns` their parsed start times if known. Because it needs
+        nothing else from the table, the caller can copy what an edit
+        touched and validate it on another thread.
+        """
+        positions = np.arange(len(rows))
+        self.start_ns[rows] = self._parse(values, positions, start_ns)
+        self.missing[rows] = self._missing(values, positions)
+        self._check_pairs(np.union1d(rows - 1, rows))
+
+    def insert_rows(self, df, position, count, start_ns=None):
+        """Makes room for `count` new rows at `position` and validates them."""
+        self.make_room(position, count)
+        self.update_rows(df, np.arange(position, position + count), start_ns)
+
+    def make_room(self, position, count):
+        """Inserts `count` not yet validated rows at `position`; follow with apply_rows()."""
+        self.start_ns = np.insert(self.start_ns, position, np.full(count, NAT))
+        self.missing = np.insert(self.missing, position, np.zeros(count, dtype=bool))
+        self.pairs = np.insert(self.pairs, position, np.zeros(count, dtype=np.int8))
+
+    def remove_rows(self, position, count):
+        """Drops `count` rows at `position` and rechecks the pair that now meets."""
+        removed = np.arange(position, position + count)
+        self.start_ns = np.delete(self.start_ns, removed)
+        self.missing = np.delete(self.missing, removed)
+        self.pairs = np.delete(self.pairs, removed)
+        self._check_pairs(np.array([position - 1]))
+
+    def is_valid(self):
+        return not (self.missing.any() or (self.start_ns == NAT).any() or self.pairs.any())
+
+    def problems(self, limit=None):
+        """Returns a sorted list of (row, message) tuples describing every problem."""
+        found = []
+        for row in np.flatnonzero(self.missing):
+            found.append((int(row), "Nedostaju obvezna polja."))
+        for row in np.flatnonzero((self.start_ns == NAT) & ~self.missing):
+            found.append((int(row), "Neispravan datum ili vrijeme početka."))
+        for row in np.flatnonzero(self.pairs == PAIR_OVERLAP):
+            found.append((int(row), f"Vremensko preklapanje s retkom {row + 1}."))
+        for row in np.flatnonzero(self.pairs == PAIR_OUT_OF_ORDER):
+            found.append((int(row), f"Redak {row + 1} počinje prije ovog retka."))
+        found.sort()
+        return found[:limit] if limit else found
+
+    def _parse(self, df, rows, start_ns=None):
+        if start_ns is not None:
+            return start_ns[rows]
+        return parse_start_times(
+            df['DATE'].iloc[rows].to_numpy(dtype=object),
+            df['START TIME'].iloc[rows].to_numpy(dtype=object)
+        )
+
+    def _missing(self, df, rows):
+        text = df[REQUIRED_COLUMNS].iloc[rows].astype('string').fillna('')
+        return text.apply(lambda column: column.str.strip() == '').any(axis=1).to_numpy(dtype=bool)
+
+    def _check_pairs(self, rows):
+        """Recomputes the relation between each row in `rows` and the row after it."""
+        rows = rows[(rows >= 0) & (rows < len(self.start_ns) - 1)]
+        self.pairs[len(self.start_ns) - 1:] = PAIR_OK
+        if not len(rows):
+            return
+        current = self.start_ns[rows]
+        following = self.start_ns[rows + 1]
+        known = (current != NAT) & (following != NAT)
+        pairs = np.full(len(rows), PAIR_OK, dtype=np.int8)
+        pairs[known & (following == current)] = PAIR_OVERLAP
+        pairs[known & (following < current)] = PAIR_OUT_OF_ORDER
+        self.pairs[rows] = pairs
+        logging.debug(f"Schedule validator rechecked {len(rows)} row pairs.")
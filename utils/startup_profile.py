@@ -0,0 +1,105 @@
+# utils/startup_profile.py
+
+import importlib.abc
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class _TimedFinder(importlib.abc.MetaPathFinder):
+    """Finds modules with the other finders and times how long each takes to execute."""
+
+    def __init__(self, profile):
+        self.profile = profile
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            loader = spec.loader
+            # Only per-module loaders (source and extension files); built-in and frozen modules are cheap.
+            # Extension modules are initialised in create_module(), Python ones run in exec_module().
+            if getattr(loader, 'name', None) == fullname:
+                for method in ('create_module', 'exec_module'):
+                    if hasattr(loader, method):
+                        setattr(loader, method, self.profile._timed(fullname, getattr(loader, method)))
+            return spec
+        return None
+
+
+class StartupProfile:
+    """Import and initialisation timings for `main.py --profile-startup`.
+
+    install() times the execution of every module imported from then on;
+    `total` includes the modules it imports, `own` doesn't. Initialisation
+    steps are timed with phase(). When disabled, both do nothing.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.imports = []  # (module, own seconds, total seconds), for creating and executing each module
+        self.phases = []  # (name, seconds)
+        self._local = threading.local()  # .nested: seconds spent in nested imports, per import in progress
+        self._finder = None
+
+    def install(self):
+        if self.enabled and self._finder is None:
+            self._finder = _TimedFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def _timed(self, name, load):
+        def timed(module):
+            stack = self._local.__dict__.setdefault('nested', [])
+            stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                return load(module)
+            finally:
+                total = time.perf_counter() - started
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += total
+                self.imports.append((name, total - nested, total))
+        return timed
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def mark(self, name):
+        """Records a point in time, e.g. the first paint, as a phase lasting since start-up."""
+        if self.enabled:
+            self.phases.append((name, time.perf_counter() - self.started))
+
+    def report(self, limit=25):
+        """Formats the phases and the `limit` slowest imports, by total time, as text."""
+        lines = ["Startup phases (ms):"]
+        lines += [f"  {seconds * 1000:9.1f}  {name}" for name, seconds in self.phases]
+        modules = {}
+        for name, own, total in self.imports:
+            previous_own, previous_total = modules.get(name, (0.0, 0.0))
+            modules[name] = (previous_own + own, previous_total + total)
+        imported = sum(own for own, _ in modules.values())
+        lines.append(f"Imports: {len(modules)} modules, {imported * 1000:.1f} ms")
+        lines.append(f"  {'total ms':>9}  {'own ms':>9}  module")
+        slowest = sorted(((name, own, total) for name, (own, total) in modules.items()),
+                         key=lambda entry: entry[2], reverse=True)[:limit]
+        lines += [f"  {total * 1000:9.1f}  {own * 1000:9.1f}  {name}" for name, own, total in slowest]
+        return '\n'.join(lines)
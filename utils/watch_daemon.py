@@ -0,0 +1,305 @@
+# utils/watch_daemon.py
+
+import ctypes
+import ctypes.util
+import json
+import logging
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+
+from utils.pipeline import DTD_PATH, convert_file, output_path_for
+from utils.schedule_cache import file_stamp
+from utils.schedule_formats import DEFAULT_TIMEZONE
+from utils.schedule_library import SCHEDULE_EXTENSIONS
+
+DEFAULT_SETTLE = 2.0  # Seconds a file must stay unchanged before it's converted
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 8
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len; followed by the NUL-padded name
+
+
+def is_schedule_file(name):
+    """Schedule workbooks and native files, without Excel's `~$` lock files and hidden files."""
+    return not name.startswith(('~$', '.')) and name.lower().endswith(SCHEDULE_EXTENSIONS)
+
+
+def schedule_files(directory):
+    try:
+        with os.scandir(directory) as entries:
+            return [entry.path for entry in entries if entry.is_file() and is_schedule_file(entry.name)]
+    except OSError as e:
+        logging.warning(f"Cannot list {directory}: {e}")
+        return []
+
+
+class PollingWatcher:
+    """Finds changed schedule files by comparing (size, mtime) on every poll.
+
+    Works everywhere, including network shares where inotify sees nothing.
+    """
+
+    def __init__(self, directories, interval=DEFAULT_POLL_INTERVAL):
+        self.directories = directories
+        self.interval = interval
+        self._stamps = self._scan()
+        self._next_poll = time.monotonic() + interval
+
+    def _scan(self):
+        stamps = {}
+        for directory in self.directories:
+            for path in schedule_files(directory):
+                try:
+                    stamps[path] = file_stamp(path)
+                except OSError:
+                    pass
+        return stamps
+
+    def wait(self, timeout):
+        """Waits up to `timeout` seconds and returns the paths that changed since the last call."""
+        delay = self._next_poll - time.monotonic()
+        if delay > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(delay, 0))
+        self._next_poll = time.monotonic() + self.interval
+        stamps = self._scan()
+        changed = {path for path, stamp in stamps.items() if self._stamps.get(path) != stamp}
+        self._stamps = stamps
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify through ctypes; reports files written, created or moved into the directories.
+
+    Raises:
+        OSError: If inotify isn't available or a directory can't be watched.
+    """
+
+    def __init__(self, directories):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = directories
+        self._watches = {}  # watch descriptor -> directory
+        for directory in directories:
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                self.close()
+                raise OSError(error, f"Cannot watch {directory}: {os.strerror(error)}")
+            self._watches[wd] = directory
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost; anything may have changed
+                logging.warning("inotify queue overflowed, rescanning watched directories")
+                for directory in self.directories:
+                    changed.update(schedule_files(directory))
+            elif wd in self._watches and is_schedule_file(name):
+                changed.add(os.path.join(self._watches[wd], name))
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def open_watcher(directories, poll_interval=None):
+    """inotify when it works, polling otherwise or when `poll_interval` is given."""
+    if poll_interval is None:
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError) as e:  # AttributeError: libc without inotify
+            logging.warning(f"inotify unavailable ({e}), polling instead")
+            poll_interval = DEFAULT_POLL_INTERVAL
+    return PollingWatcher(directories, poll_interval)
+
+
+class WatchDaemon:
+    """Converts (and optionally publishes) schedules as they appear in watched directories.
+
+    A changed file is converted once it has kept the same size and mtime
+    for `settle` seconds, so a workbook still being written isn't picked up
+    half-way. Settled files go through a bounded queue to a pool of worker
+    threads running pipeline.convert_file(). When the queue is full, files
+    wait with the watcher (further changes to them are merged) instead of
+    piling up in memory. A file changed again while being converted is
+    converted again afterwards.
+
+    On start, files whose XMLTV output is missing or older than the file
+    are queued too.
+
+    Args:
+        directories (list[str]): Directories to watch (not recursively).
+        output_dir (str | None): Where XMLTV files go; next to each input by default.
+        timezone, dtd_path, validate, ftp_credentials: As for convert_file().
+        workers (int): Files converted in parallel.
+        queue_size (int): Settled files allowed to wait for a worker.
+        settle (float): Seconds without change before a file is converted.
+        poll_interval (float | None): Poll instead of using inotify.
+        on_result (callable | None): Called from a worker thread with each
+            convert_file() result, extended with `queue_seconds`.
+    """
+
+    def __init__(self, directories, output_dir=None, timezone=DEFAULT_TIMEZONE, dtd_path=DTD_PATH, validate=True,
+                 ftp_credentials=None, workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE,
+                 settle=DEFAULT_SETTLE, poll_interval=None, on_result=None):
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.output_dir = output_dir
+        self.convert_options = {'timezone': timezone, 'dtd_path': dtd_path, 'validate': validate,
+                                'ftp_credentials': ftp_credentials}
+        self.workers = workers
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.on_result = on_result
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._pending = {}  # path -> (stamp when last seen, monotonic time it's settled by)
+        self._busy = set()  # Queued or being converted
+        self._converted = {}  # path -> stamp it was last converted at
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._queue_full_logged = False
+
+    def stop(self):
+        self._stopping.set()
+
+    def run(self):
+        """Watches until stop() is called, then finishes the queued files."""
+        watcher = open_watcher(self.directories, self.poll_interval)
+        threads = [threading.Thread(target=self._work, name=f"watch-worker-{i}", daemon=True)
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        logging.info(f"Watching {', '.join(self.directories)} with {type(watcher).__name__}, "
+                     f"{self.workers} workers")
+        try:
+            self._note(self._outdated_files())
+            while not self._stopping.is_set():
+                self._note(watcher.wait(self._next_timeout()))
+                self._release_settled()
+        finally:
+            watcher.close()
+            for _ in threads:
+                self._queue.put(None)
+            for thread in threads:
+                thread.join()
+            logging.info("Watch stopped")
+
+    def _outdated_files(self):
+        outdated = []
+        for directory in self.directories:
+            for path in schedule_files(directory):
+                output_path = output_path_for(path, self.output_dir)
+                try:
+                    if not os.path.exists(output_path) or os.path.getmtime(output_path) < os.path.getmtime(path):
+                        outdated.append(path)
+                except OSError:
+                    pass
+        return outdated
+
+    def _note(self, paths):
+        now = time.monotonic()
+        for path in paths:
+            try:
+                stamp = file_stamp(path)
+            except OSError:
+                self._pending.pop(path, None)  # Deleted or moved away
+                continue
+            previous = self._pending.get(path)
+            if previous is None or previous[0] != stamp:
+                self._pending[path] = (stamp, now + self.settle)
+
+    def _next_timeout(self):
+        if not self._pending:
+            return 1.0
+        return min(1.0, max(0.05, min(deadline for _, deadline in self._pending.values()) - time.monotonic()))
+
+    def _release_settled(self):
+        now = time.monotonic()
+        for path, (stamp, deadline) in sorted(self._pending.items(), key=lambda item: item[1][1]):
+            if deadline > now:
+                continue
+            try:
+                current = file_stamp(path)
+            except OSError:
+                del self._pending[path]
+                continue
+            if current != stamp:
+                self._pending[path] = (current, now + self.settle)  # Still being written
+                continue
+            with self._lock:
+                if path in self._busy:
+                    # Converted again once the current run is done; looked at again in `settle`
+                    # seconds rather than on every pass, which would busy-poll during the conversion
+                    self._pending[path] = (stamp, now + self.settle)
+                    continue
+                if self._converted.get(path) == stamp:
+                    del self._pending[path]  # Touched, not changed
+                    continue
+                try:
+                    self._queue.put_nowait((path, stamp, now))
+                except queue.Full:
+                    if not self._queue_full_logged:
+                        logging.warning(f"Conversion queue full, {len(self._pending)} files waiting")
+                        self._queue_full_logged = True
+                    return
+                self._busy.add(path)
+            del self._pending[path]
+        self._queue_full_logged = False  # Everything settled got queued
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            path, stamp, queued_at = job
+            queue_seconds = time.monotonic() - queued_at
+            try:
+                result = convert_file(path, output_path_for(path, self.output_dir), **self.convert_options)
+            except Exception as e:  # convert_file reports failures itself; this is a bug in the daemon
+                logging.exception(f"Converting {path} crashed")
+                result = {'input': path, 'ok': False, 'error': str(e)}
+            result['queue_seconds'] = round(queue_seconds, 6)
+            with self._lock:
+                self._busy.discard(path)
+                self._converted[path] = stamp
+            logging.info(f"Watch run: {json.dumps(result, ensure_ascii=False)}")
+            if self.on_result is not None:
+                self.on_result(result)
@@ -0,0 +1,144 @@
+# utils/workbook_writer.py
+
+import logging
+import warnings
+
+import pandas as pd
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, Font, Alignment, Border, Side, PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+
+from utils.atomic_file import atomic_output
+
+WRAPPED_COLUMN = 'OPIS emisije'  # Long descriptions wrap instead of widening the column
+TABLE_NAME = 'DiadoraTV'
+PROGRESS_EVERY = 1000  # Rows between progress callbacks
+
+
+def _named_styles():
+    """Builds the handful of styles every cell shares, so each one is stored once in the file."""
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    band_fill = PatternFill(start_color='EEEEEE', end_color='EEEEEE', fill_type='solid')  # Light gray
+
+    def style(name, wrap=False, fill=None, **kwargs):
+        named = NamedStyle(name=name, alignment=Alignment(horizontal='left', wrap_text=wrap), **kwargs)
+        if fill is not None:
+            named.fill = fill
+        return named
+
+    return {
+        'header': style('schedule_header', font=Font(bold=True)),
+        'body': style('schedule_body', border=border),
+        'body_band': style('schedule_body_band', border=border, fill=band_fill),
+        'wrap': style('schedule_wrap', wrap=True, border=border),
+        'wrap_band': style('schedule_wrap_band', wrap=True, border=border, fill=band_fill),
+    }
+
+
+def column_widths(df):
+    """Computes Excel column widths from the longest value in each column, header included."""
+    widths = []
+    for column in df.columns:
+        lengths = df[column].astype('string').str.len()
+        longest = max(len(str(column)), int(lengths.max()) if lengths.notna().any() else 0)
+        widths.append((longest + 2) * 1.1)
+    return widths
+
+
+def write_schedule_workbook(df, save_path, progress=None):
+    """Writes the schedule to an .xlsx file in a single streaming pass.
+
+    The workbook is created in openpyxl's write-only mode, so rows are
+    serialized as they are appended instead of being kept as cell objects.
+    Every cell refers to one of a few shared named styles: a bold header,
+    bordered left-aligned body cells with every other row shaded, and
+    wrapped text in the description column. The data is also covered by a
+    striped table.
+
+    Args:
+        df (pd.DataFrame): Schedule in display format. Timezone-aware
+            datetime columns are written as naive local times.
+        save_path (str): Destination .xlsx path.
+        progress (callable | None): Called as `progress(done, total)` every
+            PROGRESS_EVERY rows and once more when all rows are written.
+    """
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]) and getattr(df[column].dt, 'tz', None) is not None:
+            df[column] = df[column].dt.tz_localize(None)
+
+    workbook = openpyxl.Workbook(write_only=True)
+    styles = _named_styles()
+    for named in styles.values():
+        workbook.add_named_style(named)
+    sheet = workbook.create_sheet()
+
+    for position, width in enumerate(column_widths(df), start=1):
+        sheet.column_dimensions[get_column_letter(position)].width = width
+
+    def styled(value, name):
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.style = name
+        return cell
+
+    sheet.append([styled(str(column), styles['header'].name) for column in df.columns])
+
+    # append() serializes a row straight away, so one styled cell per column and
+    # band is enough: each row only swaps in its values.
+    row_cells = []
+    for parity in (0, 1):  # Data starts on sheet row 2, so even offsets land on shaded (even) rows
+        suffix = '_band' if parity == 0 else ''
+        row_cells.append([
+            styled(None, styles[('wrap' if column == WRAPPED_COLUMN else 'body') + suffix].name)
+            for column in df.columns
+        ])
+
+    values = df.astype(object).where(df.notna(), None).to_numpy()
+    for offset, row in enumerate(values):
+        cells = row_cells[offset % 2]
+        for cell, value in zip(cells, row):
+            cell.value = value
+        sheet.append(cells)
+        if progress is not None and offset % PROGRESS_EVERY == PROGRESS_EVERY - 1:
+            progress(offset + 1, len(values))
+
+    last_cell = f"{get_column_letter(max(len(df.columns), 1))}{len(df) + 1}"
+    table = Table(
+        ref=f"A1:{last_cell}",
+        displayName=TABLE_NAME,
+        tableStyleInfo=TableStyleInfo(
+            name="TableStyleMedium9",
+            showFirstColumn=False,
+            showLastColumn=False,
+            showRowStripes=True,
+            showColumnStripes=False,
+        ),
+    )
+    # Write-only sheets can't read the header row back, so name the table columns here
+    table.tableColumns = [TableColumn(id=position, name=str(column)) for position, column in enumerate(df.columns, start=1)]
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='In write-only mode you must add table columns manually')
+        sheet.add_table(table)
+
+    workbook.save(save_path)
+    if progress is not None:
+        progress(len(values), len(values))
+    logging.info(f"Saved {len(df)} rows to {save_path}")
+
+
+def save_schedule_atomically(df, save_path, progress=None):
+    """Writes the workbook so that `save_path` is never left half-written.
+
+    See utils.atomic_file.atomic_output(): the data goes to a temporary
+    file that replaces the target only once it is complete and on disk.
+
+    Args:
+        df (pd.DataFrame): Schedule in display format.
+        save_path (str): Destination .xlsx path.
+        progress (callable | None): See write_schedule_workbook().
+    """
+    with atomic_output(save_path) as temp_path:
+        write_schedule_workbook(df, temp_path, progress)